@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Main script of easyplotter"""
-from easyplotter.module.plot_manager import PlotManager
+import sys
+
+from easyplotter.module.plot_manager import PlotManager, get_data_paths
 from easyplotter.configuration.args_parser import args_parse
 
 
@@ -8,8 +10,12 @@ def main():
     args = args_parse()
     output_dir = args.output
     output_dir.mkdir(parents=True, exist_ok=True)
-    plot_manager = PlotManager(args.config, output_dir)
-    plot_manager.create_plots()
+    data_paths = get_data_paths(args.data) if args.data else None
+    plot_manager = PlotManager(args.config, output_dir, jobs=args.jobs, show=args.show, data_paths=data_paths,
+                               force=args.force)
+    errors = plot_manager.create_plots()
+    if errors:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""A module for skipping plots whose inputs have not changed since the last run
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Hashable
+
+from easyplotter.common.logger import logger
+from easyplotter.common.render_cache import make_render_key
+
+
+class BuildManifest:
+    """A manifest of the plots created in an output directory
+
+    For each plot the manifest records a digest of its inputs: the configuration entry of the plot, the
+    fingerprints (resolved path, modification time and size) of the recordings, the settings which change
+    the rendering, further inputs like the loaded time window and the versions of easyplotter and
+    matplotlib, see ``make_render_key``.
+    A plot is up to date if its digest has not changed and all its output files still exist. The SHA-256
+    of each output file is recorded as well, the files are rendered without timestamps, so the hashes only
+    change with the content.
+    """
+    MANIFEST_FILE = ".easyplotter_manifest.json"
+    FORMAT_VERSION = 1
+
+    def __init__(self, output_dir: Path) -> None:
+        """
+        Initialize the manifest of an output directory and read the manifest of the last run
+
+        Parameters
+        ----------
+        output_dir : Path
+            Path to the output directory
+        """
+        self.manifest_path = Path(output_dir).joinpath(self.MANIFEST_FILE)
+        self.rebuilt: list[str] = []
+        self.skipped: list[str] = []
+        self._entries: dict[str, dict] = {}
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            if manifest.get('format_version') == self.FORMAT_VERSION:
+                self._entries = manifest['plots']
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError):
+            logger.warning(f"Manifest {self.manifest_path} is invalid, rebuild all plots.")
+
+    @staticmethod
+    def make_digest(plots_config: dict, data_paths: list[Path], *extra: Hashable) -> str:
+        """
+        Create the digest of the inputs of a plot
+
+        Parameters
+        ----------
+        plots_config : dict
+            The configuration entry of the plot
+        data_paths : list[Path]
+            The recordings of the plot
+        extra : Hashable
+            Additional inputs changing the outputs, e.g. the loaded time window
+
+        Returns
+        -------
+        str
+            The SHA-256 digest of the inputs, the same as the key of the plot in the render cache
+        """
+        return make_render_key(plots_config, data_paths, *extra)
+
+    def is_up_to_date(self, plot_id: str, digest: str) -> bool:
+        """
+        Check whether a plot has been created with the same inputs and its outputs still exist
+
+        Parameters
+        ----------
+        plot_id : str
+            The id of the plot
+        digest : str
+            The digest of the current inputs, see ``make_digest``
+
+        Returns
+        -------
+        bool
+            True if the plot can be skipped
+        """
+        entry = self._entries.get(plot_id)
+        if entry is None or entry['digest'] != digest:
+            return False
+        return all(self.manifest_path.parent.joinpath(output).is_file() for output in entry['outputs'])
+
+    def record(self, plot_id: str, digest: str, outputs: list[Path]) -> None:
+        """
+        Record the inputs and outputs of a created plot
+
+        Parameters
+        ----------
+        plot_id : str
+            The id of the plot
+        digest : str
+            The digest of the inputs, see ``make_digest``
+        outputs : list[Path]
+            The files written for the plot
+        """
+        output_dir = self.manifest_path.parent
+        self._entries[plot_id] = {
+            'digest': digest,
+            'outputs': {Path(output).relative_to(output_dir).as_posix(): self._hash_file(Path(output))
+                        for output in outputs if Path(output).is_file()},
+        }
+        self.rebuilt.append(plot_id)
+
+    def skip(self, plot_id: str) -> None:
+        """
+        Count a plot as skipped
+
+        Parameters
+        ----------
+        plot_id : str
+            The id of the plot
+        """
+        self.skipped.append(plot_id)
+
+    def forget(self, plot_id: str) -> None:
+        """
+        Remove a plot from the manifest, e.g. after it failed
+
+        Parameters
+        ----------
+        plot_id : str
+            The id of the plot
+        """
+        self._entries.pop(plot_id, None)
+
+    def save(self) -> None:
+        """
+        Write the manifest atomically, so an interrupted run does not leave a broken manifest
+        """
+        manifest = {'format_version': self.FORMAT_VERSION, 'plots': dict(sorted(self._entries.items()))}
+        temporary_path = self.manifest_path.with_suffix('.tmp')
+        temporary_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+        os.replace(temporary_path, self.manifest_path)
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        """
+        Hash the content of a file
+
+        Parameters
+        ----------
+        file_path : Path
+            Path to the file
+
+        Returns
+        -------
+        str
+            The SHA-256 digest of the file
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 ** 2), b''):
+                digest.update(block)
+        return digest.hexdigest()
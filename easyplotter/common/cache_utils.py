@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""A module for the helpers shared by the caches of loaded datasets, sidecar files and rendered plots
+"""
+from pathlib import Path
+import shutil
+
+from easyplotter.common.logger import logger
+
+
+def file_fingerprint(data_path: Path) -> tuple[str, int, int]:
+    """Get the fingerprint of a file, which changes with each modification of the file
+
+    The file is not read, so large recordings do not add any reads to the cache lookups.
+
+    Parameters
+    ----------
+    data_path : Path
+        Path to the file
+
+    Returns
+    -------
+    tuple[str, int, int]
+        The resolved path, the modification time in nanoseconds and the size of the file
+    """
+    resolved_path = Path(data_path).resolve()
+    stat = resolved_path.stat()
+    return str(resolved_path), stat.st_mtime_ns, stat.st_size
+
+
+def evict_least_recently_used(cache_dir: Path, marker_file: str, max_bytes: int, keep: Path, cache_name: str) -> int:
+    """Remove the least recently used entry directories of a disk cache until it fits into the size limit
+
+    An entry directory is complete if it contains the marker file, the modification time of the marker file
+    is the time of the last use. Incomplete directories, e.g. of a concurrent writer, are left untouched.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        The directory of the cache
+    marker_file : str
+        The name of the file in each complete entry directory, e.g. "entry.json"
+    max_bytes : int
+        The maximum size of all entries in bytes
+    keep : Path
+        The entry directory which must not be removed
+    cache_name : str
+        The name of the cache for the log messages, e.g. "render"
+
+    Returns
+    -------
+    int
+        The number of removed entries
+    """
+    entries = []
+    total_bytes = 0
+    for entry_dir in Path(cache_dir).iterdir():
+        entry_file = entry_dir.joinpath(marker_file)
+        if not entry_file.is_file():
+            continue
+        size = sum(file.stat().st_size for file in entry_dir.iterdir() if file.is_file())
+        entries.append((entry_file.stat().st_mtime, size, entry_dir))
+        total_bytes += size
+
+    evictions = 0
+    for _, size, entry_dir in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        if entry_dir == keep:
+            continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_bytes -= size
+        evictions += 1
+        logger.info(f"Evict {cache_name} cache entry {entry_dir}.")
+    return evictions
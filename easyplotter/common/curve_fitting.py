@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""A module for fitting curves to windows of signals with batched least squares
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+MODELS = ('poly', 'exp', 'log')
+
+
+@dataclass
+class CurveFit:
+    """The result of fitting a model to a window of a signal
+
+    The polynomial coefficients belong to the normalized x-axis ``(x - x_center) / x_scale``, which keeps
+    the normal equations well conditioned. The models are:
+
+    - poly: y = sum(c_k * u ** k)
+    - exp: y = exp(sum(c_k * u ** k)), fitted to ln(y)
+    - log: y = sum(c_k * v ** k) with v the normalized ln(x)
+    """
+    model: str
+    degree: int
+    window: tuple[float, float]
+    coefficients: np.ndarray
+    x_center: float
+    x_scale: float
+    n_points: int
+    rmse: float
+    r_squared: float
+
+    @property
+    def nbytes(self) -> int:
+        """A getter property for the number of bytes of the coefficients
+
+        Returns
+        -------
+        int
+            The number of bytes of the coefficients
+        """
+        return self.coefficients.nbytes
+
+    def evaluate(self, x_data: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the fitted curve
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            X-axis data
+
+        Returns
+        -------
+        np.ndarray
+            The values of the fitted curve
+        """
+        x_data = np.asarray(x_data, dtype=float)
+        if self.model == 'log':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_data = np.log(x_data)
+        values = np.polynomial.polynomial.polyval((x_data - self.x_center) / self.x_scale, self.coefficients)
+        return np.exp(values) if self.model == 'exp' else values
+
+    def to_dict(self) -> dict:
+        """
+        Export the fit with the parameters of the model on the original x-axis
+
+        Returns
+        -------
+        dict
+            The model, the window, the parameters and the residual statistics
+        """
+        # coefficients of the polynomial in x (or ln(x)) instead of the normalized x-axis
+        polynomial = np.polynomial.Polynomial(self.coefficients,
+                                              domain=[self.x_center - self.x_scale, self.x_center + self.x_scale])
+        coefficients = polynomial.convert(domain=[-1.0, 1.0], window=[-1.0, 1.0]).coef.tolist()
+        coefficients += [0.0] * (self.degree + 1 - len(coefficients))
+        if self.model == 'exp':
+            parameters = {'a': float(np.exp(coefficients[0])), 'b': coefficients[1:]}
+        elif self.model == 'log':
+            parameters = {'a': coefficients[0], 'b': coefficients[1:]}
+        else:
+            parameters = {'coefficients': coefficients}
+
+        return {'model': self.model, 'degree': self.degree, 'window': list(self.window), 'parameters': parameters,
+                'n_points': self.n_points, 'rmse': self.rmse, 'r_squared': self.r_squared}
+
+
+def fit_curves(segments: list[tuple[np.ndarray, np.ndarray]], windows: list[tuple[float, float]], model: str = 'poly',
+               degree: int = 1) -> list[CurveFit | None]:
+    """
+    Fit a model to many windows of signals at once
+
+    The samples of all windows are concatenated, the sums of the normal equations of each window are
+    computed with ``np.add.reduceat`` and all systems are solved with a single batched pseudo-inverse.
+    The residuals are computed in the original y-axis, also for the exponential model.
+
+    Parameters
+    ----------
+    segments : list[tuple[np.ndarray, np.ndarray]]
+        The x-axis and y-axis data of each window
+    windows : list[tuple[float, float]]
+        The (start, stop) window of each segment
+    model : str, optional
+        The model: 'poly', 'exp' for an exponential or 'log' for a polynomial in ln(x), by default 'poly'
+    degree : int, optional
+        The degree of the polynomial, by default 1
+
+    Returns
+    -------
+    list[CurveFit | None]
+        The fit of each window, None if the window has less valid samples than parameters
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model}, expected one of {', '.join(MODELS)}.")
+    n_parameters = degree + 1
+
+    # transform the samples, so all models are polynomials, and drop the invalid samples
+    xs, ys, targets = [], [], []
+    for x_data, y_data in segments:
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_fit = np.log(x_data) if model == 'log' else x_data
+            y_fit = np.log(y_data) if model == 'exp' else y_data
+        valid = np.isfinite(x_fit) & np.isfinite(y_fit)
+        xs.append(x_fit[valid])
+        ys.append(y_data[valid])
+        targets.append(y_fit[valid])
+
+    lengths = np.array([len(x_fit) for x_fit in xs], dtype=np.int64)
+    solvable = np.flatnonzero(lengths >= n_parameters)
+    results: list[CurveFit | None] = [None] * len(segments)
+    if len(solvable) == 0:
+        return results
+
+    x_all = np.concatenate([xs[index] for index in solvable])
+    y_all = np.concatenate([ys[index] for index in solvable])
+    target_all = np.concatenate([targets[index] for index in solvable])
+    lengths = lengths[solvable]
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # normalize each window to [-1, 1]
+    x_min = np.minimum.reduceat(x_all, offsets)
+    x_max = np.maximum.reduceat(x_all, offsets)
+    x_center = (x_min + x_max) / 2
+    x_scale = np.where(x_max > x_min, (x_max - x_min) / 2, 1.0)
+    u_all = (x_all - np.repeat(x_center, lengths)) / np.repeat(x_scale, lengths)
+
+    # normal equations: sums of u ** (i + j) and of u ** i * y for each window
+    powers = u_all[:, np.newaxis] ** np.arange(2 * degree + 1)
+    power_sums = np.add.reduceat(powers, offsets, axis=0)
+    normal_matrices = power_sums[:, np.add.outer(np.arange(n_parameters), np.arange(n_parameters))]
+    right_sides = np.add.reduceat(powers[:, :n_parameters] * target_all[:, np.newaxis], offsets, axis=0)
+    coefficients = (np.linalg.pinv(normal_matrices) @ right_sides[:, :, np.newaxis])[:, :, 0]
+
+    # residual statistics in the original y-axis
+    fitted = np.sum(powers[:, :n_parameters] * np.repeat(coefficients, lengths, axis=0), axis=1)
+    if model == 'exp':
+        fitted = np.exp(fitted)
+    squared_residuals = np.add.reduceat((y_all - fitted) ** 2, offsets)
+    y_mean = np.add.reduceat(y_all, offsets) / lengths
+    squared_deviations = np.add.reduceat((y_all - np.repeat(y_mean, lengths)) ** 2, offsets)
+    rmse = np.sqrt(squared_residuals / lengths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_squared = np.where(squared_deviations > 0, 1.0 - squared_residuals / squared_deviations, 1.0)
+
+    for position, index in enumerate(solvable):
+        window = (float(windows[index][0]), float(windows[index][1]))
+        results[index] = CurveFit(model=model, degree=degree, window=window,
+                                  coefficients=coefficients[position], x_center=float(x_center[position]),
+                                  x_scale=float(x_scale[position]), n_points=int(lengths[position]),
+                                  rmse=float(rmse[position]), r_squared=float(r_squared[position]))
+    return results
@@ -1,47 +1,882 @@
 # -*- coding: utf-8 -*-
+from abc import ABC, abstractmethod
+import bisect
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import numpy as np
 import pandas as pd
 
+from easyplotter.common.dataset_cache import dataset_cache
+from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.common.sidecar_cache import sidecar_cache
+from easyplotter.common.signal_processing import MinMaxAccumulator, SignalPyramid, window_slice
+
+
+class DataReader(ABC):
+    """
+    Abstract class (interface) for reader backends of the data provider
+
+    Table readers (see ``TableReader``) return the columns of a recording, the time column is the first
+    column of the file. Readers of files with one time raster per channel have no time column and return
+    the time of each signal with ``read_signals``.
+    """
+    DTYPE = np.float64
+    has_time_column = False
+    use_sidecar_cache = False
+
+    @abstractmethod
+    def read_header(self, data_path: Path) -> list[str]:
+        """
+        Read the column names of a data file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+
+        Returns
+        -------
+        list[str]
+            All column names, the time column first if the file has one
+        """
+
+    @abstractmethod
+    def read_signals(self, data_path: Path, time_column: str | None, signal_columns: dict[str, str],
+                     time_window: tuple[float, float] | None = None) -> tuple[Any, dict[str, Any]]:
+        """
+        Read time and the projected signal columns of a data file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        time_column : str | None
+            Name of the time column, None if each signal has its own time raster
+        signal_columns : dict[str, str]
+            Mapping of signal names to column names
+        time_window : tuple[float, float] | None, optional
+            The (start, stop) window of the time column to read, by default None to read all rows
+
+        Returns
+        -------
+        tuple
+            containing time and data dictionary
+        """
+
+    @staticmethod
+    def trim_to_window(arrays: dict[str, np.ndarray], time_column: str,
+                       time_window: tuple[float, float] | None) -> dict[str, np.ndarray]:
+        """
+        Trim sorted columns to a time window, keeping one sample of margin on each side
+
+        Parameters
+        ----------
+        arrays : dict[str, np.ndarray]
+            The arrays of the columns
+        time_column : str
+            Name of the sorted time column
+        time_window : tuple[float, float] | None
+            The (start, stop) window or None to keep all rows
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Views of the arrays within the time window
+        """
+        if time_window is None:
+            return arrays
+
+        window = window_slice(arrays[time_column], *time_window)
+        return {column: values[window] for column, values in arrays.items()}
+
+
+class TableReader(DataReader):
+    """
+    Abstract class (interface) for reader backends of tables with a time column
+
+    The signals are projected columns of the table, so a table reader only implements reading columns.
+    """
+    has_time_column = True
+
+    @abstractmethod
+    def read(self, data_path: Path, columns: list[str], time_window: tuple[float, float] | None = None) -> dict[str, np.ndarray]:
+        """
+        Read the projected columns of a data file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        columns : list[str]
+            Names of the columns to read, the time column first
+        time_window : tuple[float, float] | None, optional
+            The (start, stop) window of the time column to read, by default None to read all rows
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The arrays of the columns
+        """
+
+    def read_signals(self, data_path: Path, time_column: str | None, signal_columns: dict[str, str],
+                     time_window: tuple[float, float] | None = None) -> tuple[Any, dict[str, Any]]:
+        arrays = self.read(data_path, [time_column, *dict.fromkeys(signal_columns.values())], time_window)
+        return arrays[time_column], {signal_name: arrays[column] for signal_name, column in signal_columns.items()}
+
+    @staticmethod
+    def select_with_margin(positions: list[int]) -> list[int]:
+        """
+        Select the parts of a file to read for a time window, e.g. the row groups of a Parquet file
+
+        Besides the parts overlapping the window, the last part before and the first part after the window
+        are selected, since they hold the margin samples kept by ``trim_to_window``.
+
+        Parameters
+        ----------
+        positions : list[int]
+            The position of each part in the order of the time: -1 before the window, 1 after the window
+            and 0 overlapping or unknown
+
+        Returns
+        -------
+        list[int]
+            The indices of the selected parts in ascending order
+        """
+        selected = {index for index, position in enumerate(positions) if position == 0}
+        before = [index for index, position in enumerate(positions) if position < 0]
+        after = [index for index, position in enumerate(positions) if position > 0]
+        if before:
+            selected.add(before[-1])
+        if after:
+            selected.add(after[0])
+        return sorted(selected)
+
+    def iter_chunks(self, data_path: Path, columns: list[str], chunk_rows: int,
+                    time_window: tuple[float, float] | None = None) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Read the projected columns of a data file in chunks of rows
+
+        By default the columns within the time window are read at once and split into chunks, readers
+        of large text files override it to keep only one chunk in memory.
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        columns : list[str]
+            Names of the columns to read, the time column first
+        chunk_rows : int
+            The number of rows of each chunk
+        time_window : tuple[float, float] | None, optional
+            The (start, stop) window of the time column, by default None to read all rows. Readers may
+            return rows outside the window.
+
+        Yields
+        ------
+        dict[str, np.ndarray]
+            The arrays of the columns of each chunk in the order of the rows
+        """
+        arrays = self.read(data_path, columns, time_window)
+        for start in range(0, len(arrays[columns[0]]), chunk_rows):
+            yield {column: values[start:start + chunk_rows] for column, values in arrays.items()}
+
+
+class CsvReader(TableReader):
+    """
+    Reader backend for CSV files
+    """
+    # the text has to be parsed completely, so the parsed columns are kept in the sidecar cache
+    use_sidecar_cache = True
+
+    def read_header(self, data_path: Path) -> list[str]:
+        return pd.read_csv(data_path, nrows=0).columns.tolist()
+
+    def read(self, data_path: Path, columns: list[str], time_window: tuple[float, float] | None = None) -> dict[str, np.ndarray]:
+        # Read only the requested columns into a DataFrame, rows can not be skipped in a text file
+        df = pd.read_csv(data_path, usecols=columns, dtype={column: self.DTYPE for column in columns})
+        logger.info(f"Parse {len(columns)} columns with {len(df)} samples from {data_path}.")
+
+        return {column: df[column].to_numpy() for column in columns}
+
+    def iter_chunks(self, data_path: Path, columns: list[str], chunk_rows: int,
+                    time_window: tuple[float, float] | None = None) -> Iterator[dict[str, np.ndarray]]:
+        # Parse the text chunk by chunk, the caller stops reading after the time window
+        with pd.read_csv(data_path, usecols=columns, dtype={column: self.DTYPE for column in columns},
+                         chunksize=chunk_rows) as chunks:
+            for df in chunks:
+                yield {column: df[column].to_numpy() for column in columns}
+
+
+class ParquetReader(TableReader):
+    """
+    Reader backend for Parquet files, row groups outside the time window are skipped by their statistics
+    """
+
+    def read_header(self, data_path: Path) -> list[str]:
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(data_path).names
+
+    def read(self, data_path: Path, columns: list[str], time_window: tuple[float, float] | None = None) -> dict[str, np.ndarray]:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(data_path)
+        row_groups = list(range(parquet_file.num_row_groups))
+        if time_window is not None:
+            row_groups = self.select_with_margin([self._position(parquet_file.metadata.row_group(row_group), columns[0], time_window)
+                                                  for row_group in row_groups])
+
+        table = parquet_file.read_row_groups(row_groups, columns=columns)
+        logger.info(f"Read {len(row_groups)}/{parquet_file.num_row_groups} row groups with {table.num_rows} samples from {data_path}.")
+
+        arrays = {column: table.column(column).to_numpy().astype(self.DTYPE, copy=False) for column in columns}
+        return self.trim_to_window(arrays, columns[0], time_window)
+
+    def iter_chunks(self, data_path: Path, columns: list[str], chunk_rows: int,
+                    time_window: tuple[float, float] | None = None) -> Iterator[dict[str, np.ndarray]]:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(data_path)
+        row_groups = list(range(parquet_file.num_row_groups))
+        if time_window is not None:
+            row_groups = self.select_with_margin([self._position(parquet_file.metadata.row_group(row_group), columns[0], time_window)
+                                                  for row_group in row_groups])
+
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, row_groups=row_groups, columns=columns):
+            yield {column: batch.column(column).to_numpy(zero_copy_only=False).astype(self.DTYPE, copy=False)
+                   for column in columns}
+
+    @staticmethod
+    def _position(row_group_metadata: Any, time_column: str, time_window: tuple[float, float]) -> int:
+        """
+        Locate a row group relative to the time window with the column statistics
+
+        Parameters
+        ----------
+        row_group_metadata : pyarrow.parquet.RowGroupMetaData
+            Metadata of the row group
+        time_column : str
+            Name of the time column
+        time_window : tuple[float, float]
+            The (start, stop) window
+
+        Returns
+        -------
+        int
+            -1 before the window, 1 after the window and 0 if the row group overlaps the window or has no
+            statistics
+        """
+        for i in range(row_group_metadata.num_columns):
+            column_metadata = row_group_metadata.column(i)
+            if column_metadata.path_in_schema != time_column:
+                continue
+            statistics = column_metadata.statistics
+            if statistics is None or not statistics.has_min_max:
+                return 0
+            return -1 if statistics.max < time_window[0] else 1 if statistics.min > time_window[1] else 0
+        return 0
+
+
+class ArrowIpcReader(TableReader):
+    """
+    Reader backend for Arrow IPC (Feather v2) files, record batches outside the time window are skipped
+    """
+
+    def read_header(self, data_path: Path) -> list[str]:
+        import pyarrow as pa
+
+        with pa.memory_map(str(data_path), 'r') as source:
+            return pa.ipc.open_file(source).schema.names
+
+    def read(self, data_path: Path, columns: list[str], time_window: tuple[float, float] | None = None) -> dict[str, np.ndarray]:
+        import pyarrow as pa
+
+        with pa.memory_map(str(data_path), 'r') as source:
+            ipc_file = pa.ipc.open_file(source)
+            batches = list(range(ipc_file.num_record_batches))
+            if time_window is not None:
+                # the record batches are memory-mapped, so checking the time range does not read the other columns
+                batches = self.select_with_margin([self._position(ipc_file.get_batch(i).column(columns[0]).to_numpy(zero_copy_only=False),
+                                                                  time_window) for i in batches])
+            chunks: dict[str, list] = {column: [] for column in columns}
+            for i in batches:
+                batch = ipc_file.get_batch(i).select(columns)
+                for column, values in zip(columns, batch.columns):
+                    chunks[column].append(values.to_numpy(zero_copy_only=False).astype(self.DTYPE))
+
+        arrays = {column: np.concatenate(values) if values else np.array([], dtype=self.DTYPE) for column, values in chunks.items()}
+        logger.info(f"Read {len(arrays[columns[0]])} samples from {data_path}.")
+        return self.trim_to_window(arrays, columns[0], time_window)
+
+    @staticmethod
+    def _position(time: np.ndarray, time_window: tuple[float, float]) -> int:
+        """
+        Locate a record batch relative to the time window
+
+        Parameters
+        ----------
+        time : np.ndarray
+            The sorted time column of the record batch
+        time_window : tuple[float, float]
+            The (start, stop) window
+
+        Returns
+        -------
+        int
+            -1 before the window, 1 after the window and 0 if the record batch overlaps the window or is empty
+        """
+        if len(time) == 0:
+            return 0
+        return -1 if time[-1] < time_window[0] else 1 if time[0] > time_window[1] else 0
+
+
+class Hdf5Reader(TableReader):
+    """
+    Reader backend for HDF5 files with one 1-D dataset per column
+
+    The time column is given by the ``time_column`` attribute of the root group, otherwise a dataset
+    named ``time`` or ``timestamps`` is used. The time window is located by a binary search on the time
+    dataset, so only the rows within the window are read.
+    """
+    TIME_NAMES = ('time', 'timestamps')
+
+    def read_header(self, data_path: Path) -> list[str]:
+        import h5py
+
+        with h5py.File(data_path, 'r') as h5_file:
+            columns = [name for name, item in h5_file.items() if isinstance(item, h5py.Dataset) and item.ndim == 1]
+            time_column = h5_file.attrs.get('time_column')
+            if time_column is None:
+                time_column = next((name for name in self.TIME_NAMES if name in columns), None)
+            if time_column is None or time_column not in columns:
+                raise ValueError(f"HDF5 file {data_path} has no time dataset")
+
+        return [time_column, *(column for column in columns if column != time_column)]
+
+    def read(self, data_path: Path, columns: list[str], time_window: tuple[float, float] | None = None) -> dict[str, np.ndarray]:
+        import h5py
+
+        with h5py.File(data_path, 'r') as h5_file:
+            time_dataset = h5_file[columns[0]]
+            start, stop = 0, len(time_dataset)
+            if time_window is not None:
+                # binary search on the dataset reads only O(log n) samples
+                start = max(bisect.bisect_left(time_dataset, time_window[0], key=float) - 1, 0)
+                stop = min(bisect.bisect_right(time_dataset, time_window[1], key=float) + 1, len(time_dataset))
+
+            arrays = {column: h5_file[column][start:stop].astype(self.DTYPE) for column in columns}
+
+        logger.info(f"Read {stop - start} samples from {data_path}.")
+        return arrays
+
+
+class MdfReader(DataReader):
+    """
+    Reader backend for ASAM MDF measurement files (MF4, MDF3)
+
+    Only the file index is opened, the channels are decoded on request with their own time raster,
+    so the time of the returned dataset is a dictionary with the time array of each signal.
+    Decoded channels are kept in the dataset cache, so several figures from the same file decode a channel once.
+    """
+    has_time_column = False
+
+    def read_header(self, data_path: Path) -> list[str]:
+        from asammdf import MDF
+
+        with MDF(data_path) as mdf:
+            return list(mdf.channels_db)
+
+    def read_signals(self, data_path: Path, time_column: str | None, signal_columns: dict[str, str],
+                     time_window: tuple[float, float] | None = None) -> tuple[Any, dict[str, Any]]:
+        from asammdf import MDF
+
+        channels: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        with MDF(data_path) as mdf:
+            for channel in dict.fromkeys(signal_columns.values()):
+                key = dataset_cache.make_key(data_path, 'mdf_channel', channel)
+                channel_time, channel_data = dataset_cache.get_or_load(key, lambda channel=channel: self._decode_channel(mdf, channel))
+                if channel in channel_data:
+                    channels[channel] = (channel_time, channel_data[channel])
+
+        times, data = {}, {}
+        for signal_name, channel in signal_columns.items():
+            if channel not in channels:
+                continue
+            arrays = self.trim_to_window({'time': channels[channel][0], 'values': channels[channel][1]}, 'time', time_window)
+            times[signal_name] = arrays['time']
+            data[signal_name] = arrays['values']
+
+        logger.info(f"Read {len(channels)} channels from {data_path}.")
+        return times, data
+
+    def _decode_channel(self, mdf: Any, channel: str) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Decode the samples and the time raster of a channel
+
+        Parameters
+        ----------
+        mdf : asammdf.MDF
+            The opened measurement file
+        channel : str
+            Name of the channel, the first occurrence is used for duplicated names
+
+        Returns
+        -------
+        tuple
+            containing the time and a data dictionary with the channel samples, which is empty
+            for non-numeric channels
+        """
+        group, index = mdf.channels_db[channel][0]
+        signal = mdf.get(channel, group=group, index=index)
+        if not np.issubdtype(signal.samples.dtype, np.number):
+            # use the raw values of value-to-text conversions, e.g. for enum signals
+            signal = mdf.get(channel, group=group, index=index, raw=True)
+        if not np.issubdtype(signal.samples.dtype, np.number):
+            logger.warning(f"Channel {channel} has no numeric samples. Skipping.")
+            return signal.timestamps.astype(self.DTYPE), {}
+
+        logger.debug(f"Decode channel {channel} with {len(signal.samples)} samples.")
+        return signal.timestamps.astype(self.DTYPE), {channel: signal.samples.astype(self.DTYPE)}
+
+
+READERS: dict[str, type[DataReader]] = {
+    '.csv': CsvReader,
+    '.parquet': ParquetReader,
+    '.pq': ParquetReader,
+    '.arrow': ArrowIpcReader,
+    '.feather': ArrowIpcReader,
+    '.ipc': ArrowIpcReader,
+    '.h5': Hdf5Reader,
+    '.hdf5': Hdf5Reader,
+    '.hdf': Hdf5Reader,
+    '.mf4': MdfReader,
+    '.mdf': MdfReader,
+}
+
+
+def get_reader(data_path: Path) -> DataReader:
+    """
+    Get the reader backend for a data file by its extension
+
+    Parameters
+    ----------
+    data_path : Path
+        Path to the data file
+
+    Returns
+    -------
+    DataReader
+        The reader backend
+    """
+    reader_class = READERS.get(Path(data_path).suffix.lower())
+    if reader_class is None:
+        raise ValueError(f"Unsupported data file format: {data_path}")
+
+    return reader_class()
+
 
 class DataProvider:
     """
-    Data provider class (temporary) to load data from a CSV file
+    Data provider class to load data from a recording
+
+    The reader backend is chosen by the file extension. The first column of the file is used as time,
+    only the columns of the requested signals are read. Parsed CSV columns are stored in the sidecar
+    cache and memory-mapped on later runs.
+
+    Files larger than ``min_file_size`` of the ``[streaming]`` settings are streamed instead: the rows
+    are read in chunks, filtered to the time window and reduced to the first, minimum, maximum and last
+    sample of each pixel column. The memory then depends on the chunk size and the output resolution,
+    not on the size of the file.
     """
     def __init__(self):
         self.time = np.array([])
-        self.data = np.array([])
+        self.data = {}
+        self.pyramids: dict[str, SignalPyramid] = {}
+        # key of the loaded dataset to cache results derived from it
+        self.key: tuple | None = None
 
-    def load_data(self, data_path: Path) -> tuple[Any, dict[str, Any]]:
+    def load_data(self, data_path: Path, signals: dict[str, str] | list[str] | None = None,
+                  time_window: tuple[float, float] | None = None, use_cache: bool = True,
+                  build_pyramids: bool = False, streaming_columns: int | None = None) -> tuple[Any, dict[str, Any]]:
         """
-        Load data from a CSV file
+        Load data from a recording
+
+        The loaded arrays are shared through the dataset cache, so a file is only parsed once per run.
 
         Parameters
         ----------
         data_path : Path
-            Path to the CSV file
+            Path to the data file
+        signals : dict[str, str] | list[str] | None, optional
+            Mapping of signal names (aliases) to column names or a list of column names to load,
+            by default None to load all columns
+        time_window : tuple[float, float] | None, optional
+            The (start, stop) time window pushed down to the reader backend, by default None to load all samples
+        use_cache : bool, optional
+            Whether to get the data from the dataset cache, by default True
+        build_pyramids : bool, optional
+            Whether to build the min/max pyramids of the signals into ``pyramids``, by default False
+        streaming_columns : int | None, optional
+            The number of pixel columns of the time window kept when a large file is streamed, by default
+            None to always load all samples. Streamed signals have their own time array each and no pyramids.
 
         Returns
         -------
         tuple
             containing time and data dictionary
         """
-        # Read the CSV file into a DataFrame
-        df = pd.read_csv(data_path)
+        reader = get_reader(data_path)
+        time_column, signal_columns = self._resolve_signal_columns(data_path, signals, reader)
+        self.key = dataset_cache.make_key(data_path, time_window)
 
-        # Ensure the DataFrame has at least two columns
-        if df.shape[1] < 2:
-            raise ValueError("CSV file must contain at least two columns")
+        if self._use_streaming(reader, data_path, time_window, streaming_columns):
+            key = dataset_cache.make_key(data_path, tuple(sorted(signal_columns.items())), time_window,
+                                         'streaming', streaming_columns)
+            def load() -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+                return self._load_streaming(reader, data_path, time_column, signal_columns, time_window,
+                                            streaming_columns)
 
-        # Extract the first column as timestamp and the second column as signal_data
-        self.time = df.iloc[:, 0].values
-        AWV_Warnung = df.iloc[:, 1].values
+            self.time, self.data = dataset_cache.get_or_load(key, load) if use_cache else load()
+            self.pyramids = {}
+            return self.time, self.data
 
-        # Create and return the dictionary with the required format
-        self.data = {
-            'AWV_Warnung': AWV_Warnung
-        }
+        if use_cache:
+            key = dataset_cache.make_key(data_path, tuple(sorted(signal_columns.items())), time_window)
+            self.time, self.data = dataset_cache.get_or_load(
+                key, lambda: self._load(reader, data_path, time_column, signal_columns, time_window))
+        else:
+            self.time, self.data = self._load(reader, data_path, time_column, signal_columns, time_window)
+
+        if build_pyramids:
+            self.pyramids = self._load_pyramids(reader, data_path, time_column, signal_columns, time_window)
 
         return self.time, self.data
+
+    def iter_chunks(self, data_path: Path, signals: dict[str, str] | list[str] | None = None,
+                    time_window: tuple[float, float] | None = None,
+                    chunk_rows: int | None = None) -> Iterator[tuple[np.ndarray, dict[str, np.ndarray]]]:
+        """
+        Read a recording with a time column in chunks of rows within a time window
+
+        The chunks keep one sample of margin on each side of the window like ``trim_to_window``,
+        the file is only read up to the first sample after the window.
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        signals : dict[str, str] | list[str] | None, optional
+            Mapping of signal names (aliases) to column names or a list of column names to load,
+            by default None to load all columns
+        time_window : tuple[float, float] | None, optional
+            The (start, stop) time window, by default None to read all rows
+        chunk_rows : int | None, optional
+            The number of rows read at once, by default ``chunk_rows`` of the ``[streaming]`` settings
+
+        Yields
+        ------
+        tuple
+            containing time and data dictionary of each chunk
+        """
+        reader = get_reader(data_path)
+        if not isinstance(reader, TableReader):
+            raise ValueError(f"Data file {data_path} has no time column to be read in chunks")
+        time_column, signal_columns = self._resolve_signal_columns(data_path, signals, reader)
+        if chunk_rows is None:
+            chunk_rows = SettingsParser(Path("config/application_settings.ini")).get("streaming", "chunk_rows", 1_000_000)
+
+        columns = [time_column, *dict.fromkeys(signal_columns.values())]
+        for arrays in self._iter_window(reader.iter_chunks(data_path, columns, chunk_rows, time_window),
+                                        time_column, time_window):
+            yield arrays[time_column], {signal_name: arrays[column] for signal_name, column in signal_columns.items()}
+
+    @staticmethod
+    def is_large(data_path: Path) -> bool:
+        """
+        Check whether a data file is streamed instead of loaded at once
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+
+        Returns
+        -------
+        bool
+            True if the file is at least ``min_file_size`` of the ``[streaming]`` settings
+        """
+        min_file_size = SettingsParser(Path("config/application_settings.ini")).get("streaming", "min_file_size", 512 * 1024 ** 2)
+        return Path(data_path).stat().st_size >= min_file_size
+
+    def _use_streaming(self, reader: DataReader, data_path: Path, time_window: tuple[float, float] | None,
+                       streaming_columns: int | None) -> bool:
+        """
+        Select the streaming load of a large file
+
+        Parameters
+        ----------
+        reader : DataReader
+            The reader backend of the data file
+        data_path : Path
+            Path to the data file
+        time_window : tuple[float, float] | None
+            The (start, stop) time window
+        streaming_columns : int | None
+            The number of pixel columns of the time window
+
+        Returns
+        -------
+        bool
+            True if the file is streamed
+        """
+        if not streaming_columns or not self.is_large(data_path):
+            return False
+        if not isinstance(reader, TableReader) or time_window is None:
+            logger.warning(f"Load large file {data_path} at once, streaming requires a time column and a time window.")
+            return False
+        return True
+
+    def _load_streaming(self, reader: TableReader, data_path: Path, time_column: str, signal_columns: dict[str, str],
+                        time_window: tuple[float, float], n_columns: int) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+        """
+        Stream the rows within the time window and reduce each signal to its pixel columns
+
+        Parameters
+        ----------
+        reader : TableReader
+            The reader backend of the data file
+        data_path : Path
+            Path to the data file
+        time_column : str
+            Name of the time column
+        signal_columns : dict[str, str]
+            Mapping of signal names to column names
+        time_window : tuple[float, float]
+            The (start, stop) time window
+        n_columns : int
+            The number of pixel columns of the time window
+
+        Returns
+        -------
+        tuple
+            containing the time dictionary and the data dictionary of the reduced signals
+        """
+        chunk_rows = SettingsParser(Path("config/application_settings.ini")).get("streaming", "chunk_rows", 1_000_000)
+        columns = [time_column, *dict.fromkeys(signal_columns.values())]
+        accumulators = {column: MinMaxAccumulator(time_window, n_columns) for column in columns[1:]}
+
+        n_rows = 0
+        for arrays in self._iter_window(reader.iter_chunks(data_path, columns, chunk_rows, time_window),
+                                        time_column, time_window):
+            n_rows += len(arrays[time_column])
+            for column, accumulator in accumulators.items():
+                accumulator.add(arrays[time_column], arrays[column])
+
+        reduced = {column: accumulator.result() for column, accumulator in accumulators.items()}
+        logger.info(f"Stream {n_rows} samples of {len(accumulators)} signals from {data_path} "
+                    f"in chunks of {chunk_rows} rows into {n_columns} pixel columns.")
+
+        # Each reduced signal has its own time array, signals of the same column share the arrays
+        time = {signal_name: reduced[column][0] for signal_name, column in signal_columns.items()}
+        data = {signal_name: reduced[column][1] for signal_name, column in signal_columns.items()}
+        return time, data
+
+    @staticmethod
+    def _iter_window(chunks: Iterator[dict[str, np.ndarray]], time_column: str,
+                     time_window: tuple[float, float] | None) -> Iterator[dict[str, np.ndarray]]:
+        """
+        Filter chunks of sorted rows to a time window, keeping one sample of margin on each side
+
+        Parameters
+        ----------
+        chunks : Iterator[dict[str, np.ndarray]]
+            The chunks of the columns
+        time_column : str
+            Name of the sorted time column
+        time_window : tuple[float, float] | None
+            The (start, stop) window or None to keep all rows
+
+        Yields
+        ------
+        dict[str, np.ndarray]
+            The rows of each chunk within the time window
+        """
+        if time_window is None:
+            yield from chunks
+            return
+
+        # the last row before the window, until the first row within the window is found
+        margin = None
+        for arrays in chunks:
+            time = arrays[time_column]
+            first = int(np.searchsorted(time, time_window[0], side='left'))
+            last = int(np.searchsorted(time, time_window[1], side='right'))
+            if first == len(time):
+                if len(time):
+                    margin = {column: values[-1:] for column, values in arrays.items()}
+                continue
+
+            if first > 0:
+                margin = {column: values[first - 1:first] for column, values in arrays.items()}
+            window = slice(first, min(last + 1, len(time)))
+            if margin is not None:
+                yield {column: np.concatenate((margin[column], values[window])) for column, values in arrays.items()}
+                margin = None
+            else:
+                yield {column: values[window] for column, values in arrays.items()}
+
+            # the first row after the window is read, so the rest of the file is skipped
+            if last < len(time):
+                return
+
+        if margin is not None:
+            yield margin
+
+    def _load_pyramids(self, reader: DataReader, data_path: Path, time_column: str | None, signal_columns: dict[str, str],
+                       time_window: tuple[float, float] | None) -> dict[str, SignalPyramid]:
+        """
+        Load or build the min/max pyramids of the loaded signals
+
+        The pyramids of CSV files are built from the complete columns of the sidecar cache and persisted
+        next to them, the pyramids of the other files from the loaded samples. All pyramids are shared
+        through the dataset cache.
+
+        Parameters
+        ----------
+        reader : DataReader
+            The reader backend of the data file
+        data_path : Path
+            Path to the data file
+        time_column : str | None
+            Name of the time column, None if each signal has its own time raster
+        signal_columns : dict[str, str]
+            Mapping of signal names to column names
+        time_window : tuple[float, float] | None
+            The (start, stop) time window of the loaded samples
+
+        Returns
+        -------
+        dict[str, SignalPyramid]
+            The pyramid of each signal
+        """
+        full_columns = {}
+        if reader.use_sidecar_cache:
+            full_columns = sidecar_cache.read(data_path, [time_column, *dict.fromkeys(signal_columns.values())])
+
+        pyramids = {}
+        for signal_name, column in signal_columns.items():
+            if signal_name not in self.data:
+                continue
+            if time_column in full_columns and column in full_columns:
+                time, values, window, persist = full_columns[time_column], full_columns[column], None, True
+            else:
+                time = self.time.get(signal_name) if isinstance(self.time, dict) else self.time
+                values, window, persist = self.data[signal_name], time_window, False
+
+            def build_pyramid(time=time, values=values, column=column, persist=persist):
+                pyramid = sidecar_cache.read_pyramid(data_path, column, time, values) if persist else None
+                if pyramid is None:
+                    pyramid = SignalPyramid(time, values)
+                    if persist:
+                        sidecar_cache.write_pyramid(data_path, column, pyramid)
+                return pyramid
+
+            key = dataset_cache.make_key(data_path, 'pyramid', column, window)
+            pyramids[signal_name] = dataset_cache.get_or_load(key, build_pyramid)
+
+        logger.info(f"Load min/max pyramids of {len(pyramids)} signals of {data_path}.")
+        return pyramids
+
+    @staticmethod
+    def _resolve_signal_columns(data_path: Path, signals: dict[str, str] | list[str] | None,
+                                reader: DataReader) -> tuple[str | None, dict[str, str]]:
+        """
+        Match the requested signals with the columns of the data file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        signals : dict[str, str] | list[str] | None
+            Mapping of signal names to column names, list of column names or None for all columns
+        reader : DataReader
+            The reader backend of the data file
+
+        Returns
+        -------
+        tuple
+            containing the time column name (None without a time column) and the mapping of signal names
+            to the available column names
+        """
+        columns = reader.read_header(data_path)
+        time_column = columns.pop(0) if reader.has_time_column and columns else None
+
+        # Ensure the file has at least one signal column
+        if not columns:
+            raise ValueError("Data file must contain at least one signal column besides the time")
+
+        if signals is None:
+            return time_column, {column: column for column in columns}
+        if not isinstance(signals, dict):
+            signals = {signal: signal for signal in signals}
+
+        available_columns = set(columns)
+        signal_columns = {}
+        for signal_name, column in signals.items():
+            if column not in available_columns:
+                logger.warning(f"Column {column} of signal {signal_name} not found in {data_path}.")
+                continue
+            signal_columns[signal_name] = column
+
+        return time_column, signal_columns
+
+    @staticmethod
+    def _load(reader: DataReader, data_path: Path, time_column: str | None, signal_columns: dict[str, str],
+              time_window: tuple[float, float] | None) -> tuple[Any, dict[str, Any]]:
+        """
+        Load time and the projected signal columns with the reader backend
+
+        For CSV files only the columns missing in the sidecar cache are parsed and added to the cache,
+        the other files are read by their backend directly.
+
+        Parameters
+        ----------
+        reader : DataReader
+            The reader backend of the data file
+        data_path : Path
+            Path to the data file
+        time_column : str | None
+            Name of the time column, None if each signal has its own time raster
+        signal_columns : dict[str, str]
+            Mapping of signal names to column names
+        time_window : tuple[float, float] | None
+            The (start, stop) time window or None to load all samples
+
+        Returns
+        -------
+        tuple
+            containing time and data dictionary
+        """
+        if not isinstance(reader, TableReader) or not reader.use_sidecar_cache:
+            return reader.read_signals(data_path, time_column, signal_columns, time_window)
+
+        columns = [time_column, *dict.fromkeys(signal_columns.values())]
+        arrays = sidecar_cache.read(data_path, columns)
+        missing_columns = [column for column in columns if column not in arrays]
+        if missing_columns:
+            parsed_arrays = reader.read(data_path, missing_columns)
+            sidecar_cache.write(data_path, parsed_arrays)
+            # prefer the memory-mapped arrays once they are written
+            arrays.update(parsed_arrays)
+            arrays.update(sidecar_cache.read(data_path, missing_columns))
+        else:
+            logger.info(f"Load {len(columns) - 1} signals from sidecar cache of {data_path}.")
+        arrays = reader.trim_to_window(arrays, time_column, time_window)
+
+        # Expose each signal under its name, signals of the same column share the array
+        time = arrays[time_column]
+        data = {signal_name: arrays[column] for signal_name, column in signal_columns.items()}
+
+        return time, data
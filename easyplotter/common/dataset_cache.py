@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""A module for caching loaded datasets in memory
+"""
+from collections import OrderedDict
+from pathlib import Path
+import threading
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from easyplotter.common.cache_utils import file_fingerprint
+from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+
+
+class DatasetCache:
+    """An in-memory LRU cache for loaded datasets
+
+    The cache key is built from the resolved path, the modification time and the size of the data file,
+    so a changed file is loaded again. The total size of all cached arrays is bounded by ``max_bytes``,
+    the least recently used datasets are evicted first.
+    """
+    def __init__(self, max_bytes: int = 1024 ** 3) -> None:
+        """
+        Initialize dataset cache with a memory limit
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            The maximum number of bytes held by the cache, by default 1 GiB
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current_bytes(self) -> int:
+        """A getter property for the number of bytes held by the cache
+
+        Returns
+        -------
+        int
+            The number of bytes of all cached arrays
+        """
+        return self._current_bytes
+
+    @staticmethod
+    def make_key(data_path: Path, *extra: Hashable) -> tuple:
+        """
+        Create the cache key of a data file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the data file
+        extra : Hashable
+            Additional parts of the key, e.g. the loaded columns
+
+        Returns
+        -------
+        tuple
+            The cache key built from resolved path, mtime and size
+        """
+        return file_fingerprint(data_path) + extra
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """
+        Get a dataset from the cache or load it with the loader
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, see ``make_key``
+        loader : Callable[[], Any]
+            The function to load the dataset on a cache miss, e.g. returning time and data dictionary
+
+        Returns
+        -------
+        Any
+            The cached dataset
+        """
+        dataset = self.get(key)
+        if dataset is not None:
+            return dataset
+
+        dataset = loader()
+        self._freeze(dataset)
+        self.put(key, dataset)
+        return dataset
+
+    def get(self, key: tuple) -> Any | None:
+        """
+        Get a dataset from the cache
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, see ``make_key``
+
+        Returns
+        -------
+        Any | None
+            The cached dataset or None on a cache miss
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Dataset cache hit: {key[0]}")
+                return self._entries[key][0]
+            self.misses += 1
+
+        logger.debug(f"Dataset cache miss: {key[0]}")
+        return None
+
+    def put(self, key: tuple, dataset: Any) -> None:
+        """
+        Put a dataset into the cache and evict old entries if the memory limit is exceeded
+
+        Parameters
+        ----------
+        key : tuple
+            The cache key, see ``make_key``
+        dataset : Any
+            The dataset, e.g. containing time and data dictionary
+        """
+        size = self._nbytes(dataset)
+        if size > self.max_bytes:
+            logger.warning(f"Dataset {key[0]} with {size} bytes exceeds the cache limit of {self.max_bytes} bytes, skip caching.")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (dataset, size)
+            self._current_bytes += size
+
+            while self._current_bytes > self.max_bytes:
+                evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                self.evictions += 1
+                logger.debug(f"Evict dataset {evicted_key[0]} from cache.")
+
+    def clear(self) -> None:
+        """
+        Remove all datasets and reset the statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def report(self) -> None:
+        """
+        Log the hit and miss counts of the cache
+        """
+        logger.info(f"Dataset cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+                    f"{self._current_bytes} bytes in {len(self._entries)} datasets.")
+
+    @classmethod
+    def _nbytes(cls, dataset: Any) -> int:
+        """
+        Count the bytes of all arrays of a dataset
+
+        Parameters
+        ----------
+        dataset : Any
+            An array, an object with a ``nbytes`` property or a tuple, list or dictionary of those
+
+        Returns
+        -------
+        int
+            The number of bytes
+        """
+        if isinstance(dataset, (tuple, list)):
+            return sum(cls._nbytes(item) for item in dataset)
+        if isinstance(dataset, dict):
+            return sum(cls._nbytes(item) for item in dataset.values())
+        return getattr(dataset, 'nbytes', 0)
+
+    @classmethod
+    def _freeze(cls, dataset: Any) -> None:
+        """
+        Mark all arrays of a dataset as read-only, since they are shared between the callers
+
+        Parameters
+        ----------
+        dataset : Any
+            An array or a tuple, list or dictionary of arrays
+        """
+        if isinstance(dataset, (tuple, list)):
+            for item in dataset:
+                cls._freeze(item)
+        elif isinstance(dataset, dict):
+            for item in dataset.values():
+                cls._freeze(item)
+        elif isinstance(dataset, np.ndarray) and dataset.flags.writeable:
+            dataset.flags.writeable = False
+
+
+# create shared dataset cache instance
+dataset_cache = DatasetCache(SettingsParser(Path("config/application_settings.ini")).get("dataset_cache", "max_bytes", 1024 ** 3))
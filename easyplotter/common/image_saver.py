@@ -1,26 +1,649 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields, replace
+import functools
+import json
+import logging
+import os
 from pathlib import Path
+import threading
+import traceback
+from typing import Callable
+
+import matplotlib
+import matplotlib.image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import Collection
+import numpy as np
+import PIL.Image
+
 from easyplotter.common.logger import Logger
+from easyplotter.common.render_cache import render_cache
+from easyplotter.common.settings_parser import SettingsParser
+
+
+FORMATS = ('png', 'webp', 'jpeg', 'svg', 'pdf')
+VECTOR_FORMATS = ('svg', 'pdf')
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    """The file format, resolution and compression of a saved plot
+
+    The raster formats are encoded by Pillow: ``png_compression`` is the zlib level of PNG files from 0
+    (fastest, largest) to 9 (slowest, smallest) and ``quality`` the quality of JPEG and WebP files from
+    1 to 100. The vector formats are written by matplotlib, ``dpi`` only applies to embedded images.
+    A ``dpi`` of "figure" keeps the resolution of the figure. The ``sizes`` are additional raster images
+    resampled from the same drawing, e.g. thumbnails, see ``OutputSize``. In vector formats, the lines and
+    collections with more than ``rasterize_threshold`` points are embedded as images with the resolution
+    ``dpi``, 0 keeps all artists as vectors.
+    """
+    format: str = 'png'
+    dpi: float | str = 'figure'
+    png_compression: int = 6
+    quality: int = 90
+    sizes: tuple['OutputSize', ...] = ()
+    rasterize_threshold: int = 10000
+
+    def __post_init__(self) -> None:
+        """
+        Normalize and check the format, the compression and parse the additional sizes
+        """
+        object.__setattr__(self, 'format', normalize_format(self.format))
+        if self.format == 'png' and not 0 <= int(self.png_compression) <= 9:
+            raise ValueError(f"Invalid PNG compression {self.png_compression}, expected 0 to 9.")
+        if self.format in ('jpeg', 'webp') and not 1 <= int(self.quality) <= 100:
+            raise ValueError(f"Invalid {self.format.upper()} quality {self.quality}, expected 1 to 100.")
+        if isinstance(self.sizes, (str, list)):
+            # a comma separated string of the settings file or a list of the plot configuration
+            values = self.sizes.split(',') if isinstance(self.sizes, str) else self.sizes
+            object.__setattr__(self, 'sizes', tuple(OutputSize.parse(value) for value in values if str(value).strip()))
+        for size in self.sizes:
+            # the quality of a size is checked in the format it is saved in
+            size.get_format(self)
+
+    @property
+    def suffix(self) -> str:
+        """A getter property for the file suffix
+
+        Returns
+        -------
+        str
+            The suffix without dot, e.g. "png"
+        """
+        return 'jpg' if self.format == 'jpeg' else self.format
+
+    @property
+    def is_vector(self) -> bool:
+        """A getter property for vector formats
+
+        Returns
+        -------
+        bool
+            True for SVG and PDF
+        """
+        return self.format in VECTOR_FORMATS
+
+    @property
+    def pil_kwargs(self) -> dict:
+        """A getter property for the encoder options of Pillow
+
+        Returns
+        -------
+        dict
+            The compression level of PNG or the quality of JPEG and WebP, empty for vector formats
+        """
+        if self.format == 'png':
+            return {'compress_level': int(self.png_compression)}
+        if self.format in ('jpeg', 'webp'):
+            return {'quality': int(self.quality)}
+        return {}
+
+    def get_dpi(self, figure) -> float:
+        """
+        Get the resolution of a figure in this format
+
+        Parameters
+        ----------
+        figure : matplotlib.figure.Figure
+            The saved figure
+
+        Returns
+        -------
+        float
+            The dots per inch
+        """
+        return figure.dpi if self.dpi == 'figure' else float(self.dpi)
+
+    def resolve(self, overrides: dict | None = None) -> 'OutputFormat':
+        """
+        Override the settings for a single plot
+
+        Parameters
+        ----------
+        overrides : dict | None, optional
+            The "output" entry of a plot configuration, e.g. {"format": "webp", "quality": 80},
+            by default None to keep these settings
+
+        Returns
+        -------
+        OutputFormat
+            The output format of the plot
+        """
+        if not overrides:
+            return self
+        names = {field.name for field in fields(self)}
+        return replace(self, **{name: value for name, value in overrides.items() if name in names})
+
+
+@dataclass(frozen=True)
+class OutputSize:
+    """An additional size of a saved plot, resampled from the drawing of the full size image
+
+    A size is configured as "name::width[::format[::quality]]", e.g. "thumb::320::webp::70". The height
+    follows from the aspect ratio of the figure and the quality is the quality of JPEG and WebP or the
+    zlib level of PNG. Without format and quality the settings of the full size image are used, a size
+    of a vector image is saved as PNG.
+    """
+    name: str
+    width: int
+    format: str | None = None
+    quality: int | None = None
+
+    @classmethod
+    def parse(cls, value: str) -> 'OutputSize':
+        """
+        Create a size from its configuration
+
+        Parameters
+        ----------
+        value : str
+            The size as "name::width[::format[::quality]]"
+
+        Returns
+        -------
+        OutputSize
+            The parsed size
+        """
+        parts = [part.strip() for part in str(value).split('::')]
+        if len(parts) < 2 or len(parts) > 4 or not parts[0]:
+            raise ValueError(f"Invalid output size {value}, expected name::width[::format[::quality]].")
+        output_format = normalize_format(parts[2]) if len(parts) > 2 and parts[2] else None
+        if output_format in VECTOR_FORMATS:
+            raise ValueError(f"Invalid output size {value}, the sizes are resampled raster images.")
+        quality = int(parts[3]) if len(parts) > 3 else None
+        return cls(name=parts[0], width=max(int(parts[1]), 1), format=output_format, quality=quality)
+
+    def get_format(self, output_format: OutputFormat) -> OutputFormat:
+        """
+        Get the format of this size
+
+        Parameters
+        ----------
+        output_format : OutputFormat
+            The format of the full size image
+
+        Returns
+        -------
+        OutputFormat
+            The format of the resampled image
+        """
+        changes = {'format': self.format or ('png' if output_format.is_vector else output_format.format), 'sizes': ()}
+        if self.quality is not None:
+            changes.update(quality=self.quality, png_compression=self.quality)
+        return replace(output_format, **changes)
+
+
+def normalize_format(output_format: str) -> str:
+    """Normalize and check the name of an output format
+
+    Parameters
+    ----------
+    output_format : str
+        The name of the format, e.g. "PNG" or "jpg"
+
+    Returns
+    -------
+    str
+        The format in lower case, "jpeg" for "jpg"
+    """
+    normalized = str(output_format).strip().lower()
+    normalized = 'jpeg' if normalized == 'jpg' else normalized
+    if normalized not in FORMATS:
+        raise ValueError(f"Unknown output format {output_format}, expected one of {', '.join(FORMATS)}.")
+    return normalized
+
+
+class ImageWriter:
+    """A pool of threads encoding and writing rasterized plots in the background
+
+    At most ``max_pending`` images are queued or being written, a further image blocks the caller until
+    one is written, so the memory of the buffers stays bounded. The errors of the writes are collected
+    and returned by ``flush``.
+    """
+    def __init__(self, threads: int = 2, max_pending: int = 4) -> None:
+        """
+        Initialize image writer
+
+        Parameters
+        ----------
+        threads : int, optional
+            The number of writing threads, by default 2
+        max_pending : int, optional
+            The maximum number of images queued or being written, by default 4
+        """
+        self.threads = max(threads, 1)
+        self.max_pending = max(max_pending, 1)
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending: list[tuple[str, Path, Future]] = []
+        self._deferred: list[tuple[list[Path], Callable[[], None]]] = []
+        self._pid = os.getpid()
+
+    def submit(self, plot_id: str, output_file: Path, write: Callable[[], None]) -> None:
+        """
+        Queue the write of an image, blocks while ``max_pending`` images are pending
+
+        Parameters
+        ----------
+        plot_id : str
+            Unique identifier for the plot, used in the error messages
+        output_file : Path
+            The written file
+        write : Callable[[], None]
+            The function encoding and writing the image
+        """
+        if self._executor is None or self._pid != os.getpid():
+            # threads are not inherited by forked worker processes, so each process gets its own pool
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="image_writer")
+            self._slots = threading.BoundedSemaphore(self.max_pending)
+            self._pending, self._deferred, self._pid = [], [], os.getpid()
+
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(write)
+        except BaseException:
+            self._slots.release()
+            raise
+        slots = self._slots
+        future.add_done_callback(lambda _: slots.release())
+        self._pending.append((plot_id, Path(output_file), future))
+
+    def defer(self, output_files: list[Path], callback: Callable[[], None]) -> None:
+        """
+        Call a function with the next flush, if all files have been written without error
+
+        Parameters
+        ----------
+        output_files : list[Path]
+            The files which have to be written
+        callback : Callable[[], None]
+            The function to call, e.g. storing the files in the render cache
+        """
+        self._deferred.append(([Path(output_file) for output_file in output_files], callback))
+
+    def flush(self) -> dict[str, str]:
+        """
+        Wait for all pending writes and call the deferred functions of the written files
+
+        Returns
+        -------
+        dict[str, str]
+            The error messages of the failed writes by output file
+        """
+        pending, self._pending = self._pending, []
+        deferred, self._deferred = self._deferred, []
+        errors = {}
+        for plot_id, output_file, future in pending:
+            try:
+                future.result()
+            except Exception:
+                errors[str(output_file)] = f"Failed to write plot {plot_id} to {output_file}:\n{traceback.format_exc()}"
+
+        for output_files, callback in deferred:
+            if not any(str(output_file) in errors for output_file in output_files):
+                callback()
+        return errors
 
 
 class ImageSaver:
-    def __init__(self, output_dir: Path):
-        # Initialize logger
-        self.logger = Logger(__name__, "DEBUG", Path("logs"), True).singleton_logger
+    # metadata without timestamps, so the same plot is always saved with the same bytes
+    METADATA = {
+        'png': {},
+        'webp': None,
+        'jpeg': None,
+        'pdf': {'CreationDate': None, 'ModDate': None},
+        'svg': {'Date': None},
+    }
+    # fixed salt of the SVG element ids, which are random otherwise
+    SVG_HASH_SALT = "easyplotter"
+
+    def __init__(self, output_dir: Path, writer: ImageWriter | None = None, output_format: OutputFormat | None = None,
+                 saver_logger: logging.Logger | None = None):
+        # Initialize logger, the savers of many output directories share one logger and its log file
+        self.logger = saver_logger or Logger(__name__, "DEBUG", Path("logs"), True).singleton_logger
 
         self.output_dir = output_dir
+        # Write the images in the background, None to write them directly
+        self.writer = writer
+        # The output format of all plots, a plot can override it with its "output" entry
+        self.output_format = output_format or default_output_format
 
-    def save(self, figure, plot_id: str) -> None:
+    def save(self, figure, plot_id: str, output: dict | None = None) -> Path:
         """
         Save the plot to a file
 
+        The file contains no timestamps, so saving the same plot again gives the same bytes. With a writer,
+        a raster image is only rasterized and encoded and written in the background, the figure can be
+        changed as soon as this method returns. The writes are completed by ``ImageWriter.flush``. Vector
+        images are always written directly. The additional sizes of the output format are saved as well,
+        see ``save_all``.
+
         Parameters
         ----------
         figure : matplotlib.figure.Figure
             to save
         plot_id : str
             Unique identifier for the plot
+        output : dict | None, optional
+            The "output" entry of the plot configuration overriding the output format, by default None
+
+        Returns
+        -------
+        Path
+            The path of the saved full size file
         """
-        output_file = self.output_dir / f"{plot_id}.png"
-        figure.savefig(output_file)
+        return self.save_all(figure, plot_id, output)[0]
+
+    def save_all(self, figure, plot_id: str, output: dict | None = None) -> list[Path]:
+        """
+        Save the plot to a full size file and a file per additional size of the output format
+
+        All raster images are encoded from a single Agg drawing of the figure, the additional sizes are
+        resampled from its buffer, so a thumbnail only costs a resize and an encoding. The file of a size
+        is named "<plot_id>_<size name>.<suffix>".
+
+        Parameters
+        ----------
+        figure : matplotlib.figure.Figure
+            to save
+        plot_id : str
+            Unique identifier for the plot
+        output : dict | None, optional
+            The "output" entry of the plot configuration overriding the output format, by default None
+
+        Returns
+        -------
+        list[Path]
+            The paths of the saved files, the full size file first
+        """
+        output_format = self.output_format.resolve(output)
+        output_file = self.output_dir / f"{plot_id}.{output_format.suffix}"
+        dpi = output_format.get_dpi(figure)
+        is_agg = isinstance(figure.canvas, FigureCanvasAgg)
+        # the old file might be a hardlink into the render cache, which must not be overwritten
+        output_file.unlink(missing_ok=True)
+
+        # the raster images encoded from the buffer: output file, format and width in pixels
+        raster_images: list[tuple[Path, OutputFormat, int | None]] = []
+        if output_format.is_vector:
+            # dense signals are embedded as images, so the file size is bounded by the resolution
+            dense_artists = self.rasterize_dense_artists(figure, output_format.rasterize_threshold)
+            try:
+                with matplotlib.rc_context({'svg.hashsalt': self.SVG_HASH_SALT}):
+                    figure.savefig(output_file, format=output_format.format, dpi=dpi, metadata=self.METADATA[output_format.format])
+            finally:
+                for artist in dense_artists:
+                    artist.set_rasterized(False)
+            self.logger.info(f"Save the plot to {output_file}, {len(dense_artists)} dense artists are rasterized.")
+        elif not is_agg or (self.writer is None and not output_format.sizes):
+            figure.savefig(output_file, format=output_format.format, dpi=dpi, metadata=self.METADATA[output_format.format],
+                           pil_kwargs=output_format.pil_kwargs)
+            self.logger.info(f"Save the plot to {output_file}.")
+        else:
+            raster_images.append((output_file, output_format, None))
+
+        if output_format.sizes and not is_agg:
+            self.logger.warning(f"The canvas of plot {plot_id} has no Agg buffer, the additional sizes are not saved.")
+        elif is_agg:
+            for size in output_format.sizes:
+                size_format = size.get_format(output_format)
+                raster_images.append((self.output_dir / f"{plot_id}_{size.name}.{size_format.suffix}", size_format, size.width))
+        if not raster_images:
+            return [output_file]
+
+        # a single drawing for all raster images, copied for the writer since the figure is reused for the next plot
+        buffer = self.render_buffer(figure, dpi)
+        if self.writer is not None:
+            buffer = np.array(buffer)
+        for image_file, image_format, width in raster_images:
+            image_file.unlink(missing_ok=True)
+            if self.writer is None:
+                self._write_buffer(buffer, image_file, image_format, dpi, width)
+            else:
+                self.writer.submit(plot_id, image_file,
+                                   functools.partial(self._write_buffer, buffer, image_file, image_format, dpi, width))
+        return [output_file] + [image_file for image_file, _, width in raster_images if width is not None]
+
+    @staticmethod
+    def rasterize_dense_artists(figure, threshold: int) -> list:
+        """
+        Rasterize the lines and collections of the axes with more points than a threshold
+
+        Axes, texts, grids and sparse artists stay vectors. The flag is only set on artists which are not
+        rasterized yet, so it can be reset with ``set_rasterized(False)`` after saving.
+
+        Parameters
+        ----------
+        figure : matplotlib.figure.Figure
+            The figure to save as vector image
+        threshold : int
+            The maximum number of points of a vector artist, 0 to rasterize nothing
+
+        Returns
+        -------
+        list
+            The newly rasterized artists
+        """
+        if threshold <= 0:
+            return []
+
+        dense_artists = []
+        for axes in figure.axes:
+            for artist in [*axes.lines, *axes.collections]:
+                if artist.get_rasterized() or not artist.get_visible():
+                    continue
+                if isinstance(artist, Collection):
+                    n_points = len(artist.get_offsets()) + sum(len(path.vertices) for path in artist.get_paths())
+                else:
+                    n_points = len(artist.get_path().vertices)
+                if n_points > threshold:
+                    artist.set_rasterized(True)
+                    dense_artists.append(artist)
+        return dense_artists
+
+    @staticmethod
+    def render_buffer(figure, dpi: float | None = None) -> memoryview:
+        """
+        Draw the figure with Agg and get the canvas buffer without copying it
+
+        The buffer belongs to the canvas and is overwritten by the next drawing of the figure, so it has to
+        be copied (e.g. with ``np.array``) if it is kept longer. ``np.asarray`` gives an array of shape
+        (height, width, 4) on the buffer.
+
+        Parameters
+        ----------
+        figure : matplotlib.figure.Figure
+            The figure with an Agg canvas
+        dpi : float | None, optional
+            The resolution of the drawing, by default None for the resolution of the figure
+
+        Returns
+        -------
+        memoryview
+            The RGBA pixels of the drawing, the first row is the top of the figure
+        """
+        if not isinstance(figure.canvas, FigureCanvasAgg):
+            raise TypeError(f"The canvas {type(figure.canvas).__name__} of the figure has no Agg buffer.")
+
+        original_dpi = figure.dpi
+        if dpi is not None:
+            figure.dpi = dpi
+        try:
+            figure.canvas.draw()
+        finally:
+            figure.dpi = original_dpi
+        return figure.canvas.buffer_rgba()
+
+    def _write_buffer(self, buffer: memoryview | np.ndarray, output_file: Path, output_format: 'OutputFormat', dpi: float,
+                      width: int | None = None) -> None:
+        """
+        Encode and write a drawing, optionally resampled to another width
+
+        Parameters
+        ----------
+        buffer : memoryview | np.ndarray
+            The RGBA pixels of the drawing, see ``render_buffer``
+        output_file : Path
+            The written file
+        output_format : OutputFormat
+            The raster format of the file
+        dpi : float
+            The resolution of the drawing
+        width : int | None, optional
+            The width of the image in pixels, by default None for the size of the drawing
+        """
+        pixels = np.asarray(buffer)
+        if width is not None:
+            height = max(round(width * pixels.shape[0] / pixels.shape[1]), 1)
+            image = PIL.Image.frombuffer('RGBA', (pixels.shape[1], pixels.shape[0]), np.require(pixels, requirements='C'),
+                                         'raw', 'RGBA', 0, 1)
+            # reduce by an integer factor first and resample the rest with Lanczos, which is fast and sharp
+            pixels = np.asarray(image.resize((width, height), PIL.Image.Resampling.LANCZOS, reducing_gap=2.0))
+            # keep the physical size of the image
+            dpi = dpi * width / image.width
+        matplotlib.image.imsave(output_file, pixels, format=output_format.format, origin='upper', dpi=dpi,
+                                metadata=self.METADATA[output_format.format], pil_kwargs=output_format.pil_kwargs)
         self.logger.info(f"Save the plot to {output_file}.")
+
+    def save_data(self, data: dict | list, plot_id: str, suffix: str) -> Path:
+        """
+        Save data belonging to the plot as JSON file next to the plot
+
+        Parameters
+        ----------
+        data : dict | list
+            The data to save
+        plot_id : str
+            Unique identifier for the plot
+        suffix : str
+            Suffix of the file name, e.g. "fits" for "<plot_id>_fits.json"
+
+        Returns
+        -------
+        Path
+            The path of the saved file
+        """
+        output_file = self.output_dir / f"{plot_id}_{suffix}.json"
+        output_file.unlink(missing_ok=True)
+        output_file.write_text(json.dumps(data, indent=2), encoding='utf-8')
+        self.logger.info(f"Save the {suffix} of the plot to {output_file}.")
+        return output_file
+
+    def restore(self, render_key: str, plot_id: str) -> list[Path] | None:
+        """
+        Place the files of an already rendered plot from the render cache into the output directory
+
+        Parameters
+        ----------
+        render_key : str
+            The key of the plot in the render cache, see ``RenderCache.make_key``
+        plot_id : str
+            Unique identifier for the plot
+
+        Returns
+        -------
+        list[Path] | None
+            The placed files or None if the plot has to be rendered
+        """
+        outputs = render_cache.get(render_key, self.output_dir)
+        if outputs is not None:
+            self.logger.info(f"Restore the plot {plot_id} from the render cache to {self.output_dir}.")
+        return outputs
+
+    def store(self, render_key: str, outputs: list[Path]) -> None:
+        """
+        Store the files of a rendered plot in the render cache, once they are written
+
+        Parameters
+        ----------
+        render_key : str
+            The key of the plot in the render cache, see ``RenderCache.make_key``
+        outputs : list[Path]
+            The saved files of the plot
+        """
+        if self.writer is None:
+            render_cache.put(render_key, outputs)
+        else:
+            self.writer.defer(outputs, lambda: render_cache.put(render_key, outputs))
+
+
+def create_output_format_instance(format_config: dict) -> OutputFormat:
+    """Create the output format of all plots from the settings
+
+    Parameters
+    ----------
+    format_config : dict
+        The config dict for creating an output format instance
+
+    Returns
+    -------
+    OutputFormat
+        A new OutputFormat instance
+
+    Example
+    -------
+    format_config: {
+        format: png,
+        dpi: figure,
+        png_compression: 6,
+        quality: 90,
+        sizes: thumb::320::webp::70,
+        rasterize_threshold: 10000
+    }
+    """
+    return OutputFormat(format=format_config.get("format", "png"), dpi=format_config.get("dpi", "figure"),
+                        png_compression=format_config.get("png_compression", 6), quality=format_config.get("quality", 90),
+                        sizes=str(format_config.get("sizes", "")), rasterize_threshold=format_config.get("rasterize_threshold", 10000))
+
+
+def create_image_writer_instance(writer_config: dict) -> ImageWriter | None:
+    """Create an image writer instance from the settings
+
+    Parameters
+    ----------
+    writer_config : dict
+        The config dict for creating an image writer instance
+
+    Returns
+    -------
+    ImageWriter | None
+        A new ImageWriter instance or None to write the images directly
+
+    Example
+    -------
+    writer_config: {
+        async_writes: True,
+        writer_threads: 2,
+        max_pending: 4
+    }
+    """
+    if not writer_config.get("async_writes", True):
+        return None
+
+    return ImageWriter(threads=writer_config.get("writer_threads", 2), max_pending=writer_config.get("max_pending", 4))
+
+
+# create shared image writer instance and output format
+image_writer = create_image_writer_instance(SettingsParser(Path("config/application_settings.ini")).get("image_saver"))
+default_output_format = create_output_format_instance(SettingsParser(Path("config/application_settings.ini")).get("image_saver"))
@@ -1,19 +1,68 @@
 # -*- coding: utf-8 -*-
+from collections import OrderedDict
+import json
+from pathlib import Path
+import threading
+
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib import ticker
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
 import matplotlib.colors as mcolors
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import Patch
 
 from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.common.signal_processing import DensityGrid, SignalPyramid, lttb_decimate, minmax_decimate
 
 
 class PlotBuilder:
-    def __init__(self):
+    def __init__(self, interactive: bool = False):
         """
         Initialize plot builder with default settings
+
+        In batch mode the figure is created directly with an Agg canvas and never registered in the
+        figure manager of pyplot, so it is released as soon as it is closed.
+        Signals, vertical lines and texts are only recorded when they are added, they become artists
+        in ``finalize``, which builds the legend once.
+
+        Parameters
+        ----------
+        interactive : bool, optional
+            Whether the figure is created by pyplot to be shown in a window, by default False
         """
         logger.info("Initialize PlotBuilder.")
-        self.figure, self.ax = plt.subplots(figsize=(12, 6))
+        self.interactive = interactive
+        if interactive:
+            self.figure, self.ax = plt.subplots(figsize=(12, 6))
+        else:
+            self.figure = Figure(figsize=(12, 6))
+            FigureCanvasAgg(self.figure)
+            self.ax = self.figure.subplots()
+        # signal lines of the plot, they are reused with new data after a reset
+        self._signal_lines: list = []
+        self._spare_lines: list = []
+        # recorded operations, applied by finalize
+        self._pending_signals: list[tuple[np.ndarray, np.ndarray, dict]] = []
+        self._pending_vertical_lines: list[tuple[float, dict]] = []
+        self._pending_horizontal_lines: list[tuple[float, dict]] = []
+        self._pending_rectangles: list[tuple[np.ndarray, np.ndarray, tuple[float, float] | None, dict]] = []
+        self._pending_texts: list[tuple[float, float, str, dict]] = []
+        self._pending_scatters: list[tuple[np.ndarray, np.ndarray, dict]] = []
+        self._pending_densities: list[tuple[DensityGrid, dict]] = []
+        self._pending_stairs: list[tuple[np.ndarray, np.ndarray, dict]] = []
+        self._pending_ranges: list[tuple[np.ndarray, np.ndarray, np.ndarray, dict]] = []
+        self._pending_event_markers: list[tuple[np.ndarray, list[str] | None, float | None, dict]] = []
+        self._pending_annotations: list[str] = []
+        # legend entries in the order of the added signals and vertical lines
+        self._legend_entries: list[tuple[str, int]] = []
+        self._legend_handles: list = []
+        # x-axis limits to slice the signals to the visible window
+        self.x_limits: tuple[float, float] | None = None
 
     def set_title(self, title: str) -> 'PlotBuilder':
         """
@@ -47,9 +96,13 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with an x-axis set
         """
+        if not x_axis:
+            # without limits the x-axis is autoscaled
+            return self
         try:
             start, stop, interval = map(float, x_axis.split('::'))
             self.ax.set_xlim((start, stop))
+            self.x_limits = (start, stop)
         except ValueError as e:
             logger.error(f"Failed to set x-axis limits: {e}")
         return self
@@ -68,6 +121,9 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with a y-axis set
         """
+        if not y_axis:
+            # without limits the y-axis is autoscaled
+            return self
         try:
             start, stop, interval = map(float, y_axis.split('::'))
             self.ax.set_ylim((start, stop))
@@ -103,6 +159,28 @@ class PlotBuilder:
         logger.info(f"Set grids: x={x_grid}, y={y_grid}")
         return self
 
+    def set_x_ticks(self, positions: list[float], labels: list[str]) -> 'PlotBuilder':
+        """
+        Set fixed ticks with labels on the x-axis, e.g. for categories
+
+        Parameters
+        ----------
+        positions : list[float]
+            X-axis positions of the ticks
+        labels : list[str]
+            Labels of the ticks
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with x-axis ticks set
+        """
+        self.ax.xaxis.set_major_locator(ticker.FixedLocator(positions))
+        self.ax.xaxis.set_minor_locator(ticker.NullLocator())
+        self.ax.set_xticklabels(labels)
+        logger.info(f"Set x-axis ticks: {labels}")
+        return self
+
     def set_x_label(self, x_label: str) -> 'PlotBuilder':
         """
         Set x-axis label for the plot
@@ -139,16 +217,26 @@ class PlotBuilder:
         logger.info(f"Set y-axis label: {y_label}")
         return self
 
-    def add_signal(self, x_data: np.ndarray, y_data: np.ndarray, **kwargs: dict[str, int]) -> 'PlotBuilder':
+    def add_signal(self, x_data: np.ndarray, y_data: np.ndarray, decimation: str = 'minmax',
+                   pyramid: SignalPyramid | None = None, **kwargs: dict[str, int]) -> 'PlotBuilder':
         """
         Add a signal to the plot
 
+        The signal is recorded and drawn by ``finalize``. The signal is reduced to what the canvas can show,
+        based on the figure width, the DPI and the x-axis limits.
+        With the min/max pyramid of the signal, the reduced signal is read from the pyramid instead of the samples.
+
         Parameters
         ----------
         x_data : np.ndarray
             X-axis data
         y_data : np.ndarray
             Y-axis data
+        decimation : str, optional
+            The decimation method: 'minmax' keeps the extremes of each pixel column, 'lttb' uses
+            Largest-Triangle-Three-Buckets and 'none' plots all data points, by default 'minmax'
+        pyramid : SignalPyramid | None, optional
+            The min/max pyramid of the signal used by the 'minmax' decimation, by default None
         kwargs : dict[str, int]
             Additional arguments for plotting the signal
 
@@ -157,15 +245,53 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with a signal
         """
-        self.ax.plot(x_data, y_data, **kwargs)
-        self.ax.legend(loc="upper right", fontsize="small")
-        logger.info(f"Add signal with {len(x_data)} data points.")
+        n_points = len(x_data)
+        x_data, y_data = self._decimate(x_data, y_data, decimation, pyramid)
+        self._legend_entries.append(('signal', len(self._pending_signals)))
+        self._pending_signals.append((x_data, y_data, kwargs))
+        logger.info(f"Add signal with {len(x_data)} of {n_points} data points.")
         return self
 
+    def _decimate(self, x_data: np.ndarray, y_data: np.ndarray, decimation: str,
+                  pyramid: SignalPyramid | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reduce a signal to the pixel columns of the axes
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            X-axis data
+        y_data : np.ndarray
+            Y-axis data
+        decimation : str
+            The decimation method: 'minmax', 'lttb' or 'none'
+        pyramid : SignalPyramid | None, optional
+            The min/max pyramid of the signal, by default None
+
+        Returns
+        -------
+        tuple
+            containing the reduced x-axis and y-axis data
+        """
+        n_columns = int(np.ceil(self.figure.get_figwidth() * self.figure.dpi * self.ax.get_position().width))
+
+        if decimation == 'minmax' and pyramid is not None:
+            return pyramid.query(self.x_limits, 2 * n_columns)
+        elif decimation == 'minmax':
+            # two columns per pixel, since the columns are not aligned with the anti-aliased pixel boundaries
+            return minmax_decimate(x_data, y_data, 2 * n_columns, self.x_limits)
+        elif decimation == 'lttb':
+            return lttb_decimate(x_data, y_data, 2 * n_columns)
+        elif decimation != 'none':
+            logger.warning(f"Unknown decimation method {decimation}, plot all data points.")
+        return x_data, y_data
+
     def add_vertical_line(self, x_position: float, **kwargs: dict) -> 'PlotBuilder':
         """
         Add a vertical line to the plot
 
+        Vertical lines with the same style are drawn as a single line collection by ``finalize``.
+
         Parameters
         ----------
         x_position : float
@@ -178,11 +304,213 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with a vertical line
         """
-        self.ax.axvline(x=x_position, **kwargs)
-        self.ax.legend(loc="upper right", fontsize="small")
+        self._legend_entries.append(('vertical_line', len(self._pending_vertical_lines)))
+        self._pending_vertical_lines.append((x_position, kwargs))
         logger.info(f"Add a vertical line at {x_position}.")
         return self
 
+    def add_horizontal_line(self, y_position: float, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add a horizontal line to the plot
+
+        Horizontal lines with the same style are drawn as a single line collection by ``finalize``.
+
+        Parameters
+        ----------
+        y_position : float
+            Y-axis position for the horizontal line
+        kwargs : dict
+            Additional arguments for plotting the horizontal line, i.e. label, color, linestyle and linewidth
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with a horizontal line
+        """
+        self._legend_entries.append(('horizontal_line', len(self._pending_horizontal_lines)))
+        self._pending_horizontal_lines.append((y_position, kwargs))
+        logger.info(f"Add a horizontal line at {y_position}.")
+        return self
+
+    def add_rectangles(self, x_starts: np.ndarray, x_stops: np.ndarray, y_range: tuple[float, float] | None = None,
+                       **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add rectangles to the plot, e.g. to shade the intervals of a state
+
+        All rectangles of a call are drawn as a single polygon collection by ``finalize``.
+
+        Parameters
+        ----------
+        x_starts : np.ndarray
+            X-axis start of each rectangle
+        x_stops : np.ndarray
+            X-axis stop of each rectangle
+        y_range : tuple[float, float] | None, optional
+            Y-axis range of the rectangles, by default the rectangles span the axes from bottom to top
+        kwargs : dict
+            Additional arguments for plotting the rectangles, i.e. label, color and alpha
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with rectangles
+        """
+        self._legend_entries.append(('rectangles', len(self._pending_rectangles)))
+        self._pending_rectangles.append((np.asarray(x_starts, dtype=float), np.asarray(x_stops, dtype=float),
+                                         y_range, kwargs))
+        logger.info(f"Add {len(x_starts)} rectangles.")
+        return self
+
+    def add_scatter(self, x_data: np.ndarray, y_data: np.ndarray, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add points to the plot, drawn as a single path collection by ``finalize``
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            X-axis data of the points
+        y_data : np.ndarray
+            Y-axis data of the points
+        kwargs : dict
+            Additional arguments for plotting the points, e.g. label, color, marker and s
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with points
+        """
+        self._legend_entries.append(('scatter', len(self._pending_scatters)))
+        self._pending_scatters.append((x_data, y_data, kwargs))
+        logger.info(f"Add a scatter with {len(x_data)} points.")
+        return self
+
+    def add_stairs(self, values: np.ndarray, edges: np.ndarray, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add a step function, e.g. a histogram, drawn as a single patch by ``finalize``
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The value of each step
+        edges : np.ndarray
+            The edges of the steps, one more than values
+        kwargs : dict
+            Additional arguments for plotting the steps, e.g. label, color, fill and alpha
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with steps
+        """
+        self._legend_entries.append(('stairs', len(self._pending_stairs)))
+        self._pending_stairs.append((values, edges, kwargs))
+        logger.info(f"Add {len(values)} steps.")
+        return self
+
+    def add_ranges(self, positions: np.ndarray, lows: np.ndarray, highs: np.ndarray, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add vertical ranges, e.g. from minimum to maximum, drawn as a single line collection by ``finalize``
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            X-axis position of each range
+        lows : np.ndarray
+            Lower end of each range
+        highs : np.ndarray
+            Upper end of each range
+        kwargs : dict
+            Additional arguments for plotting the ranges, i.e. label, color, linestyle and linewidth
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with ranges
+        """
+        self._legend_entries.append(('ranges', len(self._pending_ranges)))
+        self._pending_ranges.append((np.asarray(positions, dtype=float), np.asarray(lows, dtype=float),
+                                     np.asarray(highs, dtype=float), kwargs))
+        logger.info(f"Add {len(positions)} ranges.")
+        return self
+
+    def create_density_grid(self, x_range: tuple[float, float] | None = None,
+                            y_range: tuple[float, float] | None = None) -> DensityGrid:
+        """
+        Create an empty density grid with one bin per pixel of the axes
+
+        Parameters
+        ----------
+        x_range : tuple[float, float] | None, optional
+            The range of the x-axis, by default the x-axis limits
+        y_range : tuple[float, float] | None, optional
+            The range of the y-axis, by default the y-axis limits
+
+        Returns
+        -------
+        DensityGrid
+            The grid covering the axes
+        """
+        position = self.ax.get_position()
+        shape = (int(np.ceil(self.figure.get_figwidth() * self.figure.dpi * position.width)),
+                 int(np.ceil(self.figure.get_figheight() * self.figure.dpi * position.height)))
+        return DensityGrid(x_range if x_range is not None else self.ax.get_xlim(),
+                           y_range if y_range is not None else self.ax.get_ylim(), shape)
+
+    def add_density(self, grid: DensityGrid, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add the density of points to the plot, drawn as a single image by ``finalize``
+
+        Bins without points are transparent, the counts are colored on a logarithmic scale.
+
+        Parameters
+        ----------
+        grid : DensityGrid
+            The grid with the binned points
+        kwargs : dict
+            Additional arguments for plotting the density, i.e. label and cmap
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with a density image
+        """
+        self._legend_entries.append(('density', len(self._pending_densities)))
+        self._pending_densities.append((grid, kwargs))
+        logger.info(f"Add a density of {grid.n_points} points on {grid.shape[0]}x{grid.shape[1]} bins.")
+        return self
+
+    def add_event_markers(self, x_positions: np.ndarray, texts: list[str] | None = None, text_y: float | None = None,
+                          min_text_spacing: float = 40.0, **kwargs: dict) -> 'PlotBuilder':
+        """
+        Add many vertical markers, e.g. at the edges of a signal
+
+        All markers are drawn as a single line collection by ``finalize``. Only the texts of markers within the
+        x-axis limits and at least ``min_text_spacing`` pixels apart are drawn, so the texts do not overlap.
+
+        Parameters
+        ----------
+        x_positions : np.ndarray
+            X-axis positions of the markers
+        texts : list[str] | None, optional
+            Text of each marker, by default None
+        text_y : float | None, optional
+            Y-axis position of the texts, by default the top of the axes
+        min_text_spacing : float, optional
+            Minimum distance between two texts in pixels, by default 40.0
+        kwargs : dict
+            Additional arguments for plotting the markers, i.e. label, color, linestyle and linewidth
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with event markers
+        """
+        self._legend_entries.append(('event_markers', len(self._pending_event_markers)))
+        self._pending_event_markers.append((np.asarray(x_positions, dtype=float), texts, text_y,
+                                            dict(kwargs, min_text_spacing=min_text_spacing)))
+        logger.info(f"Add {len(x_positions)} event markers.")
+        return self
+
     def add_text(self, x: float, y: float, text: str, **kwargs: dict) -> 'PlotBuilder':
         """
         Add a text to the plot
@@ -203,7 +531,7 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with a text
         """
-        self.ax.text(x, y, text, **kwargs)
+        self._pending_texts.append((x, y, text, kwargs))
         logger.info(f"Add text '{text}' at ({x}, {y}).")
         return self
 
@@ -225,12 +553,510 @@ class PlotBuilder:
         PlotBuilder
             Plot builder with an annotation
         """
-        self.figure.text(0.5, 0.0, text, ha='center', va='bottom', fontsize=10)
+        self._pending_annotations.append(text)
+        return self
+
+    def finalize(self) -> 'PlotBuilder':
+        """
+        Apply all recorded operations to the figure
+
+        The signals become lines, the vertical lines are merged into one line collection per style and
+        the legend is built once with the labels in the order the elements have been added.
+        Calling ``finalize`` again only applies the operations recorded since the last call.
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with a figure ready to be drawn
+        """
+        if not (self._legend_entries or self._pending_texts or self._pending_annotations):
+            return self
+
+        handles = {
+            'rectangles': [self._draw_rectangles(*rectangles) for rectangles in self._pending_rectangles],
+            'signal': [self._draw_signal(x_data, y_data, kwargs) for x_data, y_data, kwargs in self._pending_signals],
+            'vertical_line': self._draw_straight_lines(self._pending_vertical_lines, vertical=True),
+            'horizontal_line': self._draw_straight_lines(self._pending_horizontal_lines, vertical=False),
+            'event_markers': [self._draw_event_markers(*event_markers) for event_markers in self._pending_event_markers],
+            'scatter': [self.ax.scatter(x_data, y_data, **kwargs) for x_data, y_data, kwargs in self._pending_scatters],
+            'density': [self._draw_density(grid, kwargs) for grid, kwargs in self._pending_densities],
+            'stairs': [self.ax.stairs(values, edges, **kwargs) for values, edges, kwargs in self._pending_stairs],
+            'ranges': [self._draw_ranges(*ranges) for ranges in self._pending_ranges]
+        }
+        if self._legend_entries and (self.ax.get_autoscalex_on() or self.ax.get_autoscaley_on()):
+            self._autoscale()
+
+        for x, y, text, kwargs in self._pending_texts:
+            self.ax.text(x, y, text, **kwargs)
+        for text in self._pending_annotations:
+            self.figure.text(0.5, 0.0, text, ha='center', va='bottom', fontsize=10)
+
+        if self._legend_entries:
+            # the legend of a previous finalize keeps its entries, only the new entries are added
+            legend_handles = self._legend_handles + [handles[kind][index] for kind, index in self._legend_entries]
+            legend_handles = [handle for handle in legend_handles
+                              if handle is not None and handle.get_label() and not handle.get_label().startswith('_')]
+            if legend_handles:
+                self.ax.legend(handles=legend_handles, loc="upper right", fontsize="small")
+            self._legend_handles = legend_handles
+
+        logger.info(f"Finalize the plot with {len(self._pending_signals)} signals, "
+                    f"{len(self._pending_vertical_lines) + len(self._pending_horizontal_lines)} straight lines, "
+                    f"{len(self._pending_rectangles)} rectangle collections and {len(self._pending_texts)} texts.")
+        self._clear_pending()
+        return self
+
+    def _draw_signal(self, x_data: np.ndarray, y_data: np.ndarray, kwargs: dict) -> Line2D:
+        """
+        Draw a recorded signal as a line, a line of a previous plot is reused if available
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            X-axis data
+        y_data : np.ndarray
+            Y-axis data
+        kwargs : dict
+            Additional arguments for plotting the signal
+
+        Returns
+        -------
+        Line2D
+            The line of the signal
+        """
+        if self._spare_lines:
+            # update the line of a previous plot instead of creating a new artist
+            line = self._spare_lines.pop()
+            line.set_data(x_data, y_data)
+            line.update(kwargs)
+            self.ax.add_line(line)
+        else:
+            line, = self.ax.plot(x_data, y_data, **kwargs)
+        self._signal_lines.append(line)
+        return line
+
+    def _autoscale(self) -> None:
+        """
+        Autoscale the axes once for all drawn elements
+
+        Reused lines and collections are not autoscaled by matplotlib, so the data limits are updated here.
+        """
+        self.ax.relim()
+        if self._pending_vertical_lines:
+            self.ax.dataLim.update_from_data_x([x for x, _ in self._pending_vertical_lines], ignore=False)
+        if self._pending_horizontal_lines:
+            self.ax.dataLim.update_from_data_y([y for y, _ in self._pending_horizontal_lines], ignore=False)
+        for x_starts, x_stops, y_range, _ in self._pending_rectangles:
+            if len(x_starts):
+                self.ax.dataLim.update_from_data_x([x_starts.min(), x_stops.max()], ignore=False)
+            if y_range is not None:
+                self.ax.dataLim.update_from_data_y(y_range, ignore=False)
+        for positions, lows, highs, _ in self._pending_ranges:
+            if len(positions):
+                self.ax.dataLim.update_from_data_xy(np.column_stack(([positions.min(), positions.max()],
+                                                                     [np.nanmin(lows), np.nanmax(highs)])),
+                                                    ignore=False)
+        for x_data, y_data, _ in self._pending_scatters:
+            if len(x_data):
+                self.ax.dataLim.update_from_data_xy(np.column_stack(([np.nanmin(x_data), np.nanmax(x_data)],
+                                                                     [np.nanmin(y_data), np.nanmax(y_data)])),
+                                                    ignore=False)
+        self.ax.autoscale_view()
+
+    def _draw_straight_lines(self, lines: list[tuple[float, dict]], vertical: bool) -> list[Line2D | None]:
+        """
+        Draw recorded vertical or horizontal lines as one line collection per style
+
+        Parameters
+        ----------
+        lines : list[tuple[float, dict]]
+            The positions and the plotting arguments of the lines
+        vertical : bool
+            Whether the lines are vertical lines at x positions or horizontal lines at y positions
+
+        Returns
+        -------
+        list[Line2D | None]
+            The legend handle of each line, None if the line has no label
+        """
+        styles: dict[tuple, list[float]] = {}
+        handles = []
+        for position, kwargs in lines:
+            color = kwargs.get('color', 'black')
+            linestyle = kwargs.get('linestyle', '-')
+            # the line width might be given as string by the configuration
+            linewidth = float(kwargs.get('linewidth', 1))
+            styles.setdefault((mcolors.to_hex(color, keep_alpha=True), linestyle, linewidth), []).append(position)
+            label = kwargs.get('label')
+            # the legend shows a handle of the line, which is not added to the axes
+            handles.append(Line2D([], [], color=color, linestyle=linestyle, linewidth=linewidth, label=label)
+                           if label is not None else None)
+
+        for (color, linestyle, linewidth), positions in styles.items():
+            # the positions are in data coordinates, the lines span the axes from one side to the other
+            if vertical:
+                segments = [((position, 0.0), (position, 1.0)) for position in positions]
+                transform = self.ax.get_xaxis_transform()
+            else:
+                segments = [((0.0, position), (1.0, position)) for position in positions]
+                transform = self.ax.get_yaxis_transform()
+            self.ax.add_collection(LineCollection(segments, colors=color, linestyles=linestyle,
+                                                  linewidths=linewidth, transform=transform), autolim=False)
+        return handles
+
+    def _draw_rectangles(self, x_starts: np.ndarray, x_stops: np.ndarray, y_range: tuple[float, float] | None,
+                         kwargs: dict) -> Patch | None:
+        """
+        Draw recorded rectangles as one polygon collection
+
+        Parameters
+        ----------
+        x_starts : np.ndarray
+            X-axis start of each rectangle
+        x_stops : np.ndarray
+            X-axis stop of each rectangle
+        y_range : tuple[float, float] | None
+            Y-axis range of the rectangles, None to span the axes from bottom to top
+        kwargs : dict
+            Additional arguments for plotting the rectangles
+
+        Returns
+        -------
+        Patch | None
+            The legend handle of the rectangles, None if the rectangles have no label
+        """
+        color = kwargs.get('color', 'gray')
+        alpha = float(kwargs.get('alpha', 0.3))
+        if y_range is None:
+            # the y coordinates are in axes coordinates
+            y_bottom, y_top, transform = 0.0, 1.0, self.ax.get_xaxis_transform()
+        else:
+            (y_bottom, y_top), transform = y_range, self.ax.transData
+
+        vertices = np.empty((len(x_starts), 4, 2))
+        vertices[:, 0, 0] = vertices[:, 1, 0] = x_starts
+        vertices[:, 2, 0] = vertices[:, 3, 0] = x_stops
+        vertices[:, [0, 3], 1] = y_bottom
+        vertices[:, [1, 2], 1] = y_top
+        # the rectangles are drawn below the signals
+        self.ax.add_collection(PolyCollection(vertices, facecolors=color, edgecolors='none', alpha=alpha,
+                                              transform=transform, zorder=0.5), autolim=False)
+
+        label = kwargs.get('label')
+        return Patch(facecolor=color, alpha=alpha, label=label) if label is not None else None
+
+    def _draw_ranges(self, positions: np.ndarray, lows: np.ndarray, highs: np.ndarray, kwargs: dict) -> Line2D | None:
+        """
+        Draw recorded ranges as one line collection
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            X-axis position of each range
+        lows : np.ndarray
+            Lower end of each range
+        highs : np.ndarray
+            Upper end of each range
+        kwargs : dict
+            Additional arguments for plotting the ranges
+
+        Returns
+        -------
+        Line2D | None
+            The legend handle of the ranges, None if the ranges have no label
+        """
+        color = kwargs.get('color', 'black')
+        linestyle = kwargs.get('linestyle', '-')
+        linewidth = float(kwargs.get('linewidth', 1))
+        segments = np.stack((np.column_stack((positions, lows)), np.column_stack((positions, highs))), axis=1)
+        self.ax.add_collection(LineCollection(segments, colors=color, linestyles=linestyle, linewidths=linewidth),
+                               autolim=False)
+
+        label = kwargs.get('label')
+        return Line2D([], [], color=color, linestyle=linestyle, linewidth=linewidth, label=label) \
+            if label is not None else None
+
+    def _draw_density(self, grid: DensityGrid, kwargs: dict) -> Patch | None:
+        """
+        Draw a density grid as an image
+
+        Parameters
+        ----------
+        grid : DensityGrid
+            The grid with the binned points
+        kwargs : dict
+            Additional arguments for plotting the density
+
+        Returns
+        -------
+        Patch | None
+            The legend handle of the density, None if the density has no label
+        """
+        cmap = colormaps[kwargs.get('cmap', 'viridis')]
+        counts = np.ma.masked_equal(grid.counts, 0)
+        # each bin is a pixel, so the image is not interpolated
+        self.ax.imshow(counts, cmap=cmap, norm=mcolors.LogNorm(vmin=1, vmax=max(int(grid.counts.max()), 1)),
+                       extent=(*grid.x_range, *grid.y_range), origin='lower', aspect='auto',
+                       interpolation='nearest', zorder=0.8)
+
+        label = kwargs.get('label')
+        return Patch(facecolor=cmap(0.75), label=label) if label is not None else None
+
+    def _draw_event_markers(self, x_positions: np.ndarray, texts: list[str] | None, text_y: float | None,
+                            kwargs: dict) -> Line2D | None:
+        """
+        Draw recorded event markers as one line collection and the texts which do not overlap
+
+        Parameters
+        ----------
+        x_positions : np.ndarray
+            X-axis positions of the markers
+        texts : list[str] | None
+            Text of each marker
+        text_y : float | None
+            Y-axis position of the texts, None for the top of the axes
+        kwargs : dict
+            Additional arguments for plotting the markers and the minimum text spacing
+
+        Returns
+        -------
+        Line2D | None
+            The legend handle of the markers, None if the markers have no label
+        """
+        kwargs = dict(kwargs)
+        min_text_spacing = kwargs.pop('min_text_spacing')
+        color = kwargs.get('color', 'black')
+        linestyle = kwargs.get('linestyle', '-')
+        linewidth = float(kwargs.get('linewidth', 1))
+        x_limits = self.x_limits if self.x_limits is not None else self.ax.get_xlim()
+
+        # markers outside the x-axis limits are not drawn
+        visible = np.flatnonzero((x_positions >= min(x_limits)) & (x_positions <= max(x_limits)))
+        segments = np.empty((len(visible), 2, 2))
+        segments[:, :, 0] = x_positions[visible, np.newaxis]
+        segments[:, 0, 1] = 0.0
+        segments[:, 1, 1] = 1.0
+        self.ax.add_collection(LineCollection(segments, colors=color, linestyles=linestyle, linewidths=linewidth,
+                                              transform=self.ax.get_xaxis_transform()), autolim=False)
+
+        if texts is not None and len(visible):
+            kept = self._select_spaced(x_positions[visible], x_limits, min_text_spacing)
+            # without a y position the texts are placed at the top of the axes
+            transform = self.ax.transData if text_y is not None else self.ax.get_xaxis_transform()
+            y_position = text_y if text_y is not None else 0.98
+            for index in visible[kept]:
+                self.ax.text(x_positions[index], y_position, texts[index], transform=transform, fontsize='small',
+                             verticalalignment='top', horizontalalignment='left')
+            logger.info(f"Draw {len(kept)} of {len(visible)} event marker texts.")
+
+        label = kwargs.get('label')
+        return Line2D([], [], color=color, linestyle=linestyle, linewidth=linewidth, label=label) \
+            if label is not None else None
+
+    def _select_spaced(self, x_positions: np.ndarray, x_limits: tuple[float, float], min_spacing: float) -> np.ndarray:
+        """
+        Select positions which are at least a minimum number of pixels apart
+
+        The positions are scanned from left to right, a position is kept if it is at least ``min_spacing``
+        pixels right of the last kept position. Each step jumps to the next candidate with a binary search,
+        so the scan takes as many steps as positions are kept.
+
+        Parameters
+        ----------
+        x_positions : np.ndarray
+            X-axis positions within the x-axis limits
+        x_limits : tuple[float, float]
+            The x-axis limits
+        min_spacing : float
+            The minimum distance of the kept positions in pixels
+
+        Returns
+        -------
+        np.ndarray
+            The indices of the kept positions in ascending order of the positions
+        """
+        axes_width = self.figure.get_figwidth() * self.figure.dpi * self.ax.get_position().width
+        x_span = max(x_limits) - min(x_limits)
+        order = np.argsort(x_positions, kind='stable')
+        if x_span > 0:
+            pixels = (x_positions[order] - min(x_limits)) / x_span * axes_width
+        else:
+            # all positions are drawn at the same pixel
+            pixels = np.zeros(len(order))
+
+        kept = []
+        position = 0
+        while position < len(pixels):
+            kept.append(position)
+            position = int(np.searchsorted(pixels, pixels[position] + max(min_spacing, 1e-9), side='left'))
+        return order[kept]
+
+    def _clear_pending(self) -> None:
+        """
+        Remove all recorded operations
+        """
+        self._pending_signals = []
+        self._pending_vertical_lines = []
+        self._pending_horizontal_lines = []
+        self._pending_rectangles = []
+        self._pending_texts = []
+        self._pending_event_markers = []
+        self._pending_scatters = []
+        self._pending_densities = []
+        self._pending_stairs = []
+        self._pending_ranges = []
+        self._pending_annotations = []
+        self._legend_entries = []
+
+    def show(self) -> None:
+        """
+        Show the plot, only available for interactive plot builders
+        """
+        if not self.interactive:
+            logger.warning("The plot can not be shown in batch mode.")
+            return
+        self.finalize()
+        plt.show()
+
+    def reset(self) -> 'PlotBuilder':
+        """
+        Remove the signals, overlays and annotations but keep the layout of the plot
+
+        Title, labels, fixed axis limits, ticks and grids are kept, the signal lines are kept for reuse. The
+        data limits are cleared, so autoscaled axes are fitted to the next plot only.
+
+        Returns
+        -------
+        PlotBuilder
+            Plot builder with an empty layout
+        """
+        for line in self._signal_lines:
+            line.remove()
+        self._spare_lines.extend(self._signal_lines)
+        self._signal_lines = []
+
+        for artist in (*self.ax.lines, *self.ax.collections, *self.ax.patches, *self.ax.images, *self.ax.texts,
+                       *self.figure.texts):
+            artist.remove()
+        if self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self._legend_handles = []
+        self._clear_pending()
+        # forget the data limits of the removed artists, so an autoscaled axis only fits the next plot
+        self.ax.relim()
+
+        logger.info("Reset the plot.")
         return self
 
+    def close(self) -> None:
+        """
+        Release the figure and all its artists
+        """
+        if self.interactive:
+            plt.close(self.figure)
+        self.figure.clear()
+        logger.info("Close the plot.")
+
+
+class FigurePool:
+    """
+    A pool of prepared plot builders keyed by the layout of the plot
+
+    Plots with the same ``plot_settings`` share a figure with its axes, ticks and grids, only the signals,
+    overlays and annotation are replaced. The number of pooled figures is bounded by ``max_size``,
+    the least recently used figures are closed first.
+    """
+    def __init__(self, max_size: int = 8):
+        """
+        Initialize figure pool with a size limit
+
+        Parameters
+        ----------
+        max_size : int, optional
+            The maximum number of pooled figures, by default 8
+        """
+        self.max_size = max_size
+        self._builders: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
     @staticmethod
-    def show():
+    def make_key(plot_settings: dict) -> str:
+        """
+        Create the pool key of a plot layout
+
+        Parameters
+        ----------
+        plot_settings : dict
+            The plot settings of the plot configuration
+
+        Returns
+        -------
+        str
+            The key of the layout
+        """
+        return json.dumps(plot_settings, sort_keys=True)
+
+    def acquire(self, plot_settings: dict) -> tuple[PlotBuilder, bool]:
+        """
+        Get a prepared plot builder of a layout or a new plot builder
+
+        Parameters
+        ----------
+        plot_settings : dict
+            The plot settings of the plot configuration
+
+        Returns
+        -------
+        tuple
+            containing the plot builder and whether its layout is already prepared
+        """
+        key = self.make_key(plot_settings)
+        with self._lock:
+            builders = self._builders.get(key)
+            if builders:
+                self._builders.move_to_end(key)
+                logger.info("Reuse a prepared figure from the figure pool.")
+                return builders.pop(), True
+
+        return PlotBuilder(), False
+
+    def release(self, plot_settings: dict, builder: PlotBuilder) -> None:
+        """
+        Reset a plot builder and put it back into the pool
+
+        Parameters
+        ----------
+        plot_settings : dict
+            The plot settings the plot builder has been prepared with
+        builder : PlotBuilder
+            The plot builder to release
         """
-        Show the plot
+        if builder.interactive or self.max_size < 1:
+            builder.close()
+            return
+
+        builder.reset()
+        key = self.make_key(plot_settings)
+        with self._lock:
+            self._builders.setdefault(key, []).append(builder)
+            self._builders.move_to_end(key)
+
+            while sum(len(builders) for builders in self._builders.values()) > self.max_size:
+                oldest_key = next(iter(self._builders))
+                self._builders[oldest_key].pop(0).close()
+                if not self._builders[oldest_key]:
+                    del self._builders[oldest_key]
+
+    def clear(self) -> None:
+        """
+        Close all pooled figures
         """
-        return plt.show()
+        with self._lock:
+            for builders in self._builders.values():
+                for builder in builders:
+                    builder.close()
+            self._builders.clear()
+
+
+# create shared figure pool instance
+figure_pool = FigurePool(SettingsParser(Path("config/application_settings.ini")).get("figure_pool", "max_size", 8))
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""A module for reusing rendered plots across output directories and runs
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Hashable
+
+import matplotlib
+
+from easyplotter import version as vers
+from easyplotter.common.cache_utils import evict_least_recently_used, file_fingerprint
+from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+
+
+# the settings sections which change the rendered plots
+RENDER_SETTINGS = ('scatter', 'statistics', 'streaming', 'image_saver')
+
+
+def get_render_settings() -> dict:
+    """Get the settings which change the rendered plots
+
+    Returns
+    -------
+    dict
+        The kv-pairs of each section in ``RENDER_SETTINGS``
+    """
+    settings = SettingsParser(Path("config/application_settings.ini"))
+    return {section: settings.get(section) for section in RENDER_SETTINGS}
+
+
+def make_render_key(plots_config: dict, data_paths: list[Path], *extra: Hashable) -> str:
+    """Create the key of a plot from its resolved inputs
+
+    The key is shared by the render cache and the build manifest, so both change with the same inputs.
+
+    Parameters
+    ----------
+    plots_config : dict
+        The configuration entry of the plot
+    data_paths : list[Path]
+        The recordings of the plot
+    extra : Hashable
+        Additional inputs changing the rendering, e.g. the loaded time window
+
+    Returns
+    -------
+    str
+        The SHA-256 digest of the configuration, the fingerprints of the recordings, the render settings,
+        the additional inputs and the versions of easyplotter and matplotlib
+    """
+    inputs = {
+        'config': plots_config,
+        'recordings': [file_fingerprint(data_path) for data_path in data_paths],
+        'settings': get_render_settings(),
+        'extra': [repr(item) for item in extra],
+        'versions': [vers.version, matplotlib.__version__],
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """A content-addressed disk cache of rendered plots
+
+    The key of a plot is the SHA-256 of its fully resolved inputs: the configuration entry, the fingerprints
+    of the recordings, the settings which change the rendering and the versions of easyplotter and
+    matplotlib. Each entry directory holds the files of a plot, which are hardlinked (or copied, e.g. across
+    file systems) into the output directory on a hit. The total size of the cache is bounded by
+    ``max_bytes``, the least recently used entries are evicted first.
+
+    The fingerprint of a recording is its resolved path, modification time and size, the same as in the
+    build manifest. The recordings are never read for the key, so large recordings and many worker
+    processes do not add any reads before the plots are drawn.
+    """
+    ENTRY_FILE = "entry.json"
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 1024 ** 3, enabled: bool = True) -> None:
+        """
+        Initialize render cache with a cache location and a size limit
+
+        Parameters
+        ----------
+        cache_dir : Path
+            The directory to store the rendered plots
+        max_bytes : int, optional
+            The maximum size of all cached plots in bytes, by default 1 GiB
+        enabled : bool, optional
+            Whether the cache is used, by default True
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def make_key(self, plots_config: dict, data_paths: list[Path], *extra: Hashable) -> str:
+        """
+        Create the key of a plot from its resolved inputs
+
+        Parameters
+        ----------
+        plots_config : dict
+            The configuration entry of the plot
+        data_paths : list[Path]
+            The recordings of the plot
+        extra : Hashable
+            Additional inputs changing the rendering, e.g. the loaded time window
+
+        Returns
+        -------
+        str
+            The SHA-256 digest of the inputs, see ``make_render_key``
+        """
+        return make_render_key(plots_config, data_paths, *extra)
+
+    def get(self, key: str, output_dir: Path) -> list[Path] | None:
+        """
+        Place the cached files of a plot into an output directory
+
+        Parameters
+        ----------
+        key : str
+            The key of the plot, see ``make_key``
+        output_dir : Path
+            The output directory
+
+        Returns
+        -------
+        list[Path] | None
+            The placed files or None on a cache miss
+        """
+        if not self.enabled:
+            return None
+
+        entry_dir = self.cache_dir.joinpath(key)
+        try:
+            entry = json.loads(entry_dir.joinpath(self.ENTRY_FILE).read_text(encoding='utf-8'))
+            outputs = [self._place(entry_dir.joinpath(file_name), Path(output_dir).joinpath(file_name))
+                       for file_name in entry['files']]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        # mark entry as recently used for the eviction
+        os.utime(entry_dir.joinpath(self.ENTRY_FILE))
+        self.hits += 1
+        self.bytes_saved += entry['bytes']
+        return outputs
+
+    def put(self, key: str, files: list[Path]) -> None:
+        """
+        Store the files of a rendered plot
+
+        Parameters
+        ----------
+        key : str
+            The key of the plot, see ``make_key``
+        files : list[Path]
+            The files of the plot
+        """
+        entry_dir = self.cache_dir.joinpath(key)
+        if not self.enabled or entry_dir.is_dir():
+            return
+
+        # copy into a temporary directory first, so other processes never see an incomplete entry
+        temp_dir = self.cache_dir.joinpath(f"{key}.{os.getpid()}.tmp")
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        for file in files:
+            shutil.copyfile(file, temp_dir.joinpath(Path(file).name))
+        entry = {'files': [Path(file).name for file in files], 'bytes': sum(Path(file).stat().st_size for file in files)}
+        temp_dir.joinpath(self.ENTRY_FILE).write_text(json.dumps(entry, indent=2), encoding='utf-8')
+        try:
+            os.replace(temp_dir, entry_dir)
+        except OSError:
+            # another process stored the same plot in the meantime
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return
+
+        self.evictions += evict_least_recently_used(self.cache_dir, self.ENTRY_FILE, self.max_bytes, entry_dir, 'render')
+
+    def report(self) -> None:
+        """
+        Log the hit rate, the saved bytes and the evictions of the cache
+        """
+        requests = self.hits + self.misses
+        hit_rate = 100 * self.hits / requests if requests else 0.0
+        logger.info(f"Render cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f} % hit rate), "
+                    f"{self.bytes_saved} bytes saved, {self.evictions} evictions.")
+
+    @staticmethod
+    def _place(source: Path, target: Path) -> Path:
+        """
+        Hardlink a cached file into place or copy it if it can not be linked
+
+        Parameters
+        ----------
+        source : Path
+            The cached file
+        target : Path
+            The output file
+
+        Returns
+        -------
+        Path
+            The output file
+        """
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        return target
+
+
+def create_render_cache_instance(cache_config: dict) -> RenderCache:
+    """Create a render cache instance from the settings
+
+    Parameters
+    ----------
+    cache_config : dict
+        The config dict for creating a render cache instance
+
+    Returns
+    -------
+    RenderCache
+        A new RenderCache instance
+
+    Example
+    -------
+    cache_config: {
+        enabled: True,
+        cache_dir: "~/.cache/easyplotter/render",
+        max_bytes: 1073741824
+    }
+    """
+    enabled = cache_config.get("enabled", True)
+    cache_dir = Path(str(cache_config.get("cache_dir", "~/.cache/easyplotter/render"))).expanduser()
+    max_bytes = cache_config.get("max_bytes", 1024 ** 3)
+
+    return RenderCache(cache_dir=cache_dir, max_bytes=max_bytes, enabled=enabled)
+
+
+# create shared render cache instance
+render_cache = create_render_cache_instance(SettingsParser(Path("config/application_settings.ini")).get("render_cache"))
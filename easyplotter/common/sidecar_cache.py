@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""A module for caching parsed recordings as memory-mapped binary sidecar files
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+
+import numpy as np
+
+from easyplotter.common.cache_utils import evict_least_recently_used, file_fingerprint
+from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.common.signal_processing import SignalPyramid
+
+
+class SidecarCache:
+    """A disk cache for parsed columns of a recording
+
+    Each recording gets an entry directory with one contiguous binary file per column and a small header
+    with the fingerprint (resolved path, mtime and size) of the source file and the dtype of each column.
+    The columns are read back with ``np.memmap``, so only the pages which are actually used get loaded.
+    The total size of the cache is bounded by ``max_bytes``, the least recently used entries are evicted first.
+    The min/max pyramids of the columns can be stored in the same entry.
+    """
+    HEADER_FILE = "header.json"
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 4 * 1024 ** 3, enabled: bool = True,
+                 persist_pyramids: bool = True) -> None:
+        """
+        Initialize sidecar cache with a cache location and a size limit
+
+        Parameters
+        ----------
+        cache_dir : Path
+            The directory to store the sidecar files
+        max_bytes : int, optional
+            The maximum size of all sidecar files in bytes, by default 4 GiB
+        enabled : bool, optional
+            Whether the cache is used, by default True
+        persist_pyramids : bool, optional
+            Whether the min/max pyramids of the columns are stored as well, by default True
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.persist_pyramids = persist_pyramids
+
+    def read(self, data_path: Path, columns: list[str]) -> dict[str, np.ndarray]:
+        """
+        Read the cached columns of a recording as memory-mapped arrays
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the source file
+        columns : list[str]
+            Names of the columns to read
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The read-only arrays of all cached columns, missing columns are not included
+        """
+        if not self.enabled:
+            return {}
+
+        entry_dir = self._entry_dir(data_path)
+        header = self._read_header(entry_dir)
+        if header is None:
+            return {}
+
+        if header.get('format_version') != self.FORMAT_VERSION or header.get('fingerprint') != list(file_fingerprint(data_path)):
+            logger.info(f"Source {data_path} has changed, invalidate its sidecar cache.")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return {}
+
+        arrays = {}
+        for column in columns:
+            column_info = header['columns'].get(column)
+            if column_info is None:
+                continue
+            column_file = entry_dir.joinpath(column_info['file'])
+            dtype = np.dtype(column_info['dtype'])
+            length = column_info.get('length', header['length'])
+            if length == 0:
+                arrays[column] = np.empty(0, dtype=dtype)
+            elif column_file.is_file():
+                arrays[column] = np.memmap(column_file, dtype=dtype, mode='r', shape=(length,))
+
+        # mark entry as recently used for the eviction
+        os.utime(entry_dir.joinpath(self.HEADER_FILE))
+        return arrays
+
+    def write(self, data_path: Path, arrays: dict[str, np.ndarray]) -> None:
+        """
+        Write parsed columns of a recording to its sidecar entry
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the source file
+        arrays : dict[str, np.ndarray]
+            The parsed columns of equal length
+        """
+        if not self.enabled or not arrays:
+            return
+
+        entry_dir = self._entry_dir(data_path)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        fingerprint = list(file_fingerprint(data_path))
+        length = len(next(iter(arrays.values())))
+
+        header = self._read_header(entry_dir)
+        if header is None or header.get('fingerprint') != fingerprint or header.get('length') != length:
+            header = {'format_version': self.FORMAT_VERSION, 'fingerprint': fingerprint, 'length': length, 'columns': {}}
+
+        self._write_columns(entry_dir, header, arrays)
+        logger.info(f"Write {len(arrays)} columns of {data_path} to sidecar cache {entry_dir}.")
+
+        evict_least_recently_used(self.cache_dir, self.HEADER_FILE, self.max_bytes, entry_dir, 'sidecar')
+
+    def read_pyramid(self, data_path: Path, column: str, time: np.ndarray, values: np.ndarray) -> SignalPyramid | None:
+        """
+        Read the persisted min/max pyramid of a column
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the source file
+        column : str
+            Name of the column
+        time : np.ndarray
+            Time array of the column
+        values : np.ndarray
+            Samples of the column
+
+        Returns
+        -------
+        SignalPyramid | None
+            The pyramid with memory-mapped levels or None if it is not cached
+        """
+        header = self._read_header(self._entry_dir(data_path)) if self.enabled else None
+        level_names = header.get('pyramids', {}).get(column, []) if header is not None else []
+        arrays = self.read(data_path, level_names)
+        if not level_names or len(arrays) != len(level_names):
+            return None
+
+        levels = {}
+        for level_name in level_names[::2]:
+            prefix, name = level_name.rsplit('/', 1)
+            level = int(name[len('min'):])
+            levels[level] = (arrays[level_name], arrays[f"{prefix}/max{level}"])
+
+        return SignalPyramid(time, values, levels)
+
+    def write_pyramid(self, data_path: Path, column: str, pyramid: SignalPyramid) -> None:
+        """
+        Persist the min/max pyramid of a column next to the column
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the source file
+        column : str
+            Name of the column
+        pyramid : SignalPyramid
+            The pyramid built from the cached column
+        """
+        entry_dir = self._entry_dir(data_path)
+        header = self._read_header(entry_dir) if self.enabled else None
+        if not self.persist_pyramids or header is None or header.get('fingerprint') != list(file_fingerprint(data_path)) \
+                or not pyramid.levels:
+            return
+
+        arrays = {}
+        for level, (mins, maxs) in pyramid.levels.items():
+            arrays[f"{column}/pyramid/min{level}"] = mins
+            arrays[f"{column}/pyramid/max{level}"] = maxs
+        header.setdefault('pyramids', {})[column] = list(arrays)
+
+        self._write_columns(entry_dir, header, arrays)
+        logger.info(f"Write pyramid of {column} with {len(pyramid.levels)} levels to sidecar cache {entry_dir}.")
+
+        evict_least_recently_used(self.cache_dir, self.HEADER_FILE, self.max_bytes, entry_dir, 'sidecar')
+
+    def _write_columns(self, entry_dir: Path, header: dict, arrays: dict[str, np.ndarray]) -> None:
+        """
+        Write arrays to binary files of an entry directory and replace its header
+
+        Parameters
+        ----------
+        entry_dir : Path
+            The entry directory
+        header : dict
+            The header of the entry, the written columns are added
+        arrays : dict[str, np.ndarray]
+            The arrays to write
+        """
+        for column, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            file_name = hashlib.sha1(column.encode('utf-8')).hexdigest()[:16] + ".bin"
+            temp_file = entry_dir.joinpath(f"{file_name}.{os.getpid()}.tmp")
+            values.tofile(temp_file)
+            os.replace(temp_file, entry_dir.joinpath(file_name))
+            header['columns'][column] = {'file': file_name, 'dtype': values.dtype.str, 'length': len(values)}
+
+        temp_header = entry_dir.joinpath(f"{self.HEADER_FILE}.{os.getpid()}.tmp")
+        temp_header.write_text(json.dumps(header, indent=2), encoding='utf-8')
+        os.replace(temp_header, entry_dir.joinpath(self.HEADER_FILE))
+
+    def _entry_dir(self, data_path: Path) -> Path:
+        """
+        Get the entry directory of a source file
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the source file
+
+        Returns
+        -------
+        Path
+            The entry directory in the cache directory
+        """
+        resolved_path = str(Path(data_path).resolve())
+        return self.cache_dir.joinpath(hashlib.sha1(resolved_path.encode('utf-8')).hexdigest()[:16])
+
+    def _read_header(self, entry_dir: Path) -> dict | None:
+        """
+        Read the header of an entry directory
+
+        Parameters
+        ----------
+        entry_dir : Path
+            The entry directory
+
+        Returns
+        -------
+        dict | None
+            The header or None if the entry does not exist or is broken
+        """
+        try:
+            return json.loads(entry_dir.joinpath(self.HEADER_FILE).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+
+def create_sidecar_cache_instance(cache_config: dict) -> SidecarCache:
+    """Create a sidecar cache instance from the settings
+
+    Parameters
+    ----------
+    cache_config : dict
+        The config dict for creating a sidecar cache instance
+
+    Returns
+    -------
+    SidecarCache
+        A new SidecarCache instance
+
+    Example
+    -------
+    cache_config: {
+        enabled: True,
+        cache_dir: "Path to folder",
+        max_bytes: 4294967296,
+        persist_pyramids: True
+    }
+    """
+    enabled = cache_config.get("enabled", True)
+    cache_dir = Path(cache_config.get("cache_dir", ".easyplotter_cache/sidecar"))
+    max_bytes = cache_config.get("max_bytes", 4 * 1024 ** 3)
+    persist_pyramids = cache_config.get("persist_pyramids", True)
+
+    return SidecarCache(cache_dir=cache_dir, max_bytes=max_bytes, enabled=enabled, persist_pyramids=persist_pyramids)
+
+
+# create shared sidecar cache instance
+sidecar_cache = create_sidecar_cache_instance(SettingsParser(Path("config/application_settings.ini")).get("sidecar_cache"))
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+"""A module for reducing signals to what is visible in a plot
+"""
+import numpy as np
+
+
+def window_slice(time: np.ndarray, start: float, stop: float) -> slice:
+    """
+    Find the samples of a sorted time array within a window by binary search
+
+    One sample of margin is kept on each side, so lines still reach the edges of the window.
+
+    Parameters
+    ----------
+    time : np.ndarray
+        Sorted time array
+    start : float
+        Start of the window
+    stop : float
+        Stop of the window
+
+    Returns
+    -------
+    slice
+        The slice of the samples within the window
+
+    Example
+    -------
+    >>> window_slice(np.arange(10.0), 2.5, 5.0)
+    slice(2, 7, None)
+    """
+    first = max(int(np.searchsorted(time, start, side='left')) - 1, 0)
+    last = min(int(np.searchsorted(time, stop, side='right')) + 1, len(time))
+    return slice(first, last)
+
+
+def slice_to_window(x_data: np.ndarray, y_data: np.ndarray,
+                    x_limits: tuple[float, float] | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Slice a signal to the visible x-axis window
+
+    The time is expected to be sorted, as it is for all recordings. Basic slicing is used,
+    so the results are views of the input arrays and no data is copied.
+
+    Parameters
+    ----------
+    x_data : np.ndarray
+        Sorted x-axis data
+    y_data : np.ndarray
+        Y-axis data
+    x_limits : tuple[float, float] | None
+        The (start, stop) limits of the x-axis or None to keep all samples
+
+    Returns
+    -------
+    tuple
+        containing the x-axis and y-axis data within the window
+    """
+    if x_limits is None or len(x_data) == 0:
+        return x_data, y_data
+
+    window = window_slice(x_data, min(x_limits), max(x_limits))
+    return x_data[window], y_data[window]
+
+
+def minmax_decimate(x_data: np.ndarray, y_data: np.ndarray, n_columns: int,
+                    x_range: tuple[float, float] | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a signal to the first, minimum, maximum and last sample of each pixel column
+
+    The rendered line is the same as the one of the full signal, since all extreme values
+    (e.g. spikes) and the connections between the pixel columns are kept. Signals with NaN values
+    are not reduced to keep the gaps of the line.
+
+    Parameters
+    ----------
+    x_data : np.ndarray
+        Sorted x-axis data
+    y_data : np.ndarray
+        Y-axis data
+    n_columns : int
+        The number of pixel columns of the x-axis
+    x_range : tuple[float, float] | None, optional
+        The (start, stop) range of the x-axis, by default None to use the range of the data
+
+    Returns
+    -------
+    tuple
+        containing the reduced x-axis and y-axis data
+    """
+    n_samples = len(x_data)
+    if n_columns < 1 or n_samples <= 4 * n_columns or np.isnan(y_data).any():
+        return x_data, y_data
+
+    start, stop = x_range if x_range is not None else (x_data[0], x_data[-1])
+    if stop <= start:
+        return x_data, y_data
+
+    # sorted x-axis data gives non-decreasing columns, samples outside the range share the margin columns
+    columns = np.floor((x_data - start) * (n_columns / (stop - start)))
+    np.clip(columns, -1, n_columns, out=columns)
+    firsts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    lasts = np.r_[firsts[1:], n_samples] - 1
+    segment_ids = np.repeat(np.arange(len(firsts)), lasts - firsts + 1)
+
+    indices = np.unique(np.concatenate((firsts, lasts, *_segment_extremes(y_data, firsts, segment_ids))))
+    return x_data[indices], y_data[indices]
+
+
+def _segment_extremes(y_data: np.ndarray, firsts: np.ndarray, segment_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the first sample of each segment which equals the minimum and the maximum of the segment
+
+    Parameters
+    ----------
+    y_data : np.ndarray
+        Y-axis data without NaN values
+    firsts : np.ndarray
+        Index of the first sample of each segment
+    segment_ids : np.ndarray
+        Segment of each sample
+
+    Returns
+    -------
+    tuple
+        containing the indices of the minimum and the maximum of each segment
+    """
+    indices = []
+    for extremes in (np.minimum.reduceat(y_data, firsts), np.maximum.reduceat(y_data, firsts)):
+        candidates = np.flatnonzero(y_data == extremes[segment_ids])
+        candidate_segments = segment_ids[candidates]
+        indices.append(candidates[np.r_[True, candidate_segments[1:] != candidate_segments[:-1]]])
+    return indices[0], indices[1]
+
+
+def lttb_decimate(x_data: np.ndarray, y_data: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a signal with the Largest-Triangle-Three-Buckets algorithm
+
+    The samples are split into ``n_out - 2`` buckets, from each bucket the sample spanning the
+    largest triangle with the previous selected sample and the mean of the next bucket is kept.
+
+    Parameters
+    ----------
+    x_data : np.ndarray
+        Sorted x-axis data
+    y_data : np.ndarray
+        Y-axis data
+    n_out : int
+        The number of samples to keep
+
+    Returns
+    -------
+    tuple
+        containing the reduced x-axis and y-axis data
+    """
+    n_samples = len(x_data)
+    if n_out < 3 or n_samples <= n_out or np.isnan(y_data).any():
+        return x_data, y_data
+
+    edges = np.linspace(1, n_samples - 1, n_out - 1).astype(np.int64)
+    # mean of each bucket, the last sample is the bucket after the last one
+    bucket_sizes = np.diff(np.r_[edges, n_samples])
+    mean_x = np.add.reduceat(x_data, edges) / bucket_sizes
+    mean_y = np.add.reduceat(y_data, edges) / bucket_sizes
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n_samples - 1
+    previous = 0
+    for i in range(n_out - 2):
+        first, last = edges[i], edges[i + 1]
+        x_bucket, y_bucket = x_data[first:last], y_data[first:last]
+        areas = np.abs((x_data[previous] - mean_x[i + 1]) * (y_bucket - y_data[previous])
+                       - (x_data[previous] - x_bucket) * (mean_y[i + 1] - y_data[previous]))
+        previous = first + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return x_data[selected], y_data[selected]
+
+
+def find_transitions(x_data: np.ndarray, y_data: np.ndarray, edge: str = 'change',
+                     threshold: float | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the edges of a signal, e.g. each change of a warning level
+
+    Without a threshold the edges are the changes of the signal value, with a threshold the edges are
+    the crossings of the threshold. Samples with NaN values do not create edges.
+
+    Parameters
+    ----------
+    x_data : np.ndarray
+        X-axis data
+    y_data : np.ndarray
+        Y-axis data
+    edge : str, optional
+        The edges to find: 'rising', 'falling' or 'change' for both, by default 'change'
+    threshold : float | None, optional
+        The threshold to cross, by default None
+
+    Returns
+    -------
+    tuple
+        containing the x positions, the values before and the values after each edge
+
+    Example
+    -------
+    >>> find_transitions(np.arange(5.0), np.array([0.0, 0.0, 2.0, 2.0, 1.0]), edge='rising')
+    (array([2.]), array([0.]), array([2.]))
+    """
+    y_data = np.asarray(y_data)
+    if threshold is None:
+        steps = np.diff(y_data)
+    else:
+        # a NaN sample is neither above nor below the threshold, so it does not cross the threshold
+        steps = np.diff(np.where(np.isnan(y_data), np.nan, y_data > threshold))
+
+    if edge == 'rising':
+        indices = np.flatnonzero(steps > 0)
+    elif edge == 'falling':
+        indices = np.flatnonzero(steps < 0)
+    elif edge == 'change':
+        indices = np.flatnonzero(steps != 0)
+        # NaN steps are not equal to zero
+        indices = indices[~np.isnan(steps[indices])]
+    else:
+        raise ValueError(f"Unknown edge {edge}, expected 'rising', 'falling' or 'change'.")
+
+    return x_data[indices + 1], y_data[indices], y_data[indices + 1]
+
+
+def run_lengths(x_data: np.ndarray, y_data: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run-length encode a state signal into intervals of constant value
+
+    An interval ends at the first sample of the next interval, so the intervals have no gaps.
+
+    Parameters
+    ----------
+    x_data : np.ndarray
+        Sorted x-axis data
+    y_data : np.ndarray
+        Y-axis data, e.g. the values of an enum signal
+
+    Returns
+    -------
+    tuple
+        containing the start, the stop and the value of each interval
+
+    Example
+    -------
+    >>> run_lengths(np.arange(5.0), np.array([0, 0, 2, 2, 1]))
+    (array([0., 2., 4.]), array([2., 4., 4.]), array([0, 2, 1]))
+    """
+    y_data = np.asarray(y_data)
+    if len(y_data) == 0:
+        return np.empty(0), np.empty(0), y_data
+
+    starts = np.concatenate(([0], np.flatnonzero(y_data[1:] != y_data[:-1]) + 1))
+    stops = np.append(starts[1:], len(y_data) - 1)
+    return x_data[starts], x_data[stops], y_data[starts]
+
+
+class SignalPyramid:
+    """A multi-resolution min/max pyramid of a signal
+
+    Each level holds the indices of the minimum and maximum sample of blocks of ``2 ** level`` samples,
+    starting with blocks of ``2 ** MIN_LEVEL`` samples. A window of the signal is reduced to a number of
+    pixel columns by reading the blocks of a single level, so the cost depends on the number of pixels
+    and not on the number of samples.
+    """
+    MIN_LEVEL = 2
+
+    def __init__(self, time: np.ndarray, values: np.ndarray, levels: dict[int, tuple[np.ndarray, np.ndarray]] | None = None):
+        """
+        Initialize the pyramid of a signal and build its levels
+
+        Parameters
+        ----------
+        time : np.ndarray
+            Sorted time array
+        values : np.ndarray
+            Samples of the signal
+        levels : dict[int, tuple[np.ndarray, np.ndarray]] | None, optional
+            Prebuilt levels mapping the level to the indices of the minimum and maximum samples,
+            by default None to build the levels
+        """
+        self.time = time
+        self.values = values
+        self.levels = levels if levels is not None else self._build()
+
+    @property
+    def nbytes(self) -> int:
+        """A getter property for the number of bytes of the pyramid levels
+
+        Returns
+        -------
+        int
+            The number of bytes of all level arrays
+        """
+        return sum(mins.nbytes + maxs.nbytes for mins, maxs in self.levels.values())
+
+    def _build(self) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+        """
+        Build all levels, each level is computed from the previous one with vectorized operations
+
+        Returns
+        -------
+        dict[int, tuple[np.ndarray, np.ndarray]]
+            Mapping of the level to the indices of the minimum and maximum samples of each block
+        """
+        n_samples = len(self.values)
+        block_size = 2 ** self.MIN_LEVEL
+        if n_samples < 2 * block_size or np.isnan(self.values).any():
+            return {}
+
+        index_dtype = np.uint32 if n_samples < 2 ** 32 else np.uint64
+        # the first level is computed from the samples, the last block is padded with the last sample
+        n_blocks = -(-n_samples // block_size)
+        indices = np.minimum(np.arange(n_blocks * block_size).reshape(n_blocks, block_size), n_samples - 1)
+        block_values = self.values[indices]
+        mins = (indices[:, 0] + np.argmin(block_values, axis=1)).astype(index_dtype)
+        maxs = (indices[:, 0] + np.argmax(block_values, axis=1)).astype(index_dtype)
+        levels = {self.MIN_LEVEL: (mins, maxs)}
+
+        level = self.MIN_LEVEL
+        while len(mins) > 1:
+            # pad an odd number of blocks with the last block, then merge pairs of blocks
+            if len(mins) % 2:
+                mins, maxs = np.r_[mins, mins[-1:]], np.r_[maxs, maxs[-1:]]
+            mins, maxs = mins.reshape(-1, 2), maxs.reshape(-1, 2)
+            mins = np.where(self.values[mins[:, 1]] < self.values[mins[:, 0]], mins[:, 1], mins[:, 0])
+            maxs = np.where(self.values[maxs[:, 1]] > self.values[maxs[:, 0]], maxs[:, 1], maxs[:, 0])
+            level += 1
+            levels[level] = (mins, maxs)
+
+        return levels
+
+    def query(self, x_limits: tuple[float, float] | None, n_columns: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reduce a window of the signal to the minimum and maximum samples of its pixel columns
+
+        Parameters
+        ----------
+        x_limits : tuple[float, float] | None
+            The (start, stop) window or None for the whole signal
+        n_columns : int
+            The number of pixel columns of the window
+
+        Returns
+        -------
+        tuple
+            containing the time and values of the kept samples in their original order
+        """
+        window = slice(0, len(self.time)) if x_limits is None else window_slice(self.time, min(x_limits), max(x_limits))
+        n_samples = window.stop - window.start
+        level = int(np.floor(np.log2(max(n_samples / max(n_columns, 1), 1))))
+        if level < self.MIN_LEVEL or level not in self.levels:
+            return self.time[window], self.values[window]
+
+        # read the blocks covering the window, the first and last sample keep the edges of the line
+        first_block, last_block = window.start >> level, ((window.stop - 1) >> level) + 1
+        mins, maxs = self.levels[level]
+        indices = np.unique(np.concatenate((mins[first_block:last_block], maxs[first_block:last_block],
+                                            [window.start, window.stop - 1])).astype(np.int64))
+        indices = indices[(indices >= window.start) & (indices < window.stop)]
+
+        return self.time[indices], self.values[indices]
+
+
+class DensityGrid:
+    """A 2D histogram of points on a grid of pixels
+
+    The points are added in chunks, so the memory does not depend on the number of points.
+    Each chunk is binned with a single ``np.bincount``.
+    """
+    def __init__(self, x_range: tuple[float, float], y_range: tuple[float, float], shape: tuple[int, int]):
+        """
+        Initialize an empty grid
+
+        Parameters
+        ----------
+        x_range : tuple[float, float]
+            The (start, stop) range of the x-axis
+        y_range : tuple[float, float]
+            The (start, stop) range of the y-axis
+        shape : tuple[int, int]
+            The number of bins along the x-axis and the y-axis, e.g. the pixels of the axes
+        """
+        self.x_range = (float(min(x_range)), float(max(x_range)))
+        self.y_range = (float(min(y_range)), float(max(y_range)))
+        self.shape = (max(int(shape[0]), 1), max(int(shape[1]), 1))
+        self.n_points = 0
+        self._counts = np.zeros(self.shape[0] * self.shape[1], dtype=np.int64)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """A getter property for the number of points per bin
+
+        Returns
+        -------
+        np.ndarray
+            The counts with one row per y bin and one column per x bin, starting at the bottom left
+        """
+        return self._counts.reshape(self.shape[1], self.shape[0])
+
+    def add(self, x_data: np.ndarray, y_data: np.ndarray) -> 'DensityGrid':
+        """
+        Add a chunk of points, points outside the ranges and NaN values are skipped
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            X-axis data of the points
+        y_data : np.ndarray
+            Y-axis data of the points
+
+        Returns
+        -------
+        DensityGrid
+            The grid with the added points
+        """
+        n_x, n_y = self.shape
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        # comparisons with NaN are False, so NaN values are outside the ranges
+        inside = ((x_data >= self.x_range[0]) & (x_data <= self.x_range[1])
+                  & (y_data >= self.y_range[0]) & (y_data <= self.y_range[1]))
+        x_data, y_data = x_data[inside], y_data[inside]
+
+        x_scale = n_x / ((self.x_range[1] - self.x_range[0]) or 1.0)
+        y_scale = n_y / ((self.y_range[1] - self.y_range[0]) or 1.0)
+        # points on the upper edges belong to the last bins
+        x_bins = np.minimum(((x_data - self.x_range[0]) * x_scale).astype(np.intp), n_x - 1)
+        y_bins = np.minimum(((y_data - self.y_range[0]) * y_scale).astype(np.intp), n_y - 1)
+        self._counts += np.bincount(y_bins * n_x + x_bins, minlength=n_x * n_y)
+        self.n_points += len(x_data)
+        return self
+
+
+class MinMaxAccumulator:
+    """The first, minimum, maximum and last sample of each pixel column of a signal streamed in chunks
+
+    The chunks are added in the order of the samples, so the memory depends on the number of columns
+    and not on the number of samples. After all chunks are added, the result is the same as
+    ``minmax_decimate`` of the whole signal, except that NaN values are skipped instead of kept as gaps.
+    """
+    def __init__(self, x_range: tuple[float, float], n_columns: int):
+        """
+        Initialize an empty accumulator
+
+        Parameters
+        ----------
+        x_range : tuple[float, float]
+            The (start, stop) range of the x-axis
+        n_columns : int
+            The number of pixel columns of the x-axis
+        """
+        self.x_range = (float(min(x_range)), float(max(x_range)))
+        self.n_columns = max(int(n_columns), 1)
+        self.n_samples = 0
+        # rows: first, minimum, maximum and last sample, columns: the pixel columns and one margin column
+        # on each side for the samples outside the range
+        self._indices = np.full((4, self.n_columns + 2), -1, dtype=np.int64)
+        self._x = np.zeros((4, self.n_columns + 2))
+        self._y = np.zeros((4, self.n_columns + 2))
+
+    @property
+    def nbytes(self) -> int:
+        """A getter property for the number of bytes of the accumulated samples
+
+        Returns
+        -------
+        int
+            The number of bytes
+        """
+        return self._indices.nbytes + self._x.nbytes + self._y.nbytes
+
+    def add(self, x_data: np.ndarray, y_data: np.ndarray) -> 'MinMaxAccumulator':
+        """
+        Add the next chunk of samples, NaN values are skipped
+
+        Parameters
+        ----------
+        x_data : np.ndarray
+            Sorted x-axis data following the samples of the previous chunks
+        y_data : np.ndarray
+            Y-axis data
+
+        Returns
+        -------
+        MinMaxAccumulator
+            The accumulator with the added samples
+        """
+        x_data = np.asarray(x_data, dtype=float)
+        y_data = np.asarray(y_data, dtype=float)
+        indices = self.n_samples + np.arange(len(x_data))
+        self.n_samples += len(x_data)
+        valid = ~np.isnan(y_data)
+        x_data, y_data, indices = x_data[valid], y_data[valid], indices[valid]
+        if len(x_data) == 0:
+            return self
+
+        start, stop = self.x_range
+        columns = np.floor((x_data - start) * (self.n_columns / ((stop - start) or 1.0)))
+        np.clip(columns, -1, self.n_columns, out=columns)
+        slots = columns.astype(np.intp) + 1
+        firsts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+        lasts = np.r_[firsts[1:], len(slots)] - 1
+        segment_ids = np.repeat(np.arange(len(firsts)), lasts - firsts + 1)
+        minimums, maximums = _segment_extremes(y_data, firsts, segment_ids)
+        segment_slots = slots[firsts]
+
+        # the first sample is only set for empty columns, the last sample is always replaced
+        empty = self._indices[0, segment_slots] < 0
+        updates = [(0, segment_slots[empty], firsts[empty]), (3, segment_slots, lasts)]
+        for row, positions, better in ((1, minimums, np.less), (2, maximums, np.greater)):
+            replace = empty | better(y_data[positions], self._y[row, segment_slots])
+            updates.append((row, segment_slots[replace], positions[replace]))
+        for row, target_slots, positions in updates:
+            self._indices[row, target_slots] = indices[positions]
+            self._x[row, target_slots] = x_data[positions]
+            self._y[row, target_slots] = y_data[positions]
+        return self
+
+    def result(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the accumulated samples in their original order
+
+        Returns
+        -------
+        tuple
+            containing the reduced x-axis and y-axis data
+        """
+        filled = self._indices >= 0
+        _, positions = np.unique(self._indices[filled], return_index=True)
+        return self._x[filled][positions], self._y[filled][positions]
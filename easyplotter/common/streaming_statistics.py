@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""A module for computing statistics of signals in a single streaming pass
+
+All statistics are updated chunk by chunk with bounded memory and can be merged, so the statistics
+of many recordings or worker processes are combined without loading all samples at once. Merging
+the partial results gives the same counts, histograms and quantiles as updating with all samples.
+"""
+import numpy as np
+
+
+class RunningMoments:
+    """Count, mean, variance, minimum and maximum of a stream of values
+
+    The chunks are combined with the parallel algorithm of Chan et al., NaN values are skipped.
+    """
+    def __init__(self) -> None:
+        """
+        Initialize empty moments
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @property
+    def variance(self) -> float:
+        """A getter property for the population variance
+
+        Returns
+        -------
+        float
+            The variance or NaN without values
+        """
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def std(self) -> float:
+        """A getter property for the population standard deviation
+
+        Returns
+        -------
+        float
+            The standard deviation or NaN without values
+        """
+        return float(np.sqrt(self.variance))
+
+    def update(self, values: np.ndarray) -> 'RunningMoments':
+        """
+        Add a chunk of values
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of the chunk
+
+        Returns
+        -------
+        RunningMoments
+            The updated moments
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        chunk = RunningMoments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(np.sum((values - chunk.mean) ** 2))
+        chunk.minimum = float(values.min())
+        chunk.maximum = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """
+        Merge the moments of other values into these moments
+
+        Parameters
+        ----------
+        other : RunningMoments
+            The moments of the other values
+
+        Returns
+        -------
+        RunningMoments
+            The merged moments
+        """
+        if other.count == 0:
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+
+class FixedHistogram:
+    """A histogram with fixed bins, values outside the bins are counted as underflow and overflow
+    """
+    def __init__(self, start: float, stop: float, bin_width: float) -> None:
+        """
+        Initialize an empty histogram
+
+        Parameters
+        ----------
+        start : float
+            The lower edge of the first bin
+        stop : float
+            The upper edge of the last bin
+        bin_width : float
+            The width of the bins
+        """
+        self.n_bins = max(int(np.ceil((stop - start) / bin_width - 1e-9)), 1)
+        self.edges = start + bin_width * np.arange(self.n_bins + 1)
+        self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def total(self) -> int:
+        """A getter property for the number of counted values
+
+        Returns
+        -------
+        int
+            The number of values including underflow and overflow
+        """
+        return int(self.counts.sum()) + self.underflow + self.overflow
+
+    def update(self, values: np.ndarray) -> 'FixedHistogram':
+        """
+        Add a chunk of values, NaN values are skipped
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of the chunk
+
+        Returns
+        -------
+        FixedHistogram
+            The updated histogram
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        bin_width = self.edges[1] - self.edges[0]
+        bins = np.floor((values - self.edges[0]) / bin_width).astype(np.int64)
+        # values on the upper edge belong to the last bin
+        bins[values == self.edges[-1]] = self.n_bins - 1
+        self.underflow += int(np.count_nonzero(bins < 0))
+        self.overflow += int(np.count_nonzero(bins >= self.n_bins))
+        self.counts += np.bincount(bins[(bins >= 0) & (bins < self.n_bins)], minlength=self.n_bins)
+        return self
+
+    def merge(self, other: 'FixedHistogram') -> 'FixedHistogram':
+        """
+        Merge the histogram of other values with the same bins into this histogram
+
+        Parameters
+        ----------
+        other : FixedHistogram
+            The histogram of the other values
+
+        Returns
+        -------
+        FixedHistogram
+            The merged histogram
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms with different bins can not be merged.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def cdf(self) -> np.ndarray:
+        """
+        Get the cumulative distribution at the upper edge of each bin
+
+        Returns
+        -------
+        np.ndarray
+            The fraction of all values below the upper edge of each bin
+        """
+        total = self.total
+        if total == 0:
+            return np.zeros(self.n_bins)
+        return (self.underflow + np.cumsum(self.counts)) / total
+
+
+class QuantileSketch:
+    """A mergeable quantile sketch with a relative accuracy, following the DDSketch algorithm
+
+    The values are counted in logarithmic buckets, the bucket of a value v is ceil(log(|v|) / log(gamma)).
+    Each quantile is returned with a relative error of at most ``relative_accuracy``. The memory grows
+    with the logarithm of the value range and not with the number of values, and merging two sketches
+    adds their bucket counts, so the merged sketch is the same as the sketch of all values.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9) -> None:
+        """
+        Initialize an empty sketch
+
+        Parameters
+        ----------
+        relative_accuracy : float, optional
+            The relative accuracy of the quantiles, by default 0.01
+        min_value : float, optional
+            Values with a smaller magnitude are counted as zero, by default 1e-9
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.positive: dict[int, int] = {}
+        self.negative: dict[int, int] = {}
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        """A getter property for the number of values
+
+        Returns
+        -------
+        int
+            The number of values in the sketch
+        """
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zero_count
+
+    def update(self, values: np.ndarray) -> 'QuantileSketch':
+        """
+        Add a chunk of values, NaN values are skipped
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values of the chunk
+
+        Returns
+        -------
+        QuantileSketch
+            The updated sketch
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        magnitudes = np.abs(values)
+        self.zero_count += int(np.count_nonzero(magnitudes < self.min_value))
+        for store, selected in ((self.positive, values >= self.min_value), (self.negative, values <= -self.min_value)):
+            keys, counts = np.unique(np.ceil(np.log(magnitudes[selected]) / np.log(self.gamma)).astype(np.int64),
+                                     return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                store[key] = store.get(key, 0) + count
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """
+        Merge the sketch of other values with the same accuracy into this sketch
+
+        Parameters
+        ----------
+        other : QuantileSketch
+            The sketch of the other values
+
+        Returns
+        -------
+        QuantileSketch
+            The merged sketch
+        """
+        if other.gamma != self.gamma or other.min_value != self.min_value:
+            raise ValueError("Quantile sketches with different accuracies can not be merged.")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        return self
+
+    def quantiles(self, fractions: list[float]) -> np.ndarray:
+        """
+        Get quantiles of the values
+
+        Parameters
+        ----------
+        fractions : list[float]
+            The quantiles as fractions between 0 and 1, e.g. 0.5 for the median
+
+        Returns
+        -------
+        np.ndarray
+            The quantiles or NaN without values
+        """
+        count = self.count
+        if count == 0:
+            return np.full(len(fractions), np.nan)
+
+        # buckets in ascending order of their values: negative, zero, positive
+        negative_keys = sorted(self.negative, reverse=True)
+        positive_keys = sorted(self.positive)
+        values = np.concatenate((-self._bucket_values(negative_keys), [0.0], self._bucket_values(positive_keys)))
+        counts = np.array([self.negative[key] for key in negative_keys] + [self.zero_count]
+                          + [self.positive[key] for key in positive_keys])
+        ranks = np.asarray(fractions, dtype=float) * (count - 1)
+        return values[np.searchsorted(np.cumsum(counts), ranks, side='right')]
+
+    def _bucket_values(self, keys: list[int]) -> np.ndarray:
+        """
+        Get the representative values of buckets, which have the smallest relative error within the buckets
+
+        Parameters
+        ----------
+        keys : list[int]
+            The keys of the buckets
+
+        Returns
+        -------
+        np.ndarray
+            The magnitudes represented by the buckets
+        """
+        return 2 * self.gamma ** np.asarray(keys, dtype=float) / (self.gamma + 1)
+
+
+class SignalStatistics:
+    """The moments, the histogram and the quantile sketch of a signal
+    """
+    def __init__(self, bins: tuple[float, float, float] | None = None, relative_accuracy: float = 0.01) -> None:
+        """
+        Initialize empty statistics
+
+        Parameters
+        ----------
+        bins : tuple[float, float, float] | None, optional
+            The start, stop and width of the histogram bins, by default None for no histogram
+        relative_accuracy : float, optional
+            The relative accuracy of the quantiles, by default 0.01
+        """
+        self.moments = RunningMoments()
+        self.histogram = FixedHistogram(*bins) if bins is not None else None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    @property
+    def nbytes(self) -> int:
+        """A getter property for the approximate number of bytes of the statistics
+
+        Returns
+        -------
+        int
+            The number of bytes of the histogram and the sketch buckets
+        """
+        histogram_bytes = self.histogram.counts.nbytes if self.histogram is not None else 0
+        return histogram_bytes + 16 * (len(self.sketch.positive) + len(self.sketch.negative))
+
+    def update(self, values: np.ndarray, chunk_size: int = 1_000_000) -> 'SignalStatistics':
+        """
+        Add the values of a signal in chunks
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The values, e.g. a memory-mapped column
+        chunk_size : int, optional
+            The number of values processed at once, by default 1000000
+
+        Returns
+        -------
+        SignalStatistics
+            The updated statistics
+        """
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            self.moments.update(chunk)
+            if self.histogram is not None:
+                self.histogram.update(chunk)
+            self.sketch.update(chunk)
+        return self
+
+    def merge(self, other: 'SignalStatistics') -> 'SignalStatistics':
+        """
+        Merge the statistics of other values into these statistics
+
+        Parameters
+        ----------
+        other : SignalStatistics
+            The statistics of the other values
+
+        Returns
+        -------
+        SignalStatistics
+            The merged statistics
+        """
+        self.moments.merge(other.moments)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        elif self.histogram is not None or other.histogram is not None:
+            raise ValueError("Statistics with and without histogram can not be merged.")
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self, percentiles: list[float]) -> dict:
+        """
+        Summarize the statistics
+
+        Parameters
+        ----------
+        percentiles : list[float]
+            The percentiles between 0 and 100
+
+        Returns
+        -------
+        dict
+            The count, minimum, mean, standard deviation, maximum and percentiles
+        """
+        quantiles = self.sketch.quantiles([percentile / 100 for percentile in percentiles])
+        return {'count': self.moments.count, 'min': float(self.moments.minimum), 'mean': self.moments.mean,
+                'std': self.moments.std, 'max': float(self.moments.maximum),
+                'percentiles': {f"{percentile:g}": float(quantile)
+                                for percentile, quantile in zip(percentiles, quantiles)}}
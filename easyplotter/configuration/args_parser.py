@@ -20,4 +20,27 @@ def args_parse():
         default=Path("test_results"),
         help="The path to the output file"
     )
+    parser.add_argument(
+        "--data",
+        nargs="+",
+        default=None,
+        help="The recordings to plot as paths, glob patterns or manifest files (.txt) with one path per line, "
+             "the plots of each recording are saved in a directory per recording"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="The number of processes rendering the plots in parallel"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Create all plots, otherwise the plots whose inputs have not changed since the last run are skipped"
+    )
+    parser.add_argument(
+        "--show",
+        action="store_true",
+        help="Show each plot in a window after saving it, otherwise the plots are rendered in batch mode"
+    )
     return parser.parse_args()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import json
+import math
 from pathlib import Path
 
 from easyplotter.common.logger import logger
@@ -36,3 +37,100 @@ class ConfigParser:
         """
         logger.info("Get time domain plots configuration.")
         return self.config.get('visualization', {}).get('time_domain_plot', [])
+
+    def get_statistics_plots(self) -> list:
+        """
+        Get statistics plots configuration from the configuration file
+
+        Returns
+        -------
+        list
+            Statistics plots configuration
+        """
+        logger.info("Get statistics plots configuration.")
+        return self.config.get('visualization', {}).get('statistics_plot', [])
+
+    def get_signal_columns(self) -> dict[str, str]:
+        """
+        Collect the signals used by all time domain plots
+
+        A signal is loaded from the data column given by its optional ``column`` entry, otherwise from the
+        column with the same name as ``signal_name``, so ``signal_name`` can be used as an alias.
+        The signals of the event markers, the rectangles, the scatters and the fitted lines are collected as well.
+
+        Returns
+        -------
+        dict[str, str]
+            Mapping of signal names to the column names in the data file
+        """
+        signal_columns = {}
+        for plots_config in self.get_time_domain_plots():
+            for signal in (plots_config.get('signals', []) + plots_config.get('event_markers', [])
+                           + plots_config.get('rectangles', []) + plots_config.get('fitted lines', [])):
+                if 'signal_name' not in signal:
+                    continue
+                signal_name = signal['signal_name']
+                if 'column' in signal:
+                    signal_columns[signal_name] = signal['column']
+                else:
+                    # an alias defined by another entry of the signal is kept
+                    signal_columns.setdefault(signal_name, signal_name)
+            for scatter in plots_config.get('scatters', []):
+                for key in ('x_signal_name', 'y_signal_name'):
+                    if key in scatter:
+                        signal_columns.setdefault(scatter[key], scatter[key])
+
+        logger.info(f"Collect {len(signal_columns)} signals from the plot configuration.")
+        return signal_columns
+
+    def get_time_window(self) -> tuple[float, float] | None:
+        """
+        Get the time window covering the x-axis limits of all time domain plots
+
+        Returns
+        -------
+        tuple[float, float] | None
+            The (start, stop) window or None if a plot has no x-axis limits
+        """
+        starts, stops = [], []
+        for plots_config in self.get_time_domain_plots():
+            x_axis = plots_config.get('plot_settings', {}).get('x_axis_settings', {}).get('x_axis', '')
+            try:
+                start, stop, _ = map(float, x_axis.split('::'))
+            except ValueError:
+                return None
+            starts.append(start)
+            stops.append(stop)
+
+        if not starts:
+            return None
+
+        logger.info(f"Get time window [{min(starts)}, {max(stops)}] of all plots.")
+        return min(starts), max(stops)
+
+    def get_streaming_columns(self, columns_per_plot: int, max_columns: int) -> int | None:
+        """
+        Get the number of pixel columns of the time window, so each plot keeps its resolution
+
+        Parameters
+        ----------
+        columns_per_plot : int
+            The number of pixel columns needed over the x-axis of a plot
+        max_columns : int
+            The upper limit of the pixel columns
+
+        Returns
+        -------
+        int | None
+            The number of pixel columns or None if a plot has no x-axis limits
+        """
+        time_window = self.get_time_window()
+        if time_window is None:
+            return None
+
+        n_columns = columns_per_plot
+        for plots_config in self.get_time_domain_plots():
+            start, stop, _ = map(float, plots_config['plot_settings']['x_axis_settings']['x_axis'].split('::'))
+            if stop > start:
+                n_columns = max(n_columns, math.ceil(columns_per_plot * (time_window[1] - time_window[0]) / (stop - start)))
+        return min(n_columns, max_columns)
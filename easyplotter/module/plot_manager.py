@@ -1,10 +1,22 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import logging
+import os
 from pathlib import Path
+import traceback
 
-from easyplotter.common.data_provider import DataProvider
-from easyplotter.common.image_saver import ImageSaver
-from easyplotter.common.plot_builder import PlotBuilder
-from easyplotter.module.plotting import PlotSettings, PlotSignals, PlotVerticalLines, PlotAnnotation
+from easyplotter.common.build_manifest import BuildManifest
+from easyplotter.common.data_provider import DataProvider, get_reader
+from easyplotter.common.dataset_cache import dataset_cache
+from easyplotter.common.image_saver import ImageSaver, image_writer
+from easyplotter.common.plot_builder import PlotBuilder, figure_pool
+from easyplotter.common.render_cache import render_cache
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.common.streaming_statistics import SignalStatistics
+from easyplotter.module.plotting import (PlotSettings, PlotSignals, PlotVerticalLines, PlotHorizontalLines,
+                                        PlotRectangles, PlotTexts, PlotScatters, PlotFittedLines, PlotEventMarkers,
+                                        PlotStatistics, PlotAnnotation)
 from easyplotter.configuration.config_parser import ConfigParser
 from easyplotter.common.logger import logger
 
@@ -14,7 +26,8 @@ class PlotManager:
     Manager for creating plots
     """
 
-    def __init__(self, config_path: Path, output_dir: Path):
+    def __init__(self, config_path: Path, output_dir: Path, jobs: int = 1, show: bool = False,
+                 data_paths: list[Path] | None = None, force: bool = False):
         """
         Initialize plot manager with a configuration file path
 
@@ -22,46 +35,781 @@ class PlotManager:
         ----------
         config_path : Path
             Path to the configuration file
+        output_dir : Path
+            Path to the output directory
+        jobs : int, optional
+            Number of processes rendering the plots in parallel, by default 1
+        show : bool, optional
+            Whether to show each plot after saving it, only used without parallel processes, by default False.
+            Without showing, the plots are rendered in batch mode without pyplot.
+        data_paths : list[Path] | None, optional
+            The recordings to plot, the plots of each recording are saved in a directory per recording,
+            by default None to plot the example recording into the output directory
+        force : bool, optional
+            Whether to create all plots, by default False to skip the plots whose inputs have not changed
+            since the last run into the output directory
         """
         logger.info("Initialize PlotManager.")
-        # Initialize ImageSaver
-        self.image_saver = ImageSaver(output_dir)
+        self.config_path = config_path
+        self.output_dir = output_dir
+        self.jobs = max(jobs, 1)
+        self.show = show and self.jobs == 1
+        # Initialize ImageSaver, the images are written in the background while the next plot is built
+        self.image_writer = None if self.show else image_writer
+        self.image_saver = ImageSaver(output_dir, self.image_writer)
         # Initialize configuration parser
         self.config_parser = ConfigParser(config_path)
         # Get time domain plots configuration
         self.plots_configs = self.config_parser.get_time_domain_plots()
+        # Get statistics plots configuration
+        self.statistics_configs = self.config_parser.get_statistics_plots()
+        # The recordings to plot and the output directory of each recording
+        self.data_paths = list(data_paths) if data_paths else [Path('tests/data/filtered_signal_segment.csv')]
+        self.data_path = self.data_paths[0]
+        self.per_recording_dirs = bool(data_paths)
+        self.recording_dirs = get_recording_dirs(self.data_paths) if self.per_recording_dirs else {self.data_path: Path()}
+        self._image_savers = {Path(): self.image_saver}
+        # The inputs of the plots of the last run, to skip the unchanged plots
+        self.force = force
+        self.manifest = BuildManifest(output_dir)
+        # Collect the signals of all plots to load only the required columns
+        self.signal_columns = self.config_parser.get_signal_columns()
+        # Read only the samples within the x-axis limits of all plots
+        self.time_window = self.config_parser.get_time_window()
+        # Pixel columns of the time window kept when a large recording is streamed
+        streaming_settings = SettingsParser(Path("config/application_settings.ini")).get("streaming")
+        self.streaming_columns = self.config_parser.get_streaming_columns(streaming_settings.get('columns', 4096),
+                                                                          streaming_settings.get('max_columns', 1_000_000))
+        # The inputs of a time domain plot besides its configuration entry, recordings and settings, which
+        # change the image, used by the build manifest and the render cache alike
+        self.render_inputs = (self.time_window, self.streaming_columns)
 
-    def create_plots(self) -> None:
+    def create_plots(self) -> dict[str, str]:
         """
         Create plots based on the configuration
+
+        A failing plot is reported with its plot id and does not abort the other plots. With many recordings,
+        the plots of each recording are created together, so each recording is loaded only once. Plots whose
+        configuration, recordings and easyplotter version have not changed since the last run are skipped,
+        unless ``force`` is set.
+
+        Returns
+        -------
+        dict[str, str]
+            The error messages of the failed plots by plot id, prefixed with the directory of the recording
+        """
+        digests: dict[str, str] = {}
+        stale_plots = self._get_stale_plots(digests)
+        if self.jobs > 1 and len(stale_plots) > 1:
+            errors, outputs = self._create_recordings_parallel(stale_plots)
+        elif self.jobs > 1 and sum(len(indices) for indices in stale_plots.values()) > 1:
+            errors, outputs = self._create_plots_parallel(*next(iter(stale_plots.items())))
+        else:
+            errors, outputs = {}, {}
+            for data_path, indices in stale_plots.items():
+                recording_errors, recording_outputs = self.create_recording_plots(data_path, indices)
+                errors.update(recording_errors)
+                outputs.update(recording_outputs)
+
+        for statistics_config in self.statistics_configs:
+            plot_id = statistics_config['id']
+            digests[plot_id] = self.manifest.make_digest(statistics_config, self._get_recordings(statistics_config))
+            if not self.force and self.manifest.is_up_to_date(plot_id, digests[plot_id]):
+                self.manifest.skip(plot_id)
+                logger.info(f"Skip unchanged plot {plot_id}.")
+                continue
+            try:
+                outputs[plot_id] = self.create_statistics_plot(statistics_config)
+            except Exception:
+                errors[plot_id] = traceback.format_exc()
+                logger.error(f"Failed to create plot {plot_id}:\n{errors[plot_id]}")
+        self.flush_writes(outputs, errors)
+
+        for plot_id in errors:
+            self.manifest.forget(plot_id)
+        for plot_id, plot_outputs in outputs.items():
+            self.manifest.record(plot_id, digests[plot_id], plot_outputs)
+        self.manifest.save()
+
+        dataset_cache.report()
+        render_cache.report()
+        n_plots = len(self.plots_configs) * len(self.data_paths) + len(self.statistics_configs)
+        n_skipped = len(self.manifest.skipped)
+        logger.info(f"Created {n_plots - n_skipped - len(errors)} of {n_plots} plots, "
+                    f"skipped {n_skipped} unchanged plots.")
+        if errors:
+            logger.error(f"Failed plots: {', '.join(errors)}")
+        return errors
+
+    def _get_stale_plots(self, digests: dict[str, str]) -> dict[Path, list[int]]:
+        """
+        Get the time domain plots to create, the plots with unchanged inputs are skipped
+
+        Parameters
+        ----------
+        digests : dict[str, str]
+            The digests of the inputs by plot id, filled for all plots
+
+        Returns
+        -------
+        dict[Path, list[int]]
+            The indices of the plots to create for each recording with plots to create
+        """
+        stale_plots = {}
+        for data_path in self.data_paths:
+            for index, plots_config in enumerate(self.plots_configs):
+                plot_id = self.get_plot_id(data_path, plots_config.get('id', str(index)))
+                digests[plot_id] = self.manifest.make_digest(plots_config, [data_path], *self.render_inputs)
+                if not self.force and self.manifest.is_up_to_date(plot_id, digests[plot_id]):
+                    self.manifest.skip(plot_id)
+                    logger.info(f"Skip unchanged plot {plot_id}.")
+                else:
+                    stale_plots.setdefault(data_path, []).append(index)
+        return stale_plots
+
+    def create_recording_plots(self, data_path: Path,
+                               indices: list[int] | None = None) -> tuple[dict[str, str], dict[str, list[Path]]]:
+        """
+        Create the time domain plots of a recording
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the recording
+        indices : list[int] | None, optional
+            The indices of the plots in the configuration, by default None for all plots
+
+        Returns
+        -------
+        tuple
+            containing the error messages of the failed plots and the files of the created plots by plot id,
+            prefixed with the directory of the recording
+        """
+        errors, outputs = {}, {}
+        for index in range(len(self.plots_configs)) if indices is None else indices:
+            plots_config = self.plots_configs[index]
+            plot_id = self.get_plot_id(data_path, plots_config.get('id', str(index)))
+            try:
+                outputs[plot_id] = self.create_plot(plots_config, data_path)
+            except Exception:
+                errors[plot_id] = traceback.format_exc()
+                logger.error(f"Failed to create plot {plot_id}:\n{errors[plot_id]}")
+        self.flush_writes(outputs, errors)
+        return errors, outputs
+
+    def flush_writes(self, outputs: dict[str, list[Path]], errors: dict[str, str]) -> None:
+        """
+        Wait until the images are written, plots with a failed write are moved to the errors
+
+        Parameters
+        ----------
+        outputs : dict[str, list[Path]]
+            The files of the created plots by plot id
+        errors : dict[str, str]
+            The error messages of the failed plots by plot id
+        """
+        if self.image_writer is None:
+            return
+
+        write_errors = self.image_writer.flush()
+        for plot_id, plot_outputs in list(outputs.items()):
+            messages = [write_errors[str(output)] for output in plot_outputs if str(output) in write_errors]
+            if messages:
+                del outputs[plot_id]
+                errors[plot_id] = "\n".join(messages)
+                logger.error(f"Failed to create plot {plot_id}:\n{errors[plot_id]}")
+
+    def get_plot_id(self, data_path: Path, plot_id: str) -> str:
+        """
+        Get the id of a plot of a recording, as used in the error report
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the recording
+        plot_id : str
+            The id of the plot in the configuration
+
+        Returns
+        -------
+        str
+            The plot id prefixed with the output directory of the recording
         """
-        for plots_config in self.plots_configs:
-            dataset = DataProvider()
-            time, data = dataset.load_data(data_path=Path('tests/data/filtered_signal_segment.csv'))
+        recording_dir = self.recording_dirs.get(data_path, Path())
+        return plot_id if recording_dir == Path() else f"{recording_dir.as_posix()}/{plot_id}"
 
-            # Create a plot builder
-            builder = PlotBuilder()
-            logger.info("Create a PlotBuilder.")
+    def create_plot(self, plots_config: dict, data_path: Path | None = None) -> list[Path]:
+        """
+        Create and save a single plot
+
+        Parameters
+        ----------
+        plots_config : dict
+            The configuration of the plot
+        data_path : Path | None, optional
+            Path to the recording, by default None for the first recording
+
+        Returns
+        -------
+        list[Path]
+            The saved files of the plot
+        """
+        data_path = data_path or self.data_path
+        image_saver = self._get_image_saver(data_path)
 
-            # Apply plotter to the builder to build a coordinate system
+        # A plot rendered before with the same inputs is taken from the render cache
+        render_key = None
+        if render_cache.enabled and not self.show:
+            render_key = render_cache.make_key(plots_config, [data_path], *self.render_inputs)
+            outputs = image_saver.restore(render_key, plots_config['id'])
+            if outputs is not None:
+                return outputs
+
+        # The dataset is only parsed once, further figures get the cached arrays
+        dataset = DataProvider()
+        time, data = dataset.load_data(data_path=data_path,
+                                       signals=self.signal_columns,
+                                       time_window=self.time_window,
+                                       build_pyramids=True,
+                                       streaming_columns=self.streaming_columns)
+
+        # Create a plot builder, in batch mode a prepared figure with the same layout is reused
+        if self.show:
+            builder, prepared = PlotBuilder(interactive=True), False
+        else:
+            builder, prepared = figure_pool.acquire(plots_config['plot_settings'])
+        logger.info("Create a PlotBuilder.")
+
+        # Apply plotter to the builder to build a coordinate system
+        if not prepared:
             PlotSettings(plots_config['plot_settings']).apply(builder)
             logger.info("Apply PlotCoordSys to the PlotBuilder.")
 
-            # Apply plotter to the builder to add signals
-            PlotSignals(time, data, plots_config['signals']).apply(builder)
-            logger.info("Apply PlotSignals to the PlotBuilder.")
+        # Apply plotter to the builder to add signals
+        PlotSignals(time, data, plots_config['signals'], dataset.pyramids).apply(builder)
+        logger.info("Apply PlotSignals to the PlotBuilder.")
+
+        # Apply plotter to the builder to add vertical lines
+        PlotVerticalLines(plots_config['vertical_lines']).apply(builder)
+        logger.info("Apply PlotVerticalLines to the PlotBuilder.")
+
+        # Apply plotter to the builder to add scatters
+        PlotScatters(time, data, plots_config.get('scatters', [])).apply(builder)
+        logger.info("Apply PlotScatters to the PlotBuilder.")
 
-            # Apply plotter to the builder to add vertical lines
-            PlotVerticalLines(plots_config['vertical_lines']).apply(builder)
-            logger.info("Apply PlotVerticalLines to the PlotBuilder.")
+        # Apply plotter to the builder to add fitted lines
+        fitted_lines = PlotFittedLines(time, data, plots_config.get('fitted lines', []), dataset.key)
+        fitted_lines.apply(builder)
+        logger.info("Apply PlotFittedLines to the PlotBuilder.")
 
-            # Apply general settings to the plot
-            PlotAnnotation(plots_config['id'], plots_config['description']).apply(builder)
-            logger.info("Apply PlotGeneral to the PlotBuilder.")
+        # Apply plotter to the builder to add horizontal lines
+        PlotHorizontalLines(plots_config.get('horizontal_lines', [])).apply(builder)
+        logger.info("Apply PlotHorizontalLines to the PlotBuilder.")
 
-            # Save the plot
-            self.image_saver.save(builder.figure, plots_config['id'])
-            logger.info("Save the plot.")
+        # Apply plotter to the builder to add rectangles
+        PlotRectangles(time, data, plots_config.get('rectangles', [])).apply(builder)
+        logger.info("Apply PlotRectangles to the PlotBuilder.")
 
+        # Apply plotter to the builder to add texts
+        PlotTexts(plots_config.get('texts', [])).apply(builder)
+        logger.info("Apply PlotTexts to the PlotBuilder.")
+
+        # Apply plotter to the builder to add markers at the edges of signals
+        PlotEventMarkers(time, data, plots_config.get('event_markers', [])).apply(builder)
+        logger.info("Apply PlotEventMarkers to the PlotBuilder.")
+
+        # Apply general settings to the plot
+        PlotAnnotation(plots_config['id'], plots_config['description']).apply(builder)
+        logger.info("Apply PlotGeneral to the PlotBuilder.")
+
+        # Apply the recorded operations once before the plot is drawn
+        builder.finalize()
+
+        # Save the plot
+        outputs = image_saver.save_all(builder.figure, plots_config['id'], plots_config.get('output'))
+        logger.info("Save the plot.")
+
+        # Save the fit parameters and residual statistics next to the plot
+        if fitted_lines.fits:
+            outputs.append(image_saver.save_data(fitted_lines.fits, plots_config['id'], 'fits'))
+
+        if self.show:
             builder.show()
             logger.info("Show the plot.")
+
+        # Release the figure to the pool, so the memory does not grow with the number of plots
+        figure_pool.release(plots_config['plot_settings'], builder)
+
+        if render_key is not None:
+            image_saver.store(render_key, outputs)
+        return outputs
+
+    def create_statistics_plot(self, statistics_config: dict) -> list[Path]:
+        """
+        Create and save a statistics plot over one or many recordings
+
+        The statistics of each recording are computed in a single pass and merged, the summaries are saved
+        next to the plot.
+
+        Parameters
+        ----------
+        statistics_config : dict
+            The configuration of the statistics plot
+
+        Returns
+        -------
+        list[Path]
+            The saved files of the plot
+        """
+        recordings = self._get_recordings(statistics_config)
+        render_key = None
+        if render_cache.enabled and not self.show:
+            render_key = render_cache.make_key(statistics_config, recordings)
+            outputs = self.image_saver.restore(render_key, statistics_config['id'])
+            if outputs is not None:
+                return outputs
+
+        signal_columns = {signal['signal_name']: signal.get('column', signal['signal_name'])
+                          for signal in statistics_config['signals']}
+        bins = tuple(map(float, statistics_config['bins'].split('::'))) if 'bins' in statistics_config else None
+        statistics = self._compute_statistics(recordings, signal_columns, bins)
+
+        builder = PlotBuilder(interactive=self.show)
+        PlotSettings(statistics_config.get('plot_settings', {})).apply(builder)
+        plotter = PlotStatistics(statistics, statistics_config['signals'], statistics_config.get('kind', 'histogram'),
+                                 statistics_config.get('percentiles'))
+        plotter.apply(builder)
+        logger.info("Apply PlotStatistics to the PlotBuilder.")
+        PlotAnnotation(statistics_config['id'], statistics_config.get('description', '')).apply(builder)
+        builder.finalize()
+
+        outputs = self.image_saver.save_all(builder.figure, statistics_config['id'], statistics_config.get('output'))
+        outputs.append(self.image_saver.save_data(plotter.summaries(), statistics_config['id'], 'statistics'))
+        logger.info("Save the statistics plot.")
+
+        if self.show:
+            builder.show()
+        builder.close()
+
+        if render_key is not None:
+            self.image_saver.store(render_key, outputs)
+        return outputs
+
+    def _get_recordings(self, statistics_config: dict) -> list[Path]:
+        """
+        Get the recordings of a statistics plot
+
+        Parameters
+        ----------
+        statistics_config : dict
+            The configuration of the statistics plot with optional ``recordings`` as paths or glob patterns
+
+        Returns
+        -------
+        list[Path]
+            The sorted recordings, by default the recordings of the time domain plots
+        """
+        patterns = statistics_config.get('recordings')
+        if not patterns:
+            return list(self.data_paths)
+        return sorted({Path(path) for pattern in patterns for path in glob.glob(str(pattern), recursive=True)})
+
+    def _compute_statistics(self, recordings: list[Path], signal_columns: dict[str, str],
+                            bins: tuple[float, float, float] | None) -> dict[str, SignalStatistics]:
+        """
+        Compute the statistics of the signals over all recordings
+
+        With more than one job, the recordings are processed in parallel. The partial statistics are merged
+        in the order of the recordings.
+
+        Parameters
+        ----------
+        recordings : list[Path]
+            The recordings
+        signal_columns : dict[str, str]
+            Mapping of signal names to column names
+        bins : tuple[float, float, float] | None
+            The start, stop and width of the histogram bins
+
+        Returns
+        -------
+        dict[str, SignalStatistics]
+            The statistics of each signal
+        """
+        statistics_settings = SettingsParser(Path("config/application_settings.ini")).get("statistics")
+        arguments = [(recording, signal_columns, bins, statistics_settings.get('relative_accuracy', 0.01),
+                      statistics_settings.get('chunk_size', 1_000_000)) for recording in recordings]
+        logger.info(f"Compute statistics of {len(signal_columns)} signals over {len(recordings)} recordings.")
+
+        if self.jobs > 1 and len(recordings) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                partials = list(executor.map(_recording_statistics, *zip(*arguments)))
+        else:
+            partials = [_recording_statistics(*argument) for argument in arguments]
+
+        statistics = {}
+        for partial in partials:
+            for signal_name, signal_statistics in partial.items():
+                if signal_name in statistics:
+                    statistics[signal_name].merge(signal_statistics)
+                else:
+                    # the cached statistics of a recording are not modified by the merge
+                    statistics[signal_name] = SignalStatistics(bins, signal_statistics.sketch.relative_accuracy)
+                    statistics[signal_name].merge(signal_statistics)
+        return statistics
+
+    def _get_image_saver(self, data_path: Path) -> ImageSaver:
+        """
+        Get the image saver of the output directory of a recording
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the recording
+
+        Returns
+        -------
+        ImageSaver
+            The image saver, the output directory is created on first use
+        """
+        recording_dir = self.recording_dirs.get(data_path, Path())
+        if recording_dir not in self._image_savers:
+            output_dir = self.output_dir / recording_dir
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # the shared logger is redirected by _init_worker in the worker processes
+            self._image_savers[recording_dir] = ImageSaver(output_dir, self.image_writer,
+                                                           saver_logger=self.image_saver.logger)
+        return self._image_savers[recording_dir]
+
+    def _create_recordings_parallel(self, stale_plots: dict[Path, list[int]]
+                                    ) -> tuple[dict[str, str], dict[str, list[Path]]]:
+        """
+        Render the plots of the recordings in a pool of processes on the Agg backend
+
+        All plots of a recording are rendered by the same worker, so the recording is loaded once. The
+        recordings are submitted from the largest to the smallest file, so a large recording starts first
+        and the small ones fill up the other workers. The log records are emitted in the order of the
+        recordings.
+
+        Parameters
+        ----------
+        stale_plots : dict[Path, list[int]]
+            The indices of the plots to create for each recording
+
+        Returns
+        -------
+        tuple
+            containing the error messages of the failed plots and the files of the created plots by plot id,
+            prefixed with the directory of the recording
+        """
+        logger.info(f"Render the plots of {len(stale_plots)} recordings with {self.jobs} processes.")
+        schedule = sorted(stale_plots, key=lambda data_path: Path(data_path).stat().st_size, reverse=True)
+        errors, outputs = {}, {}
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.config_path, self.output_dir,
+                                           self.data_paths if self.per_recording_dirs else None)) as executor:
+            futures = {data_path: executor.submit(_render_recording, data_path, stale_plots[data_path])
+                       for data_path in schedule}
+            for data_path in stale_plots:
+                try:
+                    records, recording_errors, recording_outputs, cache_counts = futures[data_path].result()
+                except Exception:
+                    plot_id = self.get_plot_id(data_path, '*')
+                    records, recording_outputs, cache_counts = [], {}, ()
+                    recording_errors = {plot_id: traceback.format_exc()}
+                    logger.error(f"Failed to create the plots of {data_path}:\n{recording_errors[plot_id]}")
+                self._merge_worker_results(records, cache_counts)
+                errors.update(recording_errors)
+                outputs.update(recording_outputs)
+
+        return errors, outputs
+
+    def _create_plots_parallel(self, data_path: Path, indices: list[int]) -> tuple[dict[str, str], dict[str, list[Path]]]:
+        """
+        Render the plots of a recording in a pool of processes on the Agg backend
+
+        The log records of each plot are collected in the worker and emitted in the order of the
+        configuration, so the output stays deterministic.
+
+        Parameters
+        ----------
+        data_path : Path
+            Path to the recording
+        indices : list[int]
+            The indices of the plots to create
+
+        Returns
+        -------
+        tuple
+            containing the error messages of the failed plots and the files of the created plots by plot id
+        """
+        logger.info(f"Render {len(indices)} plots with {self.jobs} processes.")
+        errors, outputs = {}, {}
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.config_path, self.output_dir,
+                                           self.data_paths if self.per_recording_dirs else None)) as executor:
+            futures = [executor.submit(_render_plot, index, data_path) for index in indices]
+            for index, future in zip(indices, futures):
+                plot_id = self.get_plot_id(data_path, self.plots_configs[index].get('id', str(index)))
+                try:
+                    records, error, plot_outputs, cache_counts = future.result()
+                except Exception:
+                    records, error, plot_outputs, cache_counts = [], traceback.format_exc(), [], ()
+                self._merge_worker_results(records, cache_counts)
+                if error is not None:
+                    errors[plot_id] = error
+                    logger.error(f"Failed to create plot {plot_id}:\n{error}")
+                else:
+                    outputs[plot_id] = plot_outputs
+
+        return errors, outputs
+
+    @staticmethod
+    def _merge_worker_results(records: list[logging.LogRecord], cache_counts: tuple[int, ...]) -> None:
+        """
+        Emit the log records of a worker and add its cache statistics to the report of the run
+
+        Parameters
+        ----------
+        records : list[logging.LogRecord]
+            The log records collected in the worker
+        cache_counts : tuple[int, ...]
+            The counters of the caches of the worker, see ``_cache_counts``
+        """
+        counters = [(cache, name) for cache, names in _CACHE_COUNTERS for name in names]
+        for (cache, name), count in zip(counters, cache_counts):
+            setattr(cache, name, getattr(cache, name) + count)
+        for record in records:
+            logger.handle(record)
+
+
+class _RecordCollector(logging.Handler):
+    """
+    Log handler collecting the records of a worker process
+    """
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # format the message in the worker, the arguments might not be picklable
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        self.records.append(record)
+
+
+# plot manager and log collector of a worker process
+_worker_manager: PlotManager | None = None
+_worker_collector = _RecordCollector()
+# counters of the caches of a worker process, added to the report of the main process
+_CACHE_COUNTERS = ((dataset_cache, ('hits', 'misses', 'evictions')),
+                   (render_cache, ('hits', 'misses', 'evictions', 'bytes_saved')))
+
+
+def _init_worker(config_path: Path, output_dir: Path, data_paths: list[Path] | None = None) -> None:
+    """
+    Initialize a worker process with the Agg backend and a plot manager
+
+    Parameters
+    ----------
+    config_path : Path
+        Path to the configuration file
+    output_dir : Path
+        Path to the output directory
+    data_paths : list[Path] | None, optional
+        The recordings to plot, by default None for the example recording
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    global _worker_manager
+    _worker_manager = PlotManager(config_path, output_dir, data_paths=data_paths)
+
+    # collect the records instead of printing them, the main process emits them in order
+    for worker_logger in (logger, _worker_manager.image_saver.logger):
+        for handler in list(worker_logger.handlers):
+            worker_logger.removeHandler(handler)
+        worker_logger.addHandler(_worker_collector)
+
+
+def _cache_counts() -> tuple[int, ...]:
+    """
+    Get the counters of the caches, which are added to the report of the main process
+
+    Returns
+    -------
+    tuple[int, ...]
+        The counters of ``_CACHE_COUNTERS`` in their order
+    """
+    return tuple(getattr(cache, name) for cache, names in _CACHE_COUNTERS for name in names)
+
+
+def _render_plot(index: int, data_path: Path
+                 ) -> tuple[list[logging.LogRecord], str | None, list[Path], tuple[int, ...]]:
+    """
+    Render a plot in a worker process
+
+    Parameters
+    ----------
+    index : int
+        Index of the plot in the configuration
+    data_path : Path
+        Path to the recording
+
+    Returns
+    -------
+    tuple
+        containing the log records, the error message or None if the plot is created, the saved files and
+        the counters of the caches while creating the plot
+    """
+    _worker_collector.records = []
+    cache_counts = _cache_counts()
+    error, outputs = None, []
+    try:
+        outputs = _worker_manager.create_plot(_worker_manager.plots_configs[index], data_path)
+    except Exception:
+        error = traceback.format_exc()
+    # wait for the written image, so a failed write is reported as error of the plot
+    if _worker_manager.image_writer is not None:
+        error = next(iter(_worker_manager.image_writer.flush().values()), error)
+
+    cache_counts = tuple(count - previous for count, previous in zip(_cache_counts(), cache_counts))
+    return _worker_collector.records, error, outputs, cache_counts
+
+
+def _render_recording(data_path: Path, indices: list[int]
+                      ) -> tuple[list[logging.LogRecord], dict[str, str], dict[str, list[Path]], tuple[int, ...]]:
+    """
+    Render the plots of a recording in a worker process
+
+    Parameters
+    ----------
+    data_path : Path
+        Path to the recording
+    indices : list[int]
+        The indices of the plots in the configuration
+
+    Returns
+    -------
+    tuple
+        containing the log records, the error messages of the failed plots, the saved files of the created
+        plots and the counters of the caches while creating the plots
+    """
+    _worker_collector.records = []
+    cache_counts = _cache_counts()
+    errors, outputs = _worker_manager.create_recording_plots(data_path, indices)
+
+    cache_counts = tuple(count - previous for count, previous in zip(_cache_counts(), cache_counts))
+    return _worker_collector.records, errors, outputs, cache_counts
+
+
+def get_data_paths(sources: list[str]) -> list[Path]:
+    """
+    Collect the recordings from paths, glob patterns and manifest files
+
+    A manifest is a text file (``.txt``) with one path or glob pattern per line, relative paths belong to
+    the directory of the manifest. Empty lines and lines starting with ``#`` are skipped.
+
+    Parameters
+    ----------
+    sources : list[str]
+        The paths, glob patterns and manifest files
+
+    Returns
+    -------
+    list[Path]
+        The recordings in the order of the sources, each recording once
+    """
+    data_paths = []
+    for source in sources:
+        if Path(source).suffix.lower() == '.txt':
+            manifest_dir = Path(source).parent
+            lines = Path(source).read_text(encoding='utf-8').splitlines()
+            patterns = [str(manifest_dir / line.strip()) for line in lines if line.strip() and not line.lstrip().startswith('#')]
+        else:
+            patterns = [source]
+
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+            if not matches:
+                logger.warning(f"No recording matches {pattern}.")
+            for match in matches:
+                if not Path(match).is_file():
+                    raise FileNotFoundError(f"Recording {match} not found")
+                data_paths.append(Path(match))
+
+    logger.info(f"Collect {len(dict.fromkeys(data_paths))} recordings from {len(sources)} data sources.")
+    return list(dict.fromkeys(data_paths))
+
+
+def get_recording_dirs(data_paths: list[Path]) -> dict[Path, Path]:
+    """
+    Get the output directory of each recording relative to the output directory
+
+    The directories mirror the folders of the recordings below their common folder and are named after the
+    recordings without extension, or with extension if two recordings only differ by their extension.
+
+    Parameters
+    ----------
+    data_paths : list[Path]
+        The recordings
+
+    Returns
+    -------
+    dict[Path, Path]
+        The relative output directory of each recording
+    """
+    resolved_paths = {data_path: Path(data_path).resolve() for data_path in data_paths}
+    common_dir = Path(os.path.commonpath([resolved_path.parent for resolved_path in resolved_paths.values()]))
+    relative_paths = {data_path: resolved_path.relative_to(common_dir) for data_path, resolved_path in resolved_paths.items()}
+
+    stems = [relative_path.with_suffix('') for relative_path in relative_paths.values()]
+    return {data_path: relative_path.with_suffix('') if stems.count(relative_path.with_suffix('')) == 1
+            else relative_path.with_name(relative_path.name.replace('.', '_'))
+            for data_path, relative_path in relative_paths.items()}
+
+
+def _recording_statistics(data_path: Path, signal_columns: dict[str, str], bins: tuple[float, float, float] | None,
+                          relative_accuracy: float, chunk_size: int) -> dict[str, SignalStatistics]:
+    """
+    Compute the statistics of the signals of a recording in a single pass
+
+    The signals are loaded without the dataset cache and processed in chunks, so only the statistics of
+    the recording are kept in memory. Large recordings are streamed, so they are never loaded at once.
+    The statistics are shared through the dataset cache.
+
+    Parameters
+    ----------
+    data_path : Path
+        Path to the recording
+    signal_columns : dict[str, str]
+        Mapping of signal names to column names
+    bins : tuple[float, float, float] | None
+        The start, stop and width of the histogram bins
+    relative_accuracy : float
+        The relative accuracy of the quantiles
+    chunk_size : int
+        The number of samples processed at once
+
+    Returns
+    -------
+    dict[str, SignalStatistics]
+        The statistics of each signal found in the recording
+    """
+    def load() -> dict[str, SignalStatistics]:
+        dataset = DataProvider()
+        if not dataset.is_large(data_path) or not get_reader(data_path).has_time_column:
+            _, data = dataset.load_data(data_path, signals=signal_columns, use_cache=False)
+            return {signal_name: SignalStatistics(bins, relative_accuracy).update(values, chunk_size)
+                    for signal_name, values in data.items()}
+
+        statistics = {}
+        for _, data in dataset.iter_chunks(data_path, signals=signal_columns, chunk_rows=chunk_size):
+            for signal_name, values in data.items():
+                statistics.setdefault(signal_name, SignalStatistics(bins, relative_accuracy)).update(values, chunk_size)
+        return statistics
+
+    key = dataset_cache.make_key(data_path, 'statistics', tuple(sorted(signal_columns.items())), bins,
+                                 relative_accuracy)
+    return dataset_cache.get_or_load(key, load)
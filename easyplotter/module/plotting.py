@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 from abc import ABC
+from pathlib import Path
 
 import numpy as np
 
+from easyplotter.common.curve_fitting import CurveFit, fit_curves
+from easyplotter.common.dataset_cache import dataset_cache
 from easyplotter.common.plot_builder import PlotBuilder
+from easyplotter.common.signal_processing import SignalPyramid, find_transitions, run_lengths, slice_to_window
 from easyplotter.common.logger import logger
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.common.streaming_statistics import SignalStatistics
 
 
 class Plotter(ABC):
@@ -57,18 +63,21 @@ class PlotSignals(Plotter):
     Plotter for signals
     """
 
-    def __init__(self, time: np.ndarray, data: dict[str, np.ndarray], signals: list):
+    def __init__(self, time: np.ndarray | dict[str, np.ndarray], data: dict[str, np.ndarray], signals: list,
+                 pyramids: dict[str, SignalPyramid] | None = None):
         """
         Initialize plotter with signals
 
         Parameters
         ----------
-        time : np.ndarray
-            Time domain
+        time : np.ndarray | dict[str, np.ndarray]
+            Time domain, shared by all signals or one time raster per signal
         data : np.ndarray
             Data to plot
         signals : list[dict]
             List of signals to plot
+        pyramids : dict[str, SignalPyramid] | None, optional
+            Min/max pyramids of the signals to reduce them without scanning the samples, by default None
         """
         super().__init__()
         self.time = time
@@ -77,11 +86,14 @@ class PlotSignals(Plotter):
 
         # Initialize lists to store signal configurations
         self.signal_names = []
+        self.times = []
         self.y_datas = []
         self.labels = []
         self.colors = []
         self.line_styles = []
         self.line_widths = []
+        self.decimations = []
+        self.pyramids = []
 
         # Populate the lists with the data from signals
         for signal in signals:
@@ -91,7 +103,10 @@ class PlotSignals(Plotter):
             self.colors.append(signal.get('color', 'black'))  # Default to black if color is not provided
             self.line_styles.append(signal.get('style', '-'))  # Default to solid line if line_style is not provided
             self.line_widths.append(signal.get('width', 1))  # Default to line width 1 if line_width is not provided
+            self.decimations.append(signal.get('decimation', 'minmax'))  # Default to min/max per pixel column
             self.y_datas.append(data.get(signal['signal_name']))
+            self.times.append(time.get(signal['signal_name']) if isinstance(time, dict) else time)
+            self.pyramids.append((pyramids or {}).get(signal['signal_name']))
 
     logger.info("Initialize a PlotSignals.")
 
@@ -104,16 +119,23 @@ class PlotSignals(Plotter):
         builder : PlotBuilder
             Plot builder to apply signals
         """
-        for y_data, label, color, style, width in zip(self.y_datas,
-                                                      self.labels,
-                                                      self.colors,
-                                                      self.line_styles,
-                                                      self.line_widths):
+        for time, y_data, label, color, style, width, decimation, pyramid in zip(self.times,
+                                                                                 self.y_datas,
+                                                                                 self.labels,
+                                                                                 self.colors,
+                                                                                 self.line_styles,
+                                                                                 self.line_widths,
+                                                                                 self.decimations,
+                                                                                 self.pyramids):
             if y_data is None:
                 logger.warning(f"Signal {label} not found in data. Skipping.")
                 continue
             logger.info(f"Adding signal {label}")
-            builder.add_signal(self.time, y_data,
+            # Slice the signal to the visible window, so matplotlib does not transform invisible points
+            time, y_data = slice_to_window(time, y_data, builder.x_limits)
+            builder.add_signal(time, y_data,
+                               decimation=decimation,
+                               pyramid=pyramid,
                                label=label,
                                color=color,
                                linestyle=style,
@@ -225,6 +247,634 @@ class PlotVerticalLines(Plotter):
         return float(text_position.split()[0])
 
 
+class PlotHorizontalLines(Plotter):
+    """
+    Plotter for horizontal lines
+    """
+    def __init__(self, h_lines: list):
+        """
+        Initialize plotter with horizontal lines
+
+        Parameters
+        ----------
+        h_lines : list[dict]
+            List of horizontal lines
+        """
+        super().__init__()
+        self.h_lines = []
+        for h_line in h_lines:
+            y_position = _parse_position(h_line['y_position'])
+            text = h_line.get('text')
+            self.h_lines.append({
+                'y_position': y_position,
+                'color': h_line.get('color', 'black'),
+                'style': h_line.get('style', '--'),
+                'width': h_line.get('width', 1),
+                'legend': h_line.get('legend', None),
+                'text': {
+                    'x_position': _parse_position(text['text_x_position']),
+                    'y_position': y_position,
+                    'text_content': text['text_content'],
+                    'vertical_alignment': text.get('y_alignment', 'bottom'),
+                    'horizontal_alignment': text.get('x_alignment', 'left')
+                } if text is not None else None
+            })
+
+        logger.info("Initialize a PlotHorizontalLines.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply horizontal lines to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply horizontal lines
+        """
+        for h_line in self.h_lines:
+            builder.add_horizontal_line(h_line['y_position'],
+                                        label=h_line['legend'],
+                                        color=h_line['color'],
+                                        linestyle=h_line['style'],
+                                        linewidth=h_line['width'])
+
+            text = h_line['text']
+            if text is not None:
+                builder.add_text(text['x_position'],
+                                 text['y_position'],
+                                 text['text_content'],
+                                 verticalalignment=text['vertical_alignment'],
+                                 horizontalalignment=text['horizontal_alignment'])
+
+
+class PlotRectangles(Plotter):
+    """
+    Plotter for rectangles, given by their x-axis range or derived from the intervals of a state signal
+    """
+    def __init__(self, time: np.ndarray | dict[str, np.ndarray], data: dict[str, np.ndarray], rectangles: list):
+        """
+        Initialize plotter with rectangles
+
+        Parameters
+        ----------
+        time : np.ndarray | dict[str, np.ndarray]
+            Time domain, shared by all signals or one time raster per signal
+        data : dict[str, np.ndarray]
+            Data of the signals
+        rectangles : list[dict]
+            List of rectangles, each with ``x_start`` and ``x_stop`` or with a ``signal_name`` and optional
+            ``states`` to shade. Without states, all intervals with a value other than zero are shaded.
+        """
+        super().__init__()
+        self.rectangles = []
+        for rectangle in rectangles:
+            signal_name = rectangle.get('signal_name')
+            y_range = None
+            if 'y_start' in rectangle and 'y_stop' in rectangle:
+                y_range = (_parse_position(rectangle['y_start']), _parse_position(rectangle['y_stop']))
+            self.rectangles.append({
+                'signal_name': signal_name,
+                'time': time.get(signal_name) if isinstance(time, dict) else time,
+                'y_data': data.get(signal_name) if signal_name is not None else None,
+                'states': rectangle.get('states'),
+                'x_start': _parse_position(rectangle['x_start']) if 'x_start' in rectangle else None,
+                'x_stop': _parse_position(rectangle['x_stop']) if 'x_stop' in rectangle else None,
+                'y_range': y_range,
+                'color': rectangle.get('color', 'gray'),
+                'alpha': rectangle.get('alpha', 0.3),
+                'legend': rectangle.get('legend', None)
+            })
+
+        logger.info("Initialize a PlotRectangles.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply rectangles to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply rectangles
+        """
+        for rectangle in self.rectangles:
+            if rectangle['signal_name'] is None:
+                x_starts, x_stops = np.array([rectangle['x_start']]), np.array([rectangle['x_stop']])
+            elif rectangle['y_data'] is None:
+                logger.warning(f"Signal {rectangle['signal_name']} not found in data. Skipping rectangles.")
+                continue
+            else:
+                time, y_data = slice_to_window(rectangle['time'], rectangle['y_data'], builder.x_limits)
+                x_starts, x_stops, values = run_lengths(time, y_data)
+                if rectangle['states'] is not None:
+                    shaded = np.isin(values, rectangle['states'])
+                else:
+                    shaded = (values != 0) & ~np.isnan(values)
+                x_starts, x_stops = x_starts[shaded], x_stops[shaded]
+
+            builder.add_rectangles(x_starts, x_stops, rectangle['y_range'],
+                                   label=rectangle['legend'],
+                                   color=rectangle['color'],
+                                   alpha=rectangle['alpha'])
+
+
+class PlotTexts(Plotter):
+    """
+    Plotter for texts
+    """
+    def __init__(self, texts: list):
+        """
+        Initialize plotter with texts
+
+        Parameters
+        ----------
+        texts : list[dict]
+            List of texts
+        """
+        super().__init__()
+        self.texts = []
+        for text in texts:
+            self.texts.append({
+                'x_position': _parse_position(text['x_position']),
+                'y_position': _parse_position(text['y_position']),
+                'text_content': text['text_content'],
+                'color': text.get('color', 'black'),
+                'vertical_alignment': text.get('y_alignment', 'bottom'),
+                'horizontal_alignment': text.get('x_alignment', 'left')
+            })
+
+        logger.info("Initialize a PlotTexts.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply texts to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply texts
+        """
+        for text in self.texts:
+            builder.add_text(text['x_position'],
+                             text['y_position'],
+                             text['text_content'],
+                             color=text['color'],
+                             verticalalignment=text['vertical_alignment'],
+                             horizontalalignment=text['horizontal_alignment'])
+
+
+class PlotScatters(Plotter):
+    """
+    Plotter for scatters, dense scatters are drawn as the density of the points per pixel
+    """
+    def __init__(self, time: np.ndarray | dict[str, np.ndarray], data: dict[str, np.ndarray], scatters: list,
+                 density_threshold: int | None = None, chunk_size: int | None = None):
+        """
+        Initialize plotter with scatters
+
+        Parameters
+        ----------
+        time : np.ndarray | dict[str, np.ndarray]
+            Time domain, shared by all signals or one time raster per signal
+        data : dict[str, np.ndarray]
+            Data of the signals
+        scatters : list[dict]
+            List of scatters, each with the ``y_signal_name`` and an optional ``x_signal_name``,
+            by default the points are plotted over time
+        density_threshold : int | None, optional
+            The number of points above which the density is drawn instead of the points,
+            by default the setting ``[scatter] density_threshold``
+        chunk_size : int | None, optional
+            The number of points binned at once, by default the setting ``[scatter] chunk_size``
+        """
+        super().__init__()
+        scatter_settings = SettingsParser(Path("config/application_settings.ini")).get("scatter")
+        self.density_threshold = density_threshold if density_threshold is not None else \
+            scatter_settings.get('density_threshold', 100_000)
+        self.chunk_size = chunk_size if chunk_size is not None else scatter_settings.get('chunk_size', 1_000_000)
+
+        self.scatters = []
+        for scatter in scatters:
+            x_signal_name = scatter.get('x_signal_name')
+            y_signal_name = scatter['y_signal_name']
+            self.scatters.append({
+                'x_signal_name': x_signal_name,
+                'y_signal_name': y_signal_name,
+                'x_time': time.get(x_signal_name if x_signal_name is not None else y_signal_name)
+                if isinstance(time, dict) else time,
+                'y_time': time.get(y_signal_name) if isinstance(time, dict) else time,
+                'x_data': data.get(x_signal_name) if x_signal_name is not None else None,
+                'y_data': data.get(y_signal_name),
+                'color': scatter.get('color', 'black'),
+                'marker': scatter.get('marker', '.'),
+                'size': float(scatter.get('size', 4)),
+                'cmap': scatter.get('cmap', 'viridis'),
+                'legend': scatter.get('legend', None),
+                'density_threshold': int(scatter.get('density_threshold', self.density_threshold))
+            })
+
+        logger.info("Initialize a PlotScatters.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply scatters to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply scatters
+        """
+        for scatter in self.scatters:
+            points = self._get_points(scatter, builder)
+            if points is None:
+                continue
+            x_data, y_data = points
+
+            if len(x_data) <= scatter['density_threshold']:
+                builder.add_scatter(x_data, y_data,
+                                    label=scatter['legend'],
+                                    color=scatter['color'],
+                                    marker=scatter['marker'],
+                                    s=scatter['size'])
+                continue
+
+            x_range = self._get_range(builder.ax.get_xlim(), builder.ax.get_autoscalex_on(), x_data)
+            y_range = self._get_range(builder.ax.get_ylim(), builder.ax.get_autoscaley_on(), y_data)
+            grid = builder.create_density_grid(x_range, y_range)
+            # the points are binned in chunks, so memory-mapped signals are not loaded at once
+            for start in range(0, len(x_data), self.chunk_size):
+                grid.add(x_data[start:start + self.chunk_size], y_data[start:start + self.chunk_size])
+            builder.add_density(grid, label=scatter['legend'], cmap=scatter['cmap'])
+
+    @staticmethod
+    def _get_points(scatter: dict, builder: PlotBuilder) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Get the x-axis and y-axis data of the points of a scatter
+
+        Parameters
+        ----------
+        scatter : dict
+            The scatter configuration
+        builder : PlotBuilder
+            Plot builder with the x-axis limits
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray] | None
+            The x-axis and y-axis data or None if a signal is not found
+        """
+        if scatter['y_data'] is None or (scatter['x_signal_name'] is not None and scatter['x_data'] is None):
+            logger.warning(f"Signals of scatter {scatter['y_signal_name']} not found in data. Skipping.")
+            return None
+
+        if scatter['x_signal_name'] is None:
+            # the points are plotted over time, only the visible window is needed
+            return slice_to_window(scatter['y_time'], scatter['y_data'], builder.x_limits)
+
+        x_data, y_data = scatter['x_data'], scatter['y_data']
+        if len(x_data) != len(y_data):
+            # signals with different time rasters are combined on the time raster of the x-axis signal
+            y_data = np.interp(scatter['x_time'], scatter['y_time'], y_data)
+        return x_data, y_data
+
+    @staticmethod
+    def _get_range(limits: tuple[float, float], autoscale: bool, values: np.ndarray) -> tuple[float, float]:
+        """
+        Get the range of the density grid along an axis
+
+        Parameters
+        ----------
+        limits : tuple[float, float]
+            The limits of the axis
+        autoscale : bool
+            Whether the axis is autoscaled, then the range of the values is used
+        values : np.ndarray
+            The values along the axis
+
+        Returns
+        -------
+        tuple[float, float]
+            The range of the grid
+        """
+        if autoscale:
+            return float(np.nanmin(values)), float(np.nanmax(values))
+        return limits
+
+
+class PlotFittedLines(Plotter):
+    """
+    Plotter for curves fitted to windows of signals
+    """
+    def __init__(self, time: np.ndarray | dict[str, np.ndarray], data: dict[str, np.ndarray], fitted_lines: list,
+                 dataset_key: tuple | None = None):
+        """
+        Initialize plotter with fitted lines
+
+        Parameters
+        ----------
+        time : np.ndarray | dict[str, np.ndarray]
+            Time domain, shared by all signals or one time raster per signal
+        data : dict[str, np.ndarray]
+            Data of the signals
+        fitted_lines : list[dict]
+            List of fitted lines, each with the signal, the model ('poly', 'exp' or 'log'), the degree and
+            the windows as "start::stop" strings, by default the x-axis limits
+        dataset_key : tuple | None, optional
+            The key of the loaded dataset to share the fits through the dataset cache, by default None
+        """
+        super().__init__()
+        self.dataset_key = dataset_key
+        self.fitted_lines = []
+        for fitted_line in fitted_lines:
+            signal_name = fitted_line['signal_name']
+            model = fitted_line.get('model', 'poly')
+            self.fitted_lines.append({
+                'signal_name': signal_name,
+                'time': time.get(signal_name) if isinstance(time, dict) else time,
+                'y_data': data.get(signal_name),
+                'model': model,
+                # the exponential and logarithmic models are linear in their transformed axes
+                'degree': int(fitted_line.get('degree', 1)) if model == 'poly' else 1,
+                'windows': [tuple(map(float, window.split('::')[:2])) for window in fitted_line.get('windows', [])],
+                'color': fitted_line.get('color', 'black'),
+                'style': fitted_line.get('style', '-.'),
+                'width': fitted_line.get('width', 1),
+                'legend': fitted_line.get('legend', None)
+            })
+        # the fits of the last apply, exported next to the plot
+        self.fits: list[dict] = []
+
+        logger.info("Initialize a PlotFittedLines.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Fit the curves and apply them to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply fitted lines
+        """
+        fitted_lines = [fitted_line for fitted_line in self.fitted_lines if fitted_line['y_data'] is not None]
+        for fitted_line in self.fitted_lines:
+            if fitted_line['y_data'] is None:
+                logger.warning(f"Signal {fitted_line['signal_name']} not found in data. Skipping fitted line.")
+            if not fitted_line['windows'] and builder.x_limits is not None:
+                fitted_line['windows'] = [builder.x_limits]
+
+        fits = self._fit(fitted_lines)
+        # one sample per pixel of the axes, so the curve is smooth at any figure size and resolution
+        axes_width = builder.figure.get_figwidth() * builder.figure.dpi * builder.ax.get_position().width
+        n_samples = max(int(np.ceil(axes_width)), 2)
+
+        self.fits = []
+        for fitted_line in fitted_lines:
+            label = fitted_line['legend']
+            for window in fitted_line['windows']:
+                fit = fits[self._fit_key(fitted_line, window)]
+                if fit is None:
+                    logger.warning(f"Not enough samples to fit {fitted_line['signal_name']} in window {window}.")
+                    continue
+                self.fits.append({'signal_name': fitted_line['signal_name'], **fit.to_dict()})
+                x_data = np.linspace(window[0], window[1], n_samples)
+                builder.add_signal(x_data, fit.evaluate(x_data),
+                                   decimation='none',
+                                   label=label,
+                                   color=fitted_line['color'],
+                                   linestyle=fitted_line['style'],
+                                   linewidth=fitted_line['width'])
+                # only the first window of a fitted line gets a legend entry
+                label = None
+
+    def _fit(self, fitted_lines: list[dict]) -> dict[tuple, CurveFit | None]:
+        """
+        Fit all windows of the fitted lines, the windows with the same model are solved at once
+
+        Parameters
+        ----------
+        fitted_lines : list[dict]
+            The fitted lines with signals
+
+        Returns
+        -------
+        dict[tuple, CurveFit | None]
+            The fit of each signal, window, model and degree
+        """
+        fits = {}
+        pending: dict[tuple[str, int], list[tuple[tuple, tuple[np.ndarray, np.ndarray], tuple[float, float]]]] = {}
+        for fitted_line in fitted_lines:
+            for window in fitted_line['windows']:
+                key = self._fit_key(fitted_line, window)
+                if key in fits:
+                    continue
+                fits[key] = dataset_cache.get(self.dataset_key + key) if self.dataset_key is not None else None
+                if fits[key] is None:
+                    segment = slice_to_window(fitted_line['time'], fitted_line['y_data'], window)
+                    # the margin samples of the slice are outside the window
+                    inside = (segment[0] >= min(window)) & (segment[0] <= max(window))
+                    pending.setdefault((fitted_line['model'], fitted_line['degree']), []).append(
+                        (key, (segment[0][inside], segment[1][inside]), window))
+
+        for (model, degree), items in pending.items():
+            results = fit_curves([segment for _, segment, _ in items], [window for _, _, window in items],
+                                 model, degree)
+            logger.info(f"Fit {len(items)} windows with model {model} of degree {degree}.")
+            for (key, _, _), fit in zip(items, results):
+                fits[key] = fit
+                if fit is not None and self.dataset_key is not None:
+                    dataset_cache.put(self.dataset_key + key, fit)
+        return fits
+
+    @staticmethod
+    def _fit_key(fitted_line: dict, window: tuple[float, float]) -> tuple:
+        """
+        Create the key of a fit
+
+        Parameters
+        ----------
+        fitted_line : dict
+            The fitted line
+        window : tuple[float, float]
+            The window of the fit
+
+        Returns
+        -------
+        tuple
+            The key of the signal, window, model and degree
+        """
+        return 'fit', fitted_line['signal_name'], window, fitted_line['model'], fitted_line['degree']
+
+
+class PlotStatistics(Plotter):
+    """
+    Plotter for the histograms, the cumulative distributions or the summaries of signals
+    """
+    KINDS = ('histogram', 'cdf', 'summary')
+
+    def __init__(self, statistics: dict[str, SignalStatistics], signals: list, kind: str = 'histogram',
+                 percentiles: list[float] | None = None):
+        """
+        Initialize plotter with the statistics of signals
+
+        Parameters
+        ----------
+        statistics : dict[str, SignalStatistics]
+            The statistics of each signal
+        signals : list[dict]
+            List of signals to plot
+        kind : str, optional
+            The kind of the plot: 'histogram', 'cdf' or 'summary' with minimum, mean, maximum and percentiles,
+            by default 'histogram'
+        percentiles : list[float] | None, optional
+            The percentiles of the summary, by default 5, 50 and 95
+        """
+        super().__init__()
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown statistics plot {kind}, expected one of {', '.join(self.KINDS)}.")
+        self.kind = kind
+        self.percentiles = percentiles if percentiles is not None else [5, 50, 95]
+        self.signals = []
+        for signal in signals:
+            signal_name = signal['signal_name']
+            if signal_name not in statistics:
+                logger.warning(f"Signal {signal_name} not found in data. Skipping.")
+                continue
+            self.signals.append({
+                'signal_name': signal_name,
+                'statistics': statistics[signal_name],
+                'label': signal.get('legend', signal_name),
+                'color': signal.get('color', 'black')
+            })
+
+        logger.info("Initialize a PlotStatistics.")
+
+    def summaries(self) -> dict[str, dict]:
+        """
+        Summarize the statistics of the signals
+
+        Returns
+        -------
+        dict[str, dict]
+            The summary of each signal
+        """
+        return {signal['signal_name']: signal['statistics'].summary(self.percentiles) for signal in self.signals}
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply statistics to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply statistics
+        """
+        if self.kind == 'summary':
+            self._apply_summary(builder)
+            return
+
+        for signal in self.signals:
+            histogram = signal['statistics'].histogram
+            if histogram is None:
+                logger.warning(f"No histogram bins configured for signal {signal['signal_name']}. Skipping.")
+                continue
+            if self.kind == 'histogram':
+                builder.add_stairs(histogram.counts, histogram.edges, label=signal['label'], color=signal['color'])
+            else:
+                # the distribution starts with the values below the first bin
+                cdf = np.concatenate(([histogram.underflow / max(histogram.total, 1)], histogram.cdf()))
+                builder.add_signal(histogram.edges, cdf, decimation='none', label=signal['label'],
+                                   color=signal['color'])
+
+    def _apply_summary(self, builder: PlotBuilder) -> None:
+        """
+        Apply the minimum, mean, maximum and percentiles of all signals to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply the summary
+        """
+        summaries = self.summaries()
+        positions = np.arange(len(summaries))
+        builder.add_ranges(positions,
+                           [summary['min'] for summary in summaries.values()],
+                           [summary['max'] for summary in summaries.values()],
+                           label='min/max', color='gray', linewidth=2)
+        builder.add_scatter(positions, [summary['mean'] for summary in summaries.values()],
+                            label='mean', color=[signal['color'] for signal in self.signals], marker='o', s=30)
+        for percentile in self.percentiles:
+            values = [summary['percentiles'][f"{percentile:g}"] for summary in summaries.values()]
+            builder.add_scatter(positions, values,
+                                label=f"P{percentile:g}", color='black', marker='_', s=200)
+        builder.set_x_ticks(list(positions), [signal['label'] for signal in self.signals])
+
+
+class PlotEventMarkers(Plotter):
+    """
+    Plotter for markers at the edges of signals
+    """
+    def __init__(self, time: np.ndarray | dict[str, np.ndarray], data: dict[str, np.ndarray], event_markers: list):
+        """
+        Initialize plotter with event markers
+
+        Parameters
+        ----------
+        time : np.ndarray | dict[str, np.ndarray]
+            Time domain, shared by all signals or one time raster per signal
+        data : dict[str, np.ndarray]
+            Data of the signals
+        event_markers : list[dict]
+            List of event markers, each with the signal, the edge and optional threshold, style and text.
+            The text is a format string with the fields ``previous``, ``value`` and ``time``.
+        """
+        super().__init__()
+        self.event_markers = []
+        for event_marker in event_markers:
+            signal_name = event_marker['signal_name']
+            text_y_position = event_marker.get('text_y_position')
+            threshold = event_marker.get('threshold')
+            self.event_markers.append({
+                'time': time.get(signal_name) if isinstance(time, dict) else time,
+                'y_data': data.get(signal_name),
+                'signal_name': signal_name,
+                'edge': event_marker.get('edge', 'change'),
+                'threshold': float(threshold) if threshold is not None else None,
+                'color': event_marker.get('color', 'black'),
+                'style': event_marker.get('style', '--'),
+                'width': event_marker.get('width', 1),
+                'legend': event_marker.get('legend', None),
+                'text': event_marker.get('text', None),
+                'text_y_position': float(text_y_position.split()[0]) if text_y_position is not None else None
+            })
+
+        logger.info("Initialize a PlotEventMarkers.")
+
+    def apply(self, builder: PlotBuilder) -> None:
+        """
+        Apply event markers to plot builder
+
+        Parameters
+        ----------
+        builder : PlotBuilder
+            Plot builder to apply event markers
+        """
+        for event_marker in self.event_markers:
+            if event_marker['y_data'] is None:
+                logger.warning(f"Signal {event_marker['signal_name']} not found in data. Skipping event markers.")
+                continue
+            time, y_data = slice_to_window(event_marker['time'], event_marker['y_data'], builder.x_limits)
+            x_positions, previous, values = find_transitions(time, y_data, event_marker['edge'],
+                                                             event_marker['threshold'])
+            texts = None
+            if event_marker['text'] is not None:
+                texts = [event_marker['text'].format(previous=previous_value, value=value, time=x_position)
+                         for x_position, previous_value, value in zip(x_positions, previous, values)]
+            builder.add_event_markers(x_positions, texts, event_marker['text_y_position'],
+                                      label=event_marker['legend'],
+                                      color=event_marker['color'],
+                                      linestyle=event_marker['style'],
+                                      linewidth=event_marker['width'])
+
+
 class PlotAnnotation(Plotter):
     """
     Plotter for Annotation
@@ -256,4 +906,20 @@ class PlotAnnotation(Plotter):
         """
         logger.info(f"Apply general plot {self.id} with description: {self.description}")
         builder.add_annotation(self.id + ': ' + self.description)
-        builder.show()
+
+
+def _parse_position(position: str | float) -> float:
+    """
+    Parse a position of the configuration, e.g. "30" or "30 s"
+
+    Parameters
+    ----------
+    position : str | float
+        Position as string with optional unit or as number
+
+    Returns
+    -------
+    float
+        Position as float
+    """
+    return float(position.split()[0]) if isinstance(position, str) else float(position)
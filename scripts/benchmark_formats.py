@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the output formats of the image saver: encode time and bytes per format.
+"""
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import matplotlib.image
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+
+from easyplotter.common.image_saver import ImageSaver, OutputFormat
+
+# the presets compared by default, e.g. a fast one for CI and a small one for archived reports
+PRESETS = {
+    'png (zlib 1)': OutputFormat(format='png', png_compression=1),
+    'png (zlib 6)': OutputFormat(format='png', png_compression=6),
+    'png (zlib 9)': OutputFormat(format='png', png_compression=9),
+    'webp (q 80)': OutputFormat(format='webp', quality=80),
+    'webp (q 95)': OutputFormat(format='webp', quality=95),
+    'jpeg (q 90)': OutputFormat(format='jpeg', quality=90),
+    'svg': OutputFormat(format='svg'),
+    'pdf': OutputFormat(format='pdf'),
+}
+
+
+def _create_figure(n_points: int) -> Figure:
+    """This is the function to create a figure similar to a time domain plot.
+
+    Parameters
+    ----------
+    n_points : int
+        The number of samples of each signal
+
+    Returns
+    -------
+    Figure
+        The figure with two noisy signals, a grid and a legend
+    """
+    rng = np.random.default_rng(0)
+    time_data = np.linspace(0, 100, n_points)
+    figure = Figure(figsize=(16, 9))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(time_data, np.sin(time_data) + 0.1 * rng.standard_normal(n_points), label="signal 1")
+    axes.plot(time_data, np.cos(time_data / 3) + 0.1 * rng.standard_normal(n_points), label="signal 2")
+    axes.set_title("Benchmark")
+    axes.grid(True)
+    axes.legend()
+    return figure
+
+
+def run_benchmark(n_points: int, repeats: int) -> list[tuple[str, float, int]]:
+    """This is the function to save the same figure in each preset.
+
+    Parameters
+    ----------
+    n_points : int
+        The number of samples of each signal
+    repeats : int
+        The number of saves per preset, the fastest one is reported
+
+    Returns
+    -------
+    list[tuple[str, float, int]]
+        The preset, the encode time in seconds and the bytes of the file
+    """
+    figure = _create_figure(n_points)
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, output_format in PRESETS.items():
+            saver = ImageSaver(Path(output_dir), output_format=output_format)
+            # raster formats are drawn once, so only the encoding is timed
+            buffer = np.array(saver.render_buffer(figure, output_format.get_dpi(figure)))
+            encode_times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                if output_format.is_vector:
+                    output_file = saver.save(figure, "benchmark")
+                else:
+                    output_file = Path(output_dir).joinpath(f"benchmark.{output_format.suffix}")
+                    matplotlib.image.imsave(output_file, buffer, format=output_format.format, origin='upper',
+                                            dpi=output_format.get_dpi(figure),
+                                            metadata=saver.METADATA[output_format.format],
+                                            pil_kwargs=output_format.pil_kwargs)
+                encode_times.append(time.perf_counter() - start)
+            results.append((name, min(encode_times), output_file.stat().st_size))
+    return results
+
+
+def main() -> None:
+    """This is the main function to benchmark the output formats."""
+    parser = argparse.ArgumentParser(description="Benchmark encode time and bytes of the output formats.")
+    parser.add_argument('--points', type=int, default=100_000, help="samples of each signal, by default 100000")
+    parser.add_argument('--repeats', type=int, default=3, help="saves per format, by default 3")
+    args = parser.parse_args()
+
+    print(f'[BENCHMARK] Output formats of a 16x9 inch figure with 2 x {args.points} samples')
+    print(f'[BENCHMARK] {"preset":<14} {"encode [ms]":>12} {"size [kB]":>10}')
+    for name, encode_time, size in run_benchmark(args.points, args.repeats):
+        print(f'[BENCHMARK] {name:<14} {1000 * encode_time:>12.1f} {size / 1024:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
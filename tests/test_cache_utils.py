@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""A test module for the helpers shared by the caches"""
+import os
+from pathlib import Path
+
+from easyplotter.common.cache_utils import evict_least_recently_used, file_fingerprint
+
+
+class TestFileFingerprint:
+    def test_fingerprint_changes_with_file(self, tmp_path: Path) -> None:
+        """The fingerprint is the same for the same file and changes with its content"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a\n0,1\n")
+        fingerprint = file_fingerprint(data_file)
+
+        assert file_fingerprint(tmp_path.joinpath(".", "recording.csv")) == fingerprint
+        assert fingerprint[0] == str(data_file.resolve())
+
+        data_file.write_text("time,a\n0,1\n1,2\n")
+        assert file_fingerprint(data_file) != fingerprint
+
+
+class TestEvictLeastRecentlyUsed:
+    def test_evict_oldest_complete_entries(self, tmp_path: Path) -> None:
+        """The oldest complete entries are removed until the limit is met, the kept and incomplete entries stay"""
+        entry_dirs = []
+        for i in range(4):
+            entry_dir = tmp_path.joinpath(f"entry_{i}")
+            entry_dir.mkdir()
+            entry_dir.joinpath("data.bin").write_bytes(bytes(100))
+            entry_dir.joinpath("entry.json").write_text("{}")
+            os.utime(entry_dir.joinpath("entry.json"), (i, i))
+            entry_dirs.append(entry_dir)
+        entry_dirs[0].joinpath("entry.json").unlink()
+
+        evictions = evict_least_recently_used(tmp_path, "entry.json", 250, keep=entry_dirs[1], cache_name="test")
+
+        assert evictions == 1
+        assert [entry_dir.is_dir() for entry_dir in entry_dirs] == [True, True, False, True]
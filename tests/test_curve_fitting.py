@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""A test module for the batched curve fitting"""
+import numpy as np
+
+from easyplotter.common.curve_fitting import fit_curves
+
+
+class TestFitCurves:
+    def test_models_recover_parameters(self) -> None:
+        """Polynomial, exponential and logarithmic curves are fitted in one batch per model"""
+        x_data = np.linspace(1.0, 20.0, 1000)
+
+        polynomial, short = fit_curves([(x_data, 3.0 + 2.0 * x_data - 0.1 * x_data ** 2), (x_data[:2], x_data[:2])],
+                                       [(1.0, 20.0), (1.0, 1.0)], 'poly', 2)
+        exponential, = fit_curves([(x_data, 5.0 * np.exp(0.2 * x_data))], [(1.0, 20.0)], 'exp')
+        logarithmic, = fit_curves([(x_data, 1.0 + 4.0 * np.log(x_data))], [(1.0, 20.0)], 'log')
+
+        assert short is None
+        assert np.allclose(polynomial.to_dict()['parameters']['coefficients'], [3.0, 2.0, -0.1])
+        assert np.allclose([exponential.to_dict()['parameters']['a'], *exponential.to_dict()['parameters']['b']],
+                           [5.0, 0.2])
+        assert np.allclose([logarithmic.to_dict()['parameters']['a'], *logarithmic.to_dict()['parameters']['b']],
+                           [1.0, 4.0])
+        assert polynomial.r_squared > 0.999999 and polynomial.rmse < 1e-9
+
+    def test_batch_matches_single_fits(self) -> None:
+        """Fitting many windows at once gives the same result as fitting each window alone"""
+        rng = np.random.default_rng(0)
+        x_data = np.linspace(0.0, 100.0, 10_000)
+        y_data = np.sin(x_data / 10.0) + 0.1 * rng.standard_normal(len(x_data))
+        windows = [(float(start), float(start + 10)) for start in range(0, 90, 5)]
+        segments = [(x_data[(x_data >= start) & (x_data <= stop)], y_data[(x_data >= start) & (x_data <= stop)])
+                    for start, stop in windows]
+
+        batch = fit_curves(segments, windows, 'poly', 3)
+        for segment, window, fit in zip(segments, windows, batch):
+            single, = fit_curves([segment], [window], 'poly', 3)
+            expected = np.polynomial.polynomial.polyfit(*segment, 3)
+            assert np.allclose(fit.coefficients, single.coefficients)
+            assert np.allclose(fit.to_dict()['parameters']['coefficients'], expected, rtol=1e-6, atol=1e-8)
+            assert np.isclose(fit.rmse, np.sqrt(np.mean((segment[1] - fit.evaluate(segment[0])) ** 2)))
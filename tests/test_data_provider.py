@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""A test module for the data provider"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from easyplotter.common.data_provider import CsvReader, DataProvider, MdfReader, TableReader
+from easyplotter.common.dataset_cache import dataset_cache
+from easyplotter.common.signal_processing import minmax_decimate
+
+
+class TestDataProvider:
+    def test_load_projected_columns_with_alias(self, tmp_path: Path) -> None:
+        """Only the requested columns are loaded and exposed under their aliases"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a,b,c\n0.0,1,2,3\n0.1,4,5,6\n")
+
+        time, data = DataProvider().load_data(data_file, signals={'alias_a': 'a', 'c': 'c', 'missing': 'x'},
+                                              use_cache=False)
+
+        np.testing.assert_array_equal(time, [0.0, 0.1])
+        assert sorted(data) == ['alias_a', 'c']
+        np.testing.assert_array_equal(data['alias_a'], [1.0, 4.0])
+        assert data['c'].dtype == np.float64
+
+    def test_load_all_columns(self, tmp_path: Path) -> None:
+        """All signal columns are loaded under their real names without a signal selection"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a,b\n0.0,1,2\n")
+
+        _, data = DataProvider().load_data(data_file, use_cache=False)
+
+        assert sorted(data) == ['a', 'b']
+
+    def test_parquet_time_window_pushdown(self, tmp_path: Path) -> None:
+        """Only the row groups within the time window are read from a Parquet file"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        data_file = tmp_path.joinpath("recording.parquet")
+        table = pa.table({'time': np.arange(100.0), 'a': np.arange(100.0) * 2, 'b': np.zeros(100)})
+        pq.write_table(table, data_file, row_group_size=10)
+
+        time, data = DataProvider().load_data(data_file, signals=['a'], time_window=(42.0, 47.0), use_cache=False)
+
+        np.testing.assert_array_equal(time, np.arange(41.0, 49.0))
+        np.testing.assert_array_equal(data['a'], np.arange(41.0, 49.0) * 2)
+
+    def test_arrow_ipc_time_window_pushdown(self, tmp_path: Path) -> None:
+        """Record batches outside the time window are skipped in an Arrow IPC file"""
+        pa = pytest.importorskip("pyarrow")
+        data_file = tmp_path.joinpath("recording.arrow")
+        table = pa.table({'time': np.arange(100.0), 'a': np.arange(100.0) * 2})
+        with pa.ipc.new_file(str(data_file), table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=10):
+                writer.write_batch(batch)
+
+        time, data = DataProvider().load_data(data_file, signals=['a'], time_window=(42.0, 47.0), use_cache=False)
+
+        np.testing.assert_array_equal(time, np.arange(41.0, 49.0))
+
+    @pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+    def test_time_window_at_group_boundary(self, tmp_path: Path, suffix: str) -> None:
+        """The margin samples in the row groups or record batches next to the time window are kept"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        data_file = tmp_path.joinpath(f"recording{suffix}")
+        table = pa.table({'time': np.arange(100.0), 'a': np.arange(100.0) * 2})
+        if suffix == ".parquet":
+            pq.write_table(table, data_file, row_group_size=10)
+        else:
+            with pa.ipc.new_file(str(data_file), table.schema) as writer:
+                for batch in table.to_batches(max_chunksize=10):
+                    writer.write_batch(batch)
+
+        # the window starts with the first sample of a group and ends with the last sample of a group
+        time, data = DataProvider().load_data(data_file, signals=['a'], time_window=(40.0, 59.0), use_cache=False)
+        chunks = list(DataProvider().iter_chunks(data_file, signals=['a'], time_window=(40.0, 59.0), chunk_rows=7))
+
+        np.testing.assert_array_equal(time, np.arange(39.0, 61.0))
+        np.testing.assert_array_equal(data['a'], np.arange(39.0, 61.0) * 2)
+        np.testing.assert_array_equal(np.concatenate([chunk_time for chunk_time, _ in chunks]), np.arange(39.0, 61.0))
+
+    def test_hdf5_time_window_slicing(self, tmp_path: Path) -> None:
+        """Only the rows within the time window are read from an HDF5 file"""
+        h5py = pytest.importorskip("h5py")
+        data_file = tmp_path.joinpath("recording.h5")
+        with h5py.File(data_file, 'w') as h5_file:
+            h5_file['a'] = np.arange(100.0) * 2
+            h5_file['timestamps'] = np.arange(100.0)
+
+        time, data = DataProvider().load_data(data_file, signals=['a'], time_window=(42.0, 47.0), use_cache=False)
+
+        np.testing.assert_array_equal(time, np.arange(41.0, 49.0))
+        np.testing.assert_array_equal(data['a'], np.arange(41.0, 49.0) * 2)
+
+    def test_mdf_channels_with_own_time_raster(self, tmp_path: Path) -> None:
+        """Each MDF channel is loaded with its own time raster and decoded only once"""
+        asammdf = pytest.importorskip("asammdf")
+        data_file = tmp_path.joinpath("recording.mf4")
+        with asammdf.MDF(version='4.10') as mdf:
+            mdf.append([asammdf.Signal(np.arange(10.0), np.arange(10.0) * 0.1, name='AWV_Warnung')])
+            mdf.append([asammdf.Signal(np.arange(5.0), np.arange(5.0) * 0.2, name='TTC'),
+                        asammdf.Signal(np.ones(5), np.arange(5.0) * 0.2, name='Unused')])
+            mdf.save(data_file)
+
+        dataset_cache.clear()
+        time, data = DataProvider().load_data(data_file, signals=['AWV_Warnung', 'TTC'], use_cache=False)
+        DataProvider().load_data(data_file, signals=['TTC'], use_cache=False)
+
+        assert sorted(data) == ['AWV_Warnung', 'TTC']
+        np.testing.assert_allclose(time['AWV_Warnung'], np.arange(10.0) * 0.1)
+        np.testing.assert_allclose(time['TTC'], np.arange(5.0) * 0.2)
+        assert (dataset_cache.hits, dataset_cache.misses) == (1, 2)
+
+    def test_iter_chunks_within_time_window(self, tmp_path: Path) -> None:
+        """Chunks are filtered to the time window with one sample of margin like the full load"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a\n" + "".join(f"{i},{2 * i}\n" for i in range(100)))
+
+        chunks = list(DataProvider().iter_chunks(data_file, signals={'alias_a': 'a'}, time_window=(42.5, 47.0),
+                                                 chunk_rows=5))
+
+        np.testing.assert_array_equal(np.concatenate([time for time, _ in chunks]), np.arange(42.0, 49.0))
+        np.testing.assert_array_equal(np.concatenate([data['alias_a'] for _, data in chunks]), np.arange(42.0, 49.0) * 2)
+        # the file is not read after the first sample following the window
+        assert len(chunks) == 2
+
+    def test_streaming_load_of_large_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Large files are streamed and reduced to the pixel columns of the time window"""
+        data_file = tmp_path.joinpath("recording.csv")
+        samples = np.sin(np.arange(10_000) / 50.0)
+        data_file.write_text("time,a\n" + "".join(f"{i},{value}\n" for i, value in enumerate(samples)))
+        monkeypatch.setattr(DataProvider, 'is_large', staticmethod(lambda data_path: True))
+
+        dataset = DataProvider()
+        time, data = dataset.load_data(data_file, signals={'alias_a': 'a'}, time_window=(1000.0, 9000.0),
+                                       use_cache=False, build_pyramids=True, streaming_columns=100)
+
+        expected_time, expected_values = minmax_decimate(np.arange(999.0, 9002.0), samples[999:9002], 100,
+                                                         (1000.0, 9000.0))
+        np.testing.assert_array_equal(time['alias_a'], expected_time)
+        np.testing.assert_allclose(data['alias_a'], expected_values)
+        assert dataset.pyramids == {}
+
+
+class TestReaders:
+    def test_table_reader_requires_read(self) -> None:
+        """A table reader without read can not be created"""
+        class HeaderOnlyReader(TableReader):
+            def read_header(self, data_path: Path) -> list[str]:
+                return ['time']
+
+        with pytest.raises(TypeError):
+            HeaderOnlyReader()
+
+    def test_reader_interfaces(self) -> None:
+        """Only the table readers read columns and chunks, the MDF reader reads signals with own time rasters"""
+        assert isinstance(CsvReader(), TableReader) and CsvReader.has_time_column
+        assert not issubclass(MdfReader, TableReader) and not MdfReader.has_time_column
+        assert not hasattr(MdfReader, 'read') and not hasattr(MdfReader, 'iter_chunks')
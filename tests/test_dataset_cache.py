@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""A test module for the dataset cache"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from easyplotter.common.data_provider import DataProvider
+from easyplotter.common.dataset_cache import DatasetCache, dataset_cache
+
+
+class TestDatasetCache:
+    def test_get_or_load_hit_and_miss(self) -> None:
+        """The loader is only called on a cache miss"""
+        cache = DatasetCache(max_bytes=1024)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return np.arange(4.0), {'a': np.ones(4)}
+
+        first = cache.get_or_load(('key',), loader)
+        second = cache.get_or_load(('key',), loader)
+
+        assert len(calls) == 1
+        assert first[0] is second[0]
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert not first[0].flags.writeable
+
+    def test_lru_eviction_by_bytes(self) -> None:
+        """The least recently used dataset is evicted when the byte limit is exceeded"""
+        cache = DatasetCache(max_bytes=2 * 8 * 8)
+        cache.put(('a',), (np.zeros(4), {'s': np.zeros(4)}))
+        cache.put(('b',), (np.zeros(4), {'s': np.zeros(4)}))
+        cache.get_or_load(('a',), lambda: pytest.fail("cached dataset must not be loaded"))
+        cache.put(('c',), (np.zeros(4), {'s': np.zeros(4)}))
+
+        assert cache.evictions == 1
+        assert cache.current_bytes == 2 * 8 * 8
+        cache.get_or_load(('a',), lambda: pytest.fail("cached dataset must not be loaded"))
+        assert cache.misses == 0
+
+    def test_key_changes_with_file(self, tmp_path: Path) -> None:
+        """A modified file gets a new cache key"""
+        data_file = tmp_path.joinpath("data.csv")
+        data_file.write_text("t,s\n0,1\n")
+        key = DatasetCache.make_key(data_file)
+        data_file.write_text("t,s\n0,1\n1,2\n")
+
+        assert DatasetCache.make_key(data_file) != key
+
+    def test_data_provider_uses_shared_cache(self) -> None:
+        """A recording is only parsed once by several data providers"""
+        dataset_cache.clear()
+        data_path = Path("tests/data/filtered_signal_segment.csv")
+        time, data = DataProvider().load_data(data_path)
+        time_again, data_again = DataProvider().load_data(data_path)
+
+        assert time is time_again
+        assert (dataset_cache.hits, dataset_cache.misses) == (1, 1)
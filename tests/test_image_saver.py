@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""A test module for the image saver"""
+from pathlib import Path
+import threading
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+from PIL import Image
+import pytest
+
+from easyplotter.common.image_saver import ImageSaver, ImageWriter, OutputFormat
+
+
+def create_figure() -> Figure:
+    """A small figure with a line and a title"""
+    figure = Figure(figsize=(4, 3))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot([0, 1, 2], [1, 3, 2])
+    axes.set_title("Title")
+    return figure
+
+
+class TestImageSaver:
+    def test_background_write_gives_same_bytes(self, tmp_path: Path) -> None:
+        """An image written in the background is the same as the image saved directly"""
+        figure = create_figure()
+        writer = ImageWriter()
+        background_file = ImageSaver(tmp_path, writer).save(figure, "background")
+        # the figure can be changed once it is rasterized
+        figure.axes[0].set_title("Changed")
+        assert writer.flush() == {}
+
+        figure.axes[0].set_title("Title")
+        direct_file = ImageSaver(tmp_path).save(figure, "direct")
+
+        assert background_file.read_bytes() == direct_file.read_bytes()
+
+    def test_write_errors_are_returned_by_flush(self, tmp_path: Path) -> None:
+        """A failed write is reported with its plot id and the deferred function is not called"""
+        writer = ImageWriter()
+        calls = []
+        ImageSaver(tmp_path.joinpath("missing_dir"), writer).save(create_figure(), "fig1")
+        writer.defer([tmp_path.joinpath("missing_dir", "fig1.png")], lambda: calls.append("stored"))
+
+        errors = writer.flush()
+
+        assert list(errors) == [str(tmp_path.joinpath("missing_dir", "fig1.png"))]
+        assert "Failed to write plot fig1" in errors[str(tmp_path.joinpath("missing_dir", "fig1.png"))]
+        assert calls == []
+
+    def test_pending_writes_are_bounded(self, tmp_path: Path) -> None:
+        """No more than max_pending images are queued or being written at once"""
+        writer = ImageWriter(threads=4, max_pending=2)
+        lock = threading.Lock()
+        counts = {'pending': 0, 'max': 0}
+
+        def write() -> None:
+            with lock:
+                counts['pending'] += 1
+                counts['max'] = max(counts['max'], counts['pending'])
+            time.sleep(0.02)
+            with lock:
+                counts['pending'] -= 1
+
+        for index in range(8):
+            writer.submit(f"fig{index}", tmp_path.joinpath(f"fig{index}.png"), write)
+
+        assert writer.flush() == {}
+        assert counts['max'] <= 2
+
+
+class TestOutputFormat:
+    def test_plot_overrides_global_format(self, tmp_path: Path) -> None:
+        """The output entry of a plot overrides the format and resolution of the saver"""
+        saver = ImageSaver(tmp_path, output_format=OutputFormat(format='webp', quality=80))
+
+        global_file = saver.save(create_figure(), "global")
+        plot_file = saver.save(create_figure(), "plot", {'format': 'jpg', 'dpi': 50})
+
+        assert global_file.name == "global.webp"
+        assert Image.open(global_file).format == "WEBP"
+        assert plot_file.name == "plot.jpg"
+        with Image.open(plot_file) as image:
+            assert image.format == "JPEG"
+            assert image.size == (200, 150)
+
+    def test_unknown_format_is_rejected(self) -> None:
+        """A format which can not be written raises a ValueError"""
+        with pytest.raises(ValueError, match="Unknown output format"):
+            OutputFormat().resolve({'format': 'bmp'})
+
+    @pytest.mark.parametrize("output", [{'format': 'png', 'png_compression': 1}, {'format': 'webp', 'dpi': 72}])
+    def test_background_write_gives_same_bytes(self, tmp_path: Path, output: dict) -> None:
+        """Raster formats written in the background are the same as the images saved directly"""
+        writer = ImageWriter()
+        tmp_path.joinpath("background").mkdir()
+        tmp_path.joinpath("direct").mkdir()
+        background_file = ImageSaver(tmp_path.joinpath("background"), writer).save(create_figure(), "fig1", output)
+        assert writer.flush() == {}
+
+        direct_file = ImageSaver(tmp_path.joinpath("direct")).save(create_figure(), "fig1", output)
+
+        assert background_file.read_bytes() == direct_file.read_bytes()
+
+    def test_png_compression_level(self, tmp_path: Path) -> None:
+        """A higher zlib level gives a smaller PNG file with the same pixels"""
+        saver = ImageSaver(tmp_path)
+        fast_file = saver.save(create_figure(), "fast", {'png_compression': 0})
+        small_file = saver.save(create_figure(), "small", {'png_compression': 9})
+
+        assert small_file.stat().st_size < fast_file.stat().st_size
+        assert np.array_equal(np.asarray(Image.open(fast_file)), np.asarray(Image.open(small_file)))
+
+    @pytest.mark.parametrize("output_format", ['svg', 'pdf'])
+    def test_vector_formats_are_reproducible(self, tmp_path: Path, output_format: str) -> None:
+        """Saving the same plot as vector image twice gives the same bytes"""
+        saver = ImageSaver(tmp_path, ImageWriter(), OutputFormat(format=output_format))
+        first_file = saver.save(create_figure(), "first")
+        second_file = saver.save(create_figure(), "second")
+
+        assert first_file.suffix == f".{output_format}"
+        assert first_file.read_bytes() == second_file.read_bytes()
+
+    def test_render_buffer_is_not_copied(self) -> None:
+        """The raw buffer is the RGBA canvas buffer of the drawing at the requested resolution"""
+        figure = create_figure()
+
+        buffer = ImageSaver.render_buffer(figure, dpi=50)
+
+        assert np.shares_memory(np.asarray(buffer), np.asarray(figure.canvas.buffer_rgba()))
+        assert np.asarray(buffer).shape == (150, 200, 4)
+        assert figure.dpi == 100
+
+
+class TestOutputSizes:
+    def test_sizes_are_resampled_from_one_drawing(self, tmp_path: Path) -> None:
+        """The full size image and all thumbnails are encoded from a single draw of the figure"""
+        figure = create_figure()
+        draws = []
+        draw = figure.canvas.draw
+        figure.canvas.draw = lambda: draws.append(1) or draw()
+        writer = ImageWriter()
+        saver = ImageSaver(tmp_path, writer, OutputFormat(sizes="thumb::100::webp::70, small::200"))
+
+        outputs = saver.save_all(figure, "fig1")
+        assert writer.flush() == {}
+
+        assert len(draws) == 1
+        assert [output.name for output in outputs] == ["fig1.png", "fig1_thumb.webp", "fig1_small.png"]
+        with Image.open(outputs[1]) as thumbnail:
+            assert (thumbnail.format, thumbnail.size) == ("WEBP", (100, 75))
+        with Image.open(outputs[2]) as small:
+            assert (small.format, small.size) == ("PNG", (200, 150))
+
+    def test_sizes_of_vector_images_are_png(self, tmp_path: Path) -> None:
+        """A plot saved as vector image gets raster thumbnails with the same bytes with and without writer"""
+        output = {'format': 'svg', 'sizes': ["thumb::120"]}
+        direct_outputs = ImageSaver(tmp_path, output_format=OutputFormat()).save_all(create_figure(), "direct", output)
+        writer = ImageWriter()
+        background_outputs = ImageSaver(tmp_path, writer).save_all(create_figure(), "background", output)
+        assert writer.flush() == {}
+
+        assert [output.name for output in direct_outputs] == ["direct.svg", "direct_thumb.png"]
+        assert direct_outputs[1].read_bytes() == background_outputs[1].read_bytes()
+
+    @pytest.mark.parametrize("size", ["thumb", "thumb::320::svg", "::320", "thumb::320::webp::70::1", "thumb::100::png::80",
+                                      "thumb::100::jpeg::0", "thumb::100::webp::101"])
+    def test_invalid_sizes_are_rejected(self, size: str) -> None:
+        """A size without name or width, with a vector format, too many fields or a quality out of range raises a ValueError"""
+        with pytest.raises(ValueError):
+            OutputFormat(sizes=size)
+
+
+    @pytest.mark.parametrize("options", [{'format': 'png', 'png_compression': 10}, {'format': 'jpeg', 'quality': 0},
+                                         {'format': 'webp', 'quality': 101}])
+    def test_invalid_compression_is_rejected(self, options: dict) -> None:
+        """A PNG compression out of 0 to 9 or a JPEG or WebP quality out of 1 to 100 raises a ValueError"""
+        with pytest.raises(ValueError):
+            OutputFormat(**options)
+
+
+class TestHybridVectorOutput:
+    @staticmethod
+    def create_dense_figure() -> Figure:
+        """A figure with a dense signal and a sparse line"""
+        figure = create_figure()
+        time_data = np.linspace(0, 2, 50000)
+        # noise, so the path can not be simplified by matplotlib
+        figure.axes[0].plot(time_data, np.random.default_rng(0).standard_normal(len(time_data)))
+        return figure
+
+    def test_dense_signals_are_rasterized(self, tmp_path: Path) -> None:
+        """Only the signal above the threshold is embedded as image and the flag is reset after saving"""
+        figure = self.create_dense_figure()
+        saver = ImageSaver(tmp_path, output_format=OutputFormat(format='svg'))
+
+        hybrid_file = saver.save(figure, "hybrid")
+        vector_file = saver.save(figure, "vector", {'rasterize_threshold': 0})
+
+        hybrid_svg = hybrid_file.read_text(encoding='utf-8')
+        assert hybrid_svg.count("<image") == 1
+        assert "<image" not in vector_file.read_text(encoding='utf-8')
+        assert hybrid_file.stat().st_size < vector_file.stat().st_size / 5
+        assert not any(line.get_rasterized() for line in figure.axes[0].lines)
+
+    def test_hybrid_pdf_is_reproducible(self, tmp_path: Path) -> None:
+        """A PDF with rasterized signals is saved with the same bytes again"""
+        saver = ImageSaver(tmp_path, output_format=OutputFormat(format='pdf', dpi=72))
+
+        first_file = saver.save(self.create_dense_figure(), "first")
+        second_file = saver.save(self.create_dense_figure(), "second")
+
+        assert first_file.read_bytes() == second_file.read_bytes()
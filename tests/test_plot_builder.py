@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""A test module for the plot builder"""
+import matplotlib
+import numpy as np
+import pytest
+
+from easyplotter.common.plot_builder import FigurePool, PlotBuilder
+
+
+matplotlib.use('Agg')
+
+
+def _render(x_data: np.ndarray, y_data: np.ndarray, decimation: str, y_axis: str = "-5::5::1") -> np.ndarray:
+    """Render a signal and return the RGB pixels of the canvas"""
+    builder = PlotBuilder().set_x_axis("10::50::5").set_y_axis(y_axis)
+    builder.add_signal(x_data, y_data, decimation=decimation, label='signal', color='black', linewidth=1)
+    builder.finalize().figure.canvas.draw()
+    pixels = np.asarray(builder.figure.canvas.buffer_rgba())[..., :3].astype(np.int16)
+    builder.close()
+    return pixels
+
+
+class TestPlotBuilderDecimation:
+    @pytest.mark.parametrize("decimation, tolerance", [("minmax", 0.001), ("lttb", 0.05)])
+    def test_decimated_render_matches_full_render(self, decimation: str, tolerance: float) -> None:
+        """The decimated signal looks the same as the full signal"""
+        rng = np.random.default_rng(0)
+        x_data = np.linspace(0.0, 60.0, 500_000)
+        y_data = np.sin(x_data) + 0.3 * rng.standard_normal(len(x_data))
+        y_data[rng.integers(0, len(y_data), 20)] = 4.0
+
+        full = _render(x_data, y_data, 'none')
+        decimated = _render(x_data, y_data, decimation)
+
+        different_pixels = np.mean(np.abs(full - decimated).max(axis=-1) > 64)
+        assert different_pixels < tolerance
+
+
+class TestFigurePool:
+    @pytest.mark.parametrize("y_axis", ["-5::5::1", ""])
+    def test_pooled_figure_renders_like_new_figure(self, y_axis: str) -> None:
+        """A reused figure draws the same pixels as a new figure with the same layout, also with an autoscaled y-axis"""
+        pool = FigurePool(max_size=2)
+        plot_settings = {'x_axis': "10::50::5", 'y_axis': y_axis}
+        x_data = np.linspace(0.0, 60.0, 1000)
+
+        builder, prepared = pool.acquire(plot_settings)
+        assert not prepared
+        builder.set_x_axis("10::50::5").set_y_axis(y_axis)
+        # the previous plot has much larger values, which must not stay in the data limits
+        builder.add_signal(x_data, x_data * 1000, label='other', color='red')
+        builder.add_vertical_line(20.0, color='blue', label='marker')
+        builder.add_annotation("annotation")
+        builder.finalize()
+        pool.release(plot_settings, builder)
+
+        pooled, prepared = pool.acquire(plot_settings)
+        assert prepared and pooled is builder
+        pooled.add_signal(x_data, np.sin(x_data), decimation='none', label='signal', color='black', linewidth=1)
+        pooled.finalize().figure.canvas.draw()
+        pooled_pixels = np.asarray(pooled.figure.canvas.buffer_rgba())[..., :3].astype(np.int16)
+        pool.clear()
+
+        assert np.array_equal(pooled_pixels, _render(x_data, np.sin(x_data), 'none', y_axis))
+
+    def test_pool_is_bounded(self) -> None:
+        """The least recently used figures are closed if the pool is full"""
+        pool = FigurePool(max_size=1)
+        first, _ = pool.acquire({'id': 1})
+        second, _ = pool.acquire({'id': 2})
+        pool.release({'id': 1}, first)
+        pool.release({'id': 2}, second)
+
+        assert not pool.acquire({'id': 1})[1]
+        assert pool.acquire({'id': 2})[1]
+
+
+class TestPlotBuilderFinalize:
+    def test_operations_are_applied_by_finalize(self) -> None:
+        """Signals and vertical lines become artists only in finalize, vertical lines of a style share one collection"""
+        builder = PlotBuilder().set_x_axis("0::10::1")
+        x_data = np.linspace(0.0, 10.0, 100)
+        for index in range(5):
+            builder.add_signal(x_data, x_data * index, decimation='none', label=f'signal {index}')
+        for x_position in (2.0, 4.0, 6.0):
+            builder.add_vertical_line(x_position, label=f'marker {x_position}', color='red', linestyle='--')
+        builder.add_vertical_line(8.0, color='blue', linestyle=':')
+        assert not builder.ax.lines and builder.ax.get_legend() is None
+
+        builder.finalize()
+
+        assert len(builder.ax.lines) == 5
+        assert len(builder.ax.collections) == 2
+        legend_labels = [text.get_text() for text in builder.ax.get_legend().get_texts()]
+        assert legend_labels == [f'signal {index}' for index in range(5)] + ['marker 2.0', 'marker 4.0', 'marker 6.0']
+        builder.close()
+
+    @pytest.mark.filterwarnings("ignore:Attempting to set identical low and high xlims")
+    def test_event_marker_texts_on_a_degenerate_x_axis(self) -> None:
+        """Event markers on an x-axis without width draw a single text instead of dividing by zero"""
+        builder = PlotBuilder().set_x_axis("5::5::1")
+        builder.add_event_markers(np.array([5.0, 5.0, 5.0]), ['a', 'b', 'c'], min_text_spacing=40.0)
+        builder.finalize()
+
+        assert [text.get_text() for text in builder.ax.texts] == ['a']
+        builder.close()
+
+    def test_event_markers_are_one_collection_with_culled_texts(self) -> None:
+        """Thousands of event markers become a single collection and only non-overlapping texts are drawn"""
+        builder = PlotBuilder().set_x_axis("0::100::10")
+        x_positions = np.linspace(-10.0, 110.0, 12_000)
+
+        builder.add_event_markers(x_positions, [f'{x:.2f}' for x in x_positions], min_text_spacing=40.0,
+                                  label='events', color='green')
+        builder.finalize()
+
+        assert len(builder.ax.collections) == 1
+        assert len(builder.ax.collections[0].get_segments()) == np.count_nonzero((x_positions >= 0) & (x_positions <= 100))
+        axes_width = builder.figure.get_figwidth() * builder.figure.dpi * builder.ax.get_position().width
+        text_positions = np.array([text.get_position()[0] for text in builder.ax.texts])
+        text_pixels = text_positions / 100.0 * axes_width
+        assert len(text_pixels) > 1
+        assert np.diff(text_pixels).min() >= 40.0
+        assert text_positions[0] == x_positions[x_positions >= 0][0]
+        assert [text.get_text() for text in builder.ax.get_legend().get_texts()] == ['events']
+        builder.close()
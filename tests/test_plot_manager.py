@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""A test module for the plot manager"""
+import json
+from pathlib import Path
+
+import matplotlib
+import numpy as np
+import pytest
+
+from easyplotter.common.data_provider import DataProvider
+from easyplotter.common.dataset_cache import dataset_cache
+from easyplotter.common.render_cache import render_cache
+from easyplotter.common.settings_parser import SettingsParser
+from easyplotter.module.plot_manager import PlotManager, get_data_paths, get_recording_dirs
+
+
+matplotlib.use('Agg')
+
+
+@pytest.fixture(autouse=True)
+def isolated_render_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A render cache of each test, so the plots are not restored from other test runs"""
+    monkeypatch.setattr(render_cache, 'cache_dir', tmp_path.joinpath("render_cache"))
+    for name in ('hits', 'misses', 'evictions', 'bytes_saved'):
+        monkeypatch.setattr(render_cache, name, 0)
+
+
+@pytest.fixture
+def config_path(tmp_path: Path) -> Path:
+    """A configuration with the example plots and a broken plot"""
+    config = json.loads(Path("easyplotter/configuration/config.json").read_text())
+    config['visualization']['time_domain_plot'].insert(1, {'id': 'broken'})
+    config_path = tmp_path.joinpath("config.json")
+    config_path.write_text(json.dumps(config))
+    return config_path
+
+
+class TestPlotManager:
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_failed_plot_does_not_abort_batch(self, config_path: Path, tmp_path: Path, jobs: int) -> None:
+        """A failing plot is reported by its id and the other plots are created"""
+        output_dir = tmp_path.joinpath(f"output_{jobs}")
+        output_dir.mkdir()
+
+        errors = PlotManager(config_path, output_dir, jobs=jobs).create_plots()
+
+        assert list(errors) == ['broken']
+        assert sorted(file.name for file in output_dir.iterdir()) == ['.easyplotter_manifest.json', 'fig1.png', 'fig2.png',
+                                                                      'stats1.png', 'stats1_statistics.json']
+
+    def test_batch_mode_does_not_use_pyplot(self, config_path: Path, tmp_path: Path) -> None:
+        """No figure is registered in pyplot while rendering in batch mode"""
+        pyplot = pytest.importorskip("matplotlib.pyplot")
+        pyplot.close('all')
+
+        PlotManager(config_path, tmp_path).create_plots()
+
+        assert pyplot.get_fignums() == []
+
+    def test_fitted_lines_are_exported_and_shared(self, tmp_path: Path) -> None:
+        """The fits are exported next to the plot and computed once for plots with the same fitted lines"""
+        config = json.loads(Path("easyplotter/configuration/config.json").read_text())
+        for plots_config in config['visualization']['time_domain_plot']:
+            plots_config['fitted lines'] = [{'signal_name': 'AWV_Warnung', 'model': 'poly', 'degree': 2,
+                                             'windows': ["20::25", "25::30"], 'legend': 'trend'}]
+        config_path = tmp_path.joinpath("config.json")
+        config_path.write_text(json.dumps(config))
+
+        dataset_cache.clear()
+        PlotManager(config_path, tmp_path).create_plots()
+
+        fits = json.loads(tmp_path.joinpath("fig1_fits.json").read_text())
+        assert [fit['window'] for fit in fits] == [[20.0, 25.0], [25.0, 30.0]]
+        assert all(fit['signal_name'] == 'AWV_Warnung' and fit['n_points'] > 0 for fit in fits)
+        assert json.loads(tmp_path.joinpath("fig2_fits.json").read_text()) == fits
+        # two fits of the first plot and the dataset are loaded, the second plot only gets cache hits
+        assert dataset_cache.current_bytes > 0 and dataset_cache.hits >= 3
+
+    def test_statistics_over_recordings_are_merged(self, tmp_path: Path) -> None:
+        """The statistics of several recordings are the statistics of all their samples"""
+        recording = Path("tests/data/filtered_signal_segment.csv")
+        for index in range(3):
+            tmp_path.joinpath(f"recording_{index}.csv").write_bytes(recording.read_bytes())
+        config = {'visualization': {'time_domain_plot': [], 'statistics_plot': [{
+            'id': 'stats', 'kind': 'summary', 'recordings': [str(tmp_path.joinpath("recording_*.csv"))],
+            'signals': [{'signal_name': 'TTC', 'column': 'FilteredTimeToCollisionLongitudinal'}],
+            'bins': "-5::30::0.5", 'percentiles': [50]}]}}
+        config_path = tmp_path.joinpath("config.json")
+        config_path.write_text(json.dumps(config))
+        output_dir = tmp_path.joinpath("output")
+        output_dir.mkdir()
+
+        assert PlotManager(config_path, output_dir, jobs=2).create_plots() == {}
+
+        summary = json.loads(output_dir.joinpath("stats_statistics.json").read_text())['TTC']
+        _, data = DataProvider().load_data(recording, signals={'TTC': 'FilteredTimeToCollisionLongitudinal'})
+        values = np.asarray(data['TTC'])
+        assert summary['count'] == 3 * len(values)
+        assert np.isclose(summary['mean'], values.mean()) and np.isclose(summary['std'], values.std())
+        assert np.isclose(summary['percentiles']['50'], np.median(values), rtol=0.02, atol=0.01)
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_plots_of_many_recordings(self, config_path: Path, tmp_path: Path, jobs: int) -> None:
+        """The plots of each recording are saved in a directory per recording"""
+        recording = Path("tests/data/filtered_signal_segment.csv")
+        for folder in ("day_1", "day_2"):
+            tmp_path.joinpath("recordings", folder).mkdir(parents=True)
+            tmp_path.joinpath("recordings", folder, "case.csv").write_bytes(recording.read_bytes())
+        output_dir = tmp_path.joinpath("output")
+        output_dir.mkdir()
+
+        data_paths = get_data_paths([str(tmp_path.joinpath("recordings", "*", "case.csv"))])
+        errors = PlotManager(config_path, output_dir, jobs=jobs, data_paths=data_paths).create_plots()
+
+        assert list(errors) == ['day_1/case/broken', 'day_2/case/broken']
+        for folder in ("day_1", "day_2"):
+            assert sorted(file.name for file in output_dir.joinpath(folder, "case").iterdir()) == ['fig1.png', 'fig2.png']
+        assert output_dir.joinpath("stats1_statistics.json").exists()
+
+    def test_savers_of_recordings_share_the_logger(self, config_path: Path, tmp_path: Path) -> None:
+        """The image savers of the recording directories log with the logger of the plot manager"""
+        data_paths = [tmp_path.joinpath(name) for name in ("a.csv", "b.csv")]
+        manager = PlotManager(config_path, tmp_path, data_paths=data_paths)
+
+        savers = [manager._get_image_saver(data_path) for data_path in data_paths]
+
+        assert [saver.output_dir for saver in savers] == [tmp_path.joinpath("a"), tmp_path.joinpath("b")]
+        assert all(saver.logger is manager.image_saver.logger for saver in savers)
+
+    def test_data_sources_with_manifest(self, tmp_path: Path) -> None:
+        """Paths, glob patterns and manifests are collected in order and each recording once"""
+        for name in ("a.csv", "b.csv", "c.parquet", "c.csv"):
+            tmp_path.joinpath(name).write_text("time,a\n0,1\n")
+        manifest = tmp_path.joinpath("manifest.txt")
+        manifest.write_text("# recordings of the test run\nc.parquet\n\n*.csv\n")
+
+        data_paths = get_data_paths([str(tmp_path.joinpath("b.csv")), str(manifest)])
+
+        assert [data_path.name for data_path in data_paths] == ['b.csv', 'c.parquet', 'a.csv', 'c.csv']
+        assert [str(path) for path in get_recording_dirs(data_paths).values()] == ['b', 'c_parquet', 'a', 'c_csv']
+
+    def test_unchanged_plots_are_skipped(self, tmp_path: Path) -> None:
+        """Only the plots with changed configuration are created again, unless all plots are forced"""
+        config = json.loads(Path("easyplotter/configuration/config.json").read_text())
+        config_path = tmp_path.joinpath("config.json")
+        config_path.write_text(json.dumps(config))
+        output_dir = tmp_path.joinpath("output")
+        output_dir.mkdir()
+        PlotManager(config_path, output_dir).create_plots()
+        first_run = {file.name: file.read_bytes() for file in output_dir.iterdir()}
+
+        config['visualization']['time_domain_plot'][1]['description'] = "Changed description"
+        config_path.write_text(json.dumps(config))
+        plot_manager = PlotManager(config_path, output_dir)
+        plot_manager.create_plots()
+
+        assert plot_manager.manifest.rebuilt == ['fig2']
+        assert sorted(plot_manager.manifest.skipped) == ['fig1', 'stats1']
+
+        forced_manager = PlotManager(config_path, output_dir, force=True)
+        forced_manager.create_plots()
+
+        assert sorted(forced_manager.manifest.rebuilt) == ['fig1', 'fig2', 'stats1']
+        # the plots are saved without timestamps, so an unchanged plot gives the same bytes
+        assert output_dir.joinpath("fig1.png").read_bytes() == first_run['fig1.png']
+        assert output_dir.joinpath("stats1.png").read_bytes() == first_run['stats1.png']
+
+    def test_changed_settings_rebuild_plots(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A plot is not skipped after a setting which changes the rendering has been edited"""
+        config_path = Path("easyplotter/configuration/config.json")
+        PlotManager(config_path, tmp_path).create_plots()
+
+        settings = SettingsParser(Path("config/application_settings.ini"))
+        get = settings.get
+        monkeypatch.setattr(settings, 'get', lambda section, *args: {**get(section), 'density_threshold': 10}
+                            if section == 'scatter' and not args else get(section, *args))
+        plot_manager = PlotManager(config_path, tmp_path)
+        plot_manager.create_plots()
+
+        assert sorted(plot_manager.manifest.rebuilt) == ['fig1', 'fig2', 'stats1']
+        assert plot_manager.manifest.skipped == []
+
+    def test_missing_output_is_created_again(self, tmp_path: Path) -> None:
+        """A plot whose output file was deleted is not skipped"""
+        PlotManager(Path("easyplotter/configuration/config.json"), tmp_path).create_plots()
+        tmp_path.joinpath("fig1.png").unlink()
+
+        plot_manager = PlotManager(Path("easyplotter/configuration/config.json"), tmp_path)
+        plot_manager.create_plots()
+
+        assert plot_manager.manifest.rebuilt == ['fig1']
+        assert tmp_path.joinpath("fig1.png").is_file()
+
+    def test_plots_are_restored_from_render_cache(self, tmp_path: Path) -> None:
+        """Plots rendered for one output directory are placed into another one without rendering"""
+        config_path = Path("easyplotter/configuration/config.json")
+        first_dir, second_dir = tmp_path.joinpath("first"), tmp_path.joinpath("second")
+        first_dir.mkdir()
+        second_dir.mkdir()
+        PlotManager(config_path, first_dir).create_plots()
+
+        dataset_cache.clear()
+        PlotManager(config_path, second_dir).create_plots()
+
+        assert render_cache.hits == 3
+        assert render_cache.bytes_saved == sum(file.stat().st_size for file in first_dir.iterdir()
+                                               if not file.name.startswith('.'))
+        assert (dataset_cache.hits, dataset_cache.misses) == (0, 0)
+        assert second_dir.joinpath("fig1.png").read_bytes() == first_dir.joinpath("fig1.png").read_bytes()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""A test module for the plotters"""
+import matplotlib
+from matplotlib.collections import PolyCollection
+import numpy as np
+
+from easyplotter.common.plot_builder import PlotBuilder
+from easyplotter.module.plotting import PlotFittedLines, PlotHorizontalLines, PlotRectangles, PlotScatters, PlotTexts
+
+
+matplotlib.use('Agg')
+
+
+def _render_state_intervals(n_intervals: int) -> PlotBuilder:
+    """Shade the active intervals of a state signal and return the builder"""
+    time_data = np.linspace(0.0, 100.0, 200_000)
+    states = (np.arange(len(time_data)) * 2 * n_intervals // len(time_data)) % 2
+    builder = PlotBuilder().set_x_axis("0::100::10").set_y_axis("0::1::1")
+
+    rectangles = [{'signal_name': 'state', 'states': [1], 'legend': 'active'}]
+    PlotRectangles(time_data, {'state': states}, rectangles).apply(builder)
+    builder.finalize().figure.canvas.draw()
+    return builder
+
+
+class TestPlotOverlays:
+    def test_rectangles_from_state_signal(self) -> None:
+        """The active intervals of a state signal are drawn as one collection"""
+        builder = _render_state_intervals(10)
+
+        assert len(builder.ax.collections) == 1
+        vertices = builder.ax.collections[0].get_paths()
+        assert len(vertices) == 10
+        assert [text.get_text() for text in builder.ax.get_legend().get_texts()] == ['active']
+        builder.close()
+
+    def test_many_rectangles_share_one_collection(self) -> None:
+        """Thousands of intervals are drawn as a single polygon collection"""
+        builder = _render_state_intervals(5000)
+
+        assert len(builder.ax.collections) == 1
+        assert isinstance(builder.ax.collections[0], PolyCollection)
+        assert len(builder.ax.collections[0].get_paths()) == 5000
+        builder.close()
+
+    def test_horizontal_lines_and_texts(self) -> None:
+        """Horizontal lines of the same style share one collection, texts are placed at their positions"""
+        builder = PlotBuilder().set_x_axis("0::100::10").set_y_axis("0::10::1")
+        PlotHorizontalLines([{'y_position': "2", 'color': 'red', 'legend': 'lower limit'},
+                             {'y_position': "8", 'color': 'red', 'legend': 'upper limit',
+                              'text': {'text_content': 'limit', 'text_x_position': "5"}}]).apply(builder)
+        PlotTexts([{'x_position': "50 s", 'y_position': "5", 'text_content': 'center'}]).apply(builder)
+        builder.finalize()
+
+        assert len(builder.ax.collections) == 1
+        assert len(builder.ax.collections[0].get_segments()) == 2
+        assert [(text.get_text(), text.get_position()) for text in builder.ax.texts] == [('limit', (5.0, 8.0)),
+                                                                                         ('center', (50.0, 5.0))]
+        builder.close()
+
+    def test_fitted_line_has_one_sample_per_pixel(self) -> None:
+        """A fitted line is sampled once per pixel of the axes width, also on figures wider than 1000 pixels"""
+        time_data = np.linspace(0.0, 100.0, 1000)
+        builder = PlotBuilder().set_x_axis("0::100::10").set_y_axis("0::300::50")
+        builder.figure.set_size_inches(30, 10)
+        builder.figure.set_dpi(100)
+        PlotFittedLines(time_data, {'a': 2 * time_data + 1}, [{'signal_name': 'a'}]).apply(builder)
+        builder.finalize()
+
+        axes_width = builder.figure.get_figwidth() * builder.figure.dpi * builder.ax.get_position().width
+        assert axes_width > 1000
+        assert len(builder.ax.lines[-1].get_xdata()) == int(np.ceil(axes_width))
+        builder.close()
+
+    def test_dense_scatter_is_drawn_as_density(self) -> None:
+        """A scatter above the density threshold becomes a single image, a sparse scatter stays points"""
+        rng = np.random.default_rng(0)
+        data = {'speed': rng.uniform(0.0, 30.0, 1_000_000), 'ttc': rng.uniform(0.0, 10.0, 1_000_000)}
+        scatters = [{'x_signal_name': 'speed', 'y_signal_name': 'ttc', 'legend': 'ttc over speed'}]
+
+        builder = PlotBuilder().set_x_axis("0::30::5").set_y_axis("0::10::1")
+        PlotScatters(None, data, scatters, density_threshold=10_000, chunk_size=300_000).apply(builder)
+        builder.finalize()
+        assert len(builder.ax.images) == 1 and not builder.ax.collections
+        assert builder.ax.images[0].get_array().sum() == 1_000_000
+        builder.close()
+
+        sparse = {name: values[:1000] for name, values in data.items()}
+        builder = PlotBuilder().set_x_axis("0::30::5").set_y_axis("0::10::1")
+        PlotScatters(None, sparse, scatters, density_threshold=10_000).apply(builder)
+        builder.finalize()
+        assert not builder.ax.images and len(builder.ax.collections) == 1
+        builder.close()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""A test module for the render cache"""
+import os
+from pathlib import Path
+
+import pytest
+
+from easyplotter.common.build_manifest import BuildManifest
+from easyplotter.common.render_cache import RenderCache
+
+
+class TestRenderCache:
+    def test_place_cached_files(self, tmp_path: Path) -> None:
+        """The files of a stored plot are placed into another output directory"""
+        cache = RenderCache(tmp_path.joinpath("cache"))
+        output_file = tmp_path.joinpath("fig1.png")
+        output_file.write_bytes(b"image")
+        other_dir = tmp_path.joinpath("other")
+        other_dir.mkdir()
+
+        assert cache.get("key", other_dir) is None
+        cache.put("key", [output_file])
+        outputs = cache.get("key", other_dir)
+
+        assert outputs == [other_dir.joinpath("fig1.png")]
+        assert outputs[0].read_bytes() == b"image"
+        assert (cache.hits, cache.misses, cache.bytes_saved) == (1, 1, 5)
+
+    def test_key_of_changed_recording(self, tmp_path: Path) -> None:
+        """The same recording gives the same key, a changed recording or configuration gives another key"""
+        cache = RenderCache(tmp_path.joinpath("cache"))
+        recording = tmp_path.joinpath("recording.csv")
+        recording.write_text("time,a\n0,1\n")
+        config = {'id': 'fig1'}
+
+        key = cache.make_key(config, [recording])
+        assert cache.make_key(config, [recording]) == key
+        assert cache.make_key({'id': 'fig2'}, [recording]) != key
+
+        recording.write_text("time,a\n0,22\n")
+        assert cache.make_key(config, [recording]) != key
+
+    def test_key_is_manifest_digest(self, tmp_path: Path) -> None:
+        """The render cache and the build manifest derive the same digest from the same inputs"""
+        cache = RenderCache(tmp_path.joinpath("cache"))
+        recording = tmp_path.joinpath("recording.csv")
+        recording.write_text("time,a\n0,1\n")
+
+        assert cache.make_key({'id': 'fig1'}, [recording], (0.0, 1.0)) == \
+            BuildManifest.make_digest({'id': 'fig1'}, [recording], (0.0, 1.0))
+
+    def test_key_does_not_read_recording(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """The key is made from the fingerprint of a recording without opening the file"""
+        cache = RenderCache(tmp_path.joinpath("cache"))
+        recording = tmp_path.joinpath("recording.csv")
+        recording.write_text("time,a\n0,1\n")
+        monkeypatch.setattr('builtins.open', lambda *args, **kwargs: pytest.fail("recording is read"))
+
+        cache.make_key({'id': 'fig1'}, [recording])
+
+        assert not cache.cache_dir.exists()
+
+    def test_evict_least_recently_used(self, tmp_path: Path) -> None:
+        """The oldest plots are removed when the size limit is exceeded"""
+        cache = RenderCache(tmp_path.joinpath("cache"), max_bytes=2500)
+        output_file = tmp_path.joinpath("fig1.png")
+        output_file.write_bytes(bytes(1000))
+        for i in range(3):
+            cache.put(f"key{i}", [output_file])
+            os.utime(cache.cache_dir.joinpath(f"key{i}", cache.ENTRY_FILE), (i, i))
+
+        assert cache.get("key0", tmp_path) is None
+        assert cache.get("key2", tmp_path) is not None
+        assert cache.evictions == 1
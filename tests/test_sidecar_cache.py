@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""A test module for the sidecar cache"""
+import os
+from pathlib import Path
+
+import numpy as np
+
+from easyplotter.common.sidecar_cache import SidecarCache
+from easyplotter.common.signal_processing import SignalPyramid
+
+
+class TestSidecarCache:
+    def test_write_and_memmap_columns(self, tmp_path: Path) -> None:
+        """Written columns are read back as read-only memory-mapped arrays"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a\n0,1\n")
+        cache = SidecarCache(tmp_path.joinpath("cache"))
+
+        cache.write(data_file, {'time': np.arange(5.0), 'a': np.arange(5.0) * 2})
+        arrays = cache.read(data_file, ['time', 'a', 'b'])
+
+        assert sorted(arrays) == ['a', 'time']
+        assert isinstance(arrays['a'], np.memmap)
+        assert not arrays['a'].flags.writeable
+        np.testing.assert_array_equal(arrays['a'], np.arange(5.0) * 2)
+
+    def test_invalidate_on_source_change(self, tmp_path: Path) -> None:
+        """The cache entry is dropped when the source file changes"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a\n0,1\n")
+        cache = SidecarCache(tmp_path.joinpath("cache"))
+        cache.write(data_file, {'a': np.arange(3.0)})
+
+        data_file.write_text("time,a\n0,1\n1,2\n")
+
+        assert cache.read(data_file, ['a']) == {}
+
+    def test_evict_least_recently_used(self, tmp_path: Path) -> None:
+        """The oldest entries are removed when the size limit is exceeded"""
+        cache = SidecarCache(tmp_path.joinpath("cache"), max_bytes=1000)
+        data_files = []
+        for i in range(3):
+            data_file = tmp_path.joinpath(f"recording_{i}.csv")
+            data_file.write_text("time,a\n")
+            data_files.append(data_file)
+            cache.write(data_file, {'a': np.zeros(50)})
+            os.utime(cache._entry_dir(data_file).joinpath(cache.HEADER_FILE), (i, i))
+
+        assert cache.read(data_files[0], ['a']) == {}
+        assert 'a' in cache.read(data_files[2], ['a'])
+
+    def test_persist_pyramid(self, tmp_path: Path) -> None:
+        """A persisted pyramid is read back with memory-mapped levels"""
+        data_file = tmp_path.joinpath("recording.csv")
+        data_file.write_text("time,a\n0,1\n")
+        cache = SidecarCache(tmp_path.joinpath("cache"))
+        time, values = np.arange(1000.0), np.sin(np.arange(1000.0))
+        cache.write(data_file, {'time': time, 'a': values})
+        pyramid = SignalPyramid(time, values)
+
+        cache.write_pyramid(data_file, 'a', pyramid)
+        persisted = cache.read_pyramid(data_file, 'a', time, values)
+
+        assert persisted is not None and sorted(persisted.levels) == sorted(pyramid.levels)
+        for level, (mins, maxs) in pyramid.levels.items():
+            np.testing.assert_array_equal(persisted.levels[level][0], mins)
+            np.testing.assert_array_equal(persisted.levels[level][1], maxs)
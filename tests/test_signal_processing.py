@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""A test module for the signal processing functions"""
+import numpy as np
+
+from easyplotter.common.signal_processing import (DensityGrid, MinMaxAccumulator, SignalPyramid, find_transitions,
+                                                  minmax_decimate, run_lengths, slice_to_window, window_slice)
+
+
+class TestWindowSlicing:
+    def test_window_slice_keeps_margin(self) -> None:
+        """One sample of margin is kept on each side of the window"""
+        assert window_slice(np.arange(10.0), 2.5, 5.0) == slice(2, 7)
+        assert window_slice(np.arange(10.0), -5.0, 50.0) == slice(0, 10)
+
+    def test_slice_to_window_returns_views(self) -> None:
+        """The sliced signal shares the memory of the input arrays"""
+        time = np.linspace(0.0, 100.0, 1001)
+        values = np.sin(time)
+
+        x_data, y_data = slice_to_window(time, values, (10.0, 50.0))
+
+        assert np.shares_memory(x_data, time) and np.shares_memory(y_data, values)
+        assert x_data[0] < 10.0 <= x_data[1] and x_data[-2] <= 50.0 < x_data[-1]
+
+    def test_slice_to_window_without_limits(self) -> None:
+        """All samples are kept without x-axis limits"""
+        time = np.arange(5.0)
+
+        x_data, _ = slice_to_window(time, time, None)
+
+        assert x_data is time
+
+
+class TestFindTransitions:
+    def test_level_changes(self) -> None:
+        """Each change of a level signal is an edge, NaN samples are skipped"""
+        time = np.arange(8.0)
+        levels = np.array([0.0, 0.0, 1.0, 2.0, 2.0, np.nan, 2.0, 0.0])
+
+        x_positions, previous, values = find_transitions(time, levels)
+        assert np.array_equal(x_positions, [2.0, 3.0, 7.0])
+        assert np.array_equal(previous, [0.0, 1.0, 2.0])
+        assert np.array_equal(values, [1.0, 2.0, 0.0])
+        assert np.array_equal(find_transitions(time, levels, edge='falling')[0], [7.0])
+
+    def test_threshold_crossings(self) -> None:
+        """A threshold crossing is found once, even if the signal keeps rising"""
+        time = np.arange(6.0)
+        values = np.array([0.0, 1.0, 2.0, 3.0, 1.0, 4.0])
+
+        assert np.array_equal(find_transitions(time, values, edge='rising', threshold=1.5)[0], [2.0, 5.0])
+        assert np.array_equal(find_transitions(time, values, edge='falling', threshold=1.5)[0], [4.0])
+
+
+class TestRunLengths:
+    def test_intervals_have_no_gaps(self) -> None:
+        """Each interval ends where the next one starts"""
+        time = np.arange(7.0)
+        states = np.array([0, 0, 1, 1, 1, 2, 0])
+
+        starts, stops, values = run_lengths(time, states)
+        assert np.array_equal(starts, [0.0, 2.0, 5.0, 6.0])
+        assert np.array_equal(stops, [2.0, 5.0, 6.0, 6.0])
+        assert np.array_equal(values, [0, 1, 2, 0])
+
+
+class TestSignalPyramid:
+    def test_query_keeps_extremes_with_bounded_output(self) -> None:
+        """A window is reduced to O(pixels) samples which keep the extremes of the window"""
+        rng = np.random.default_rng(0)
+        time = np.linspace(0.0, 1000.0, 1_000_000)
+        values = rng.standard_normal(len(time))
+        pyramid = SignalPyramid(time, values)
+
+        x_data, y_data = pyramid.query((100.0, 300.0), 1000)
+        window = (time >= 100.0) & (time <= 300.0)
+
+        assert len(x_data) <= 4 * 1000 + 2
+        assert np.all(np.diff(x_data) > 0)
+        assert y_data.max() == values[window].max() and y_data.min() == values[window].min()
+
+    def test_query_short_window_returns_samples(self) -> None:
+        """A window with less samples than pixel columns is returned unchanged"""
+        time = np.arange(10_000.0)
+        pyramid = SignalPyramid(time, np.sin(time))
+
+        x_data, _ = pyramid.query((10.0, 20.0), 1000)
+
+        np.testing.assert_array_equal(x_data, np.arange(9.0, 22.0))
+
+
+class TestDensityGrid:
+    def test_chunks_match_histogram(self) -> None:
+        """Binning in chunks gives the same counts as a 2D histogram of all points"""
+        rng = np.random.default_rng(0)
+        x_data = rng.uniform(-1.0, 11.0, 100_000)
+        y_data = rng.normal(5.0, 2.0, 100_000)
+        y_data[::100] = np.nan
+
+        grid = DensityGrid((0.0, 10.0), (0.0, 10.0), (40, 20))
+        for start in range(0, len(x_data), 30_000):
+            grid.add(x_data[start:start + 30_000], y_data[start:start + 30_000])
+
+        expected, _, _ = np.histogram2d(y_data, x_data, bins=(20, 40), range=((0.0, 10.0), (0.0, 10.0)))
+        assert np.array_equal(grid.counts, expected)
+        assert grid.n_points == expected.sum()
+
+
+class TestMinMaxAccumulator:
+    def test_chunks_match_minmax_decimate(self) -> None:
+        """Accumulating chunks keeps the same samples as reducing the whole signal"""
+        rng = np.random.default_rng(1)
+        x_data = np.sort(rng.uniform(0.0, 100.0, 50_000))
+        y_data = np.round(rng.normal(0.0, 1.0, 50_000), 1)
+
+        accumulator = MinMaxAccumulator((20.0, 80.0), 300)
+        for start in range(0, len(x_data), 7_000):
+            accumulator.add(x_data[start:start + 7_000], y_data[start:start + 7_000])
+
+        expected_x, expected_y = minmax_decimate(x_data, y_data, 300, (20.0, 80.0))
+        result_x, result_y = accumulator.result()
+        np.testing.assert_array_equal(result_x, expected_x)
+        np.testing.assert_array_equal(result_y, expected_y)
+        assert accumulator.n_samples == len(x_data)
+
+    def test_nan_values_are_skipped(self) -> None:
+        """NaN values are not accumulated"""
+        accumulator = MinMaxAccumulator((0.0, 4.0), 1).add(np.arange(5.0), np.array([1.0, np.nan, 3.0, np.nan, 0.0]))
+
+        result_x, result_y = accumulator.result()
+        np.testing.assert_array_equal(result_x, [0.0, 2.0, 4.0])
+        np.testing.assert_array_equal(result_y, [1.0, 3.0, 0.0])
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""A test module for the streaming statistics"""
+import numpy as np
+
+from easyplotter.common.streaming_statistics import SignalStatistics
+
+
+class TestSignalStatistics:
+    def test_merged_partials_match_single_pass(self) -> None:
+        """Merging the statistics of parts gives the statistics of all values"""
+        rng = np.random.default_rng(0)
+        values = np.concatenate((rng.normal(5.0, 3.0, 300_000), -rng.exponential(2.0, 200_000)))
+        values[::1000] = np.nan
+
+        single = SignalStatistics((-10.0, 20.0, 0.5)).update(values, chunk_size=70_000)
+        merged = SignalStatistics((-10.0, 20.0, 0.5))
+        for part in np.array_split(values, 7):
+            merged.merge(SignalStatistics((-10.0, 20.0, 0.5)).update(part))
+
+        assert np.array_equal(merged.histogram.counts, single.histogram.counts)
+        assert merged.histogram.underflow == single.histogram.underflow
+        assert merged.sketch.positive == single.sketch.positive and merged.sketch.negative == single.sketch.negative
+        assert merged.summary([1, 50, 99])['percentiles'] == single.summary([1, 50, 99])['percentiles']
+        assert np.isclose(merged.moments.mean, np.nanmean(values)) and np.isclose(merged.moments.std, np.nanstd(values))
+
+    def test_histogram_and_quantiles(self) -> None:
+        """The histogram matches numpy and the quantiles are within the relative accuracy"""
+        rng = np.random.default_rng(1)
+        values = rng.lognormal(1.0, 1.0, 100_000)
+
+        statistics = SignalStatistics((0.0, 20.0, 0.25), relative_accuracy=0.01).update(values, chunk_size=10_000)
+
+        expected, _ = np.histogram(values, bins=statistics.histogram.edges)
+        assert np.array_equal(statistics.histogram.counts, expected)
+        assert statistics.histogram.overflow == np.count_nonzero(values > 20.0)
+        percentiles = statistics.summary([5, 50, 95])['percentiles']
+        assert np.allclose(list(percentiles.values()), np.percentile(values, [5, 50, 95]), rtol=0.02)